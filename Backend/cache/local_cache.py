@@ -0,0 +1,214 @@
+"""
+In-Process Cache for EasyShifts
+Bounded LRU (entry count and bytes, per-entry TTL) kept in front of Redis by SmartCache,
+and the Redis pub/sub channel that keeps the caches of every server instance coherent
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Channel carrying the keys / patterns / tag generations invalidated on any instance
+INVALIDATION_CHANNEL = 'easyshifts:cache:invalidate'
+
+
+class LocalCache:
+    """
+    Thread-safe LRU of serialized values. Storing the serialized text bounds memory by
+    bytes and gives every reader its own copy (responses are mutated by their callers).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Parameters:
+            max_entries (int): Entries kept (CACHE_L1_MAX_ENTRIES).
+            max_bytes (int): Total size of the values kept (CACHE_L1_MAX_BYTES).
+            clock (callable): Monotonic time source.
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('CACHE_L1_MAX_ENTRIES', '1000'))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('CACHE_L1_MAX_BYTES', str(32 * 1024 * 1024)))
+        self.clock = clock
+        # key -> (expires at, size, value), least recently used first
+        self._entries: 'OrderedDict[str, Tuple[float, int, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation: a value read from Redis before one is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, value: Any, ttl: float, generation: Optional[int] = None) -> bool:
+        """
+        Store a serialized value (str / bytes) for ttl seconds; values larger than max_bytes
+        are not kept, nor values read before an invalidation (generation read beforehand).
+        """
+        size = len(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if generation is not None and generation != self.generation:
+                return False
+            if size > self.max_bytes or ttl <= 0 or self.max_entries <= 0:
+                return False
+            self._entries[key] = (self.clock() + ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self.generation += 1
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Drop the keys matching a glob pattern (Redis MATCH syntax)"""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._entries if fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+class InvalidationChannel:
+    """
+    Publishes the cache keys, patterns and tag generations invalidated by this instance and
+    applies the ones published by the others (on_invalidate(keys, patterns, tags)) from a
+    daemon thread.
+    `connected` is only true while subscribed: an instance that may miss messages
+    must not serve from its local cache.
+    """
+
+    def __init__(self, get_connection: Callable[[], Any],
+                 on_invalidate: Callable[[Iterable[str], Iterable[str], Dict[str, int]], Any],
+                 on_disconnect: Optional[Callable[[], Any]] = None, channel: str = INVALIDATION_CHANNEL,
+                 retry_seconds: float = 5.0):
+        self.get_connection = get_connection
+        self.on_invalidate = on_invalidate
+        self.on_disconnect = on_disconnect
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self.connected = False
+        self.received = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def publish(self, keys: Iterable[str] = (), patterns: Iterable[str] = (),
+                tags: Optional[Dict[str, int]] = None) -> bool:
+        message = {'origin': self.origin, 'keys': list(keys), 'patterns': list(patterns), 'tags': tags or {}}
+        try:
+            self.get_connection().publish(self.channel, json.dumps(message))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation: {e}")
+            return False
+
+    def handle(self, data: Any):
+        """Apply one message of the channel (messages of this instance were applied when sent)"""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return
+        if message.get('origin') == self.origin:
+            return
+        self.received += 1
+        self.on_invalidate(message.get('keys') or (), message.get('patterns') or (), message.get('tags') or {})
+
+    def start(self):
+        """Subscribe from a daemon thread (idempotent); it resubscribes after connection errors"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _set_disconnected(self):
+        if self.connected:
+            self.connected = False
+            if self.on_disconnect:
+                self.on_disconnect()
+
+    def _listen(self):
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.get_connection().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.connected = True
+                logger.info(f"Subscribed to cache invalidations on {self.channel}")
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self.handle(message['data'])
+            except Exception as e:
+                logger.warning(f"Cache invalidation channel lost, retrying in {self.retry_seconds:g}s: {e}")
+            finally:
+                self._set_disconnected()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stop.wait(self.retry_seconds)
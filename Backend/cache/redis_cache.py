@@ -3,16 +3,77 @@ Redis-based caching system for EasyShifts
 Implements intelligent caching for database queries, API responses, and computed data
 """
 
+import os
 import json
+import math
+import time
+import uuid
+import zlib
+import random
 import hashlib
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Optional, Dict, List, Callable
+from typing import Any, Optional, Dict, Iterable, List, Callable, NamedTuple, Tuple
 from functools import wraps
 from config.redis_config import cache_manager, redis_config
+from cache.local_cache import LocalCache, InvalidationChannel
+from cache.tag_generations import TagGenerations
 
 logger = logging.getLogger(__name__)
 
+# Key arguments naming an entity, e.g. ('job', 12), tag the entry with it (job:12)
+TAGGED_ENTITIES = ('user', 'job', 'shift')
+
+# Seconds between reads of a key another instance is computing
+LOCK_POLL_SECONDS = 0.05
+
+
+class _Flight:
+    """A get_or_compute() computation in progress, shared by the threads asking for the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        # JSON of the computed value, None when it was not stored (loader failed / not cacheable)
+        self.value: Optional[bytes] = None
+
+
+class _Entry:
+    """
+    A stored cache entry: a JSON header line ({expires_at, delta, encoding}) followed by the
+    value's JSON, zlib-compressed when encoding is 'zlib'. The JSON is kept as bytes so that
+    it can be sent as is (get_or_compute(serialized=True)) without parsing it.
+    """
+
+    __slots__ = ('expires_at', 'delta', 'body')
+
+    def __init__(self, expires_at: float, delta: float, body: bytes):
+        self.expires_at = expires_at
+        self.delta = delta
+        self.body = body
+
+    @classmethod
+    def parse(cls, data: bytes) -> '_Entry':
+        header, _, body = data.partition(b'\n')
+        meta = json.loads(header)
+        if meta.get('encoding') == 'zlib':
+            body = zlib.decompress(body)
+        return cls(meta['expires_at'], meta.get('delta', 0.0), body)
+
+    def value(self, serialized: bool = False) -> Any:
+        return self.body.decode() if serialized else json.loads(self.body)
+
+
+class CacheKey(NamedTuple):
+    """A cache entry's key at the tag generations current when it was taken (SmartCache.key)"""
+    cache_type: str
+    key: str
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode()
+
+
 class SmartCache:
     """Intelligent caching system with automatic invalidation"""
     
@@ -33,6 +94,140 @@ class SmartCache:
             'timesheet_data': 600,     # 10 minutes
             'analytics': 1800,         # 30 minutes
         }
+
+        # Cache types also kept in the in-process first tier, and for how long (seconds).
+        # Kept short: an instance that misses an invalidation message serves stale data at most this long
+        self.local_ttls = {
+            'user_profile': 60,
+            'job_listings': 60,
+            'employee_list': 60,
+            'client_companies': 120,
+            'settings': 300,
+            'certifications': 120,
+            'schedule_data': 30,
+        }
+
+        # Tags every entry of a cache type carries besides type:<cache_type> and its entities
+        self.type_tags = {
+            'schedule_data': ('schedule',),
+        }
+
+        # In-process LRU in front of Redis (CACHE_L1_ENABLED), kept coherent across instances
+        # through the invalidation channel and only read while subscribed to it
+        self.local = LocalCache() if os.getenv('CACHE_L1_ENABLED', 'true').lower() == 'true' else None
+        self.invalidation = InvalidationChannel(redis_config.get_sync_connection, self._apply_invalidation,
+                                                on_disconnect=self._clear_local)
+        # Generations remembered in-process only while bumps of other instances are received
+        self.tag_generations = TagGenerations(redis_config.get_sync_connection, redis_config.cache_tag_prefix,
+                                              trusted=lambda: self.invalidation.connected)
+
+        # Stampede protection of get_or_compute(): entries are kept CACHE_STALE_SECONDS past their TTL
+        # to be served while one caller recomputes them; CACHE_LOCK_SECONDS bounds a computation's lock
+        # and how long others wait for it; CACHE_EARLY_REFRESH_BETA scales early refreshes (0 = off)
+        self.clock = time.time
+        self.stale_seconds = int(os.getenv('CACHE_STALE_SECONDS', '60'))
+        self.lock_seconds = float(os.getenv('CACHE_LOCK_SECONDS', '10'))
+        self.early_refresh_beta = float(os.getenv('CACHE_EARLY_REFRESH_BETA', '1.0'))
+        # Values whose JSON is at least this long are stored zlib-compressed (0 = never)
+        self.compress_min_bytes = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+        # In-process hit/miss counts per cache type and of the Redis tier (for /metrics, no Redis round trip)
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.redis_hits = 0
+        self.redis_misses = 0
+        # {(outcome, cache_type): n} of get_or_compute() calls that computed or avoided computing
+        self.computes: Dict[tuple, int] = {}
+        # Bytes of the values written, before and after compression
+        self.written = {'values': 0, 'compressed': 0, 'json_bytes': 0, 'stored_bytes': 0}
+        self._counts_lock = threading.Lock()
+
+    def _count(self, cache_type: str, hit: bool):
+        counts = self.hits if hit else self.misses
+        with self._counts_lock:
+            counts[cache_type] = counts.get(cache_type, 0) + 1
+
+    def _count_compute(self, outcome: str, cache_type: str):
+        with self._counts_lock:
+            self.computes[(outcome, cache_type)] = self.computes.get((outcome, cache_type), 0) + 1
+
+    def get_compute_counts(self) -> List[Dict[str, Any]]:
+        """get_or_compute() outcomes: computed, coalesced (shared an in-process computation),
+        lock_waited (got another instance's result), stale_served (expired entry served while recomputed)"""
+        with self._counts_lock:
+            return [{'outcome': outcome, 'cache_type': cache_type, 'count': count}
+                    for (outcome, cache_type), count in sorted(self.computes.items())]
+
+    def get_compression_stats(self) -> Dict[str, Any]:
+        """Values written, how many were compressed, and their size before / after (ratio = before / after)"""
+        with self._counts_lock:
+            stats = dict(self.written)
+        stats['bytes_saved'] = stats['json_bytes'] - stats['stored_bytes']
+        stats['ratio'] = round(stats['json_bytes'] / stats['stored_bytes'], 3) if stats['stored_bytes'] else 1.0
+        return stats
+
+    def get_hit_counts(self) -> Dict[str, Dict[str, int]]:
+        """{cache_type: {'hits': n, 'misses': n}} since the process started"""
+        with self._counts_lock:
+            return {cache_type: {'hits': self.hits.get(cache_type, 0), 'misses': self.misses.get(cache_type, 0)}
+                    for cache_type in sorted(set(self.hits) | set(self.misses))}
+
+    def get_tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Lookups answered by each tier, plus the size and evictions of the in-process one"""
+        with self._counts_lock:
+            stats = {'redis': {'hits': self.redis_hits, 'misses': self.redis_misses}}
+        if self.local is not None:
+            stats['local'] = {**self.local.get_stats(), 'subscribed': self.invalidation.connected,
+                              'invalidations_received': self.invalidation.received}
+        return stats
+
+    def start_invalidation_listener(self):
+        """Subscribe to the invalidation channel; the local tier is used from then on"""
+        if self.local is not None:
+            self.invalidation.start()
+
+    def _local_ttl(self, cache_type: str) -> Optional[int]:
+        """Seconds an entry of this type may live in the local tier, None when it is not kept there"""
+        if self.local is None or not self.invalidation.connected:
+            return None
+        return self.local_ttls.get(cache_type)
+
+    def _publish(self, cache_type: Optional[str] = None, keys=(), patterns=(), tags=None):
+        """Tell the other instances to drop their local copies"""
+        if self.local is not None and (cache_type is None or cache_type in self.local_ttls):
+            self.invalidation.publish(keys, patterns, tags)
+
+    def _apply_invalidation(self, keys, patterns, tags=None):
+        if tags:
+            self.tag_generations.apply(tags)
+        if self.local is None:
+            return
+        for key in keys:
+            self.local.delete(key)
+        for pattern in patterns:
+            self.local.invalidate_pattern(pattern)
+
+    def _clear_local(self):
+        # Messages may have been missed while unsubscribed
+        self.tag_generations.clear()
+        if self.local is not None:
+            self.local.clear()
+
+    def _entry_tags(self, cache_type: str, args: tuple, tags: Iterable[str]) -> List[str]:
+        """Tags of an entry: its type, the type's tags, the entities named in its key and `tags`"""
+        entry_tags = [f"type:{cache_type}", *self.type_tags.get(cache_type, ()), *tags]
+        if cache_type == 'user_profile' and args:
+            entry_tags.append(f"user:{args[0]}")
+        entry_tags.extend(f"{name}:{value}" for name, value in zip(args, args[1:]) if name in TAGGED_ENTITIES)
+        return sorted(set(entry_tags))
+
+    def _versioned_key(self, cache_type: str, args: tuple, kwargs: dict, tags: Iterable[str]) -> str:
+        """Cache key with the current generation of each of the entry's tags"""
+        entry_tags = self._entry_tags(cache_type, args, tags)
+        generations = self.tag_generations.get(entry_tags)
+        return f"{self._generate_cache_key(cache_type, *args, **kwargs)}@{'.'.join(map(str, generations))}"
     
     def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate a consistent cache key from arguments"""
@@ -49,81 +244,282 @@ class SmartCache:
         
         return key_string.replace(" ", "_")
     
-    def get(self, cache_type: str, *args, **kwargs) -> Optional[Any]:
-        """Get cached data"""
+    def _read(self, cache_type: str, cache_key: str) -> Optional[_Entry]:
+        """Stored entry of a key (possibly expired), local tier first"""
+        local_ttl = self._local_ttl(cache_type)
+        if local_ttl:
+            data = self.local.get(cache_key)
+            if data is not None:
+                return _Entry.parse(data)
+            generation = self.local.generation
+
+        data = self.cache_manager.get_cache_raw(cache_key)
+        with self._counts_lock:
+            if data is not None:
+                self.redis_hits += 1
+            else:
+                self.redis_misses += 1
+        if data is None:
+            return None
+        if local_ttl:
+            self.local.set(cache_key, data, local_ttl, generation)
+        return _Entry.parse(data)
+
+    def _write(self, cache_type: str, cache_key: str, body: bytes, ttl: Optional[int], delta: float = 0.0) -> bool:
+        """
+        Store the JSON of a value, fresh for the type's TTL. Redis keeps it stale_seconds longer
+        so that get_or_compute() can serve it while the new value is computed.
+        """
+        cache_ttl = ttl or self.cache_ttls.get(cache_type, self.default_ttl)
+        header = {'expires_at': self.clock() + cache_ttl, 'delta': delta}
+        stored_body = body
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            compressed = zlib.compress(body, 1)
+            if len(compressed) < len(body):
+                header['encoding'] = 'zlib'
+                stored_body = compressed
+        with self._counts_lock:
+            self.written['values'] += 1
+            self.written['compressed'] += stored_body is not body
+            self.written['json_bytes'] += len(body)
+            self.written['stored_bytes'] += len(stored_body)
+        serialized = json.dumps(header).encode() + b'\n' + stored_body
+
+        stored = self.cache_manager.set_cache_raw(cache_key, serialized, cache_ttl + self.stale_seconds)
+        if self.local is not None:
+            self.local.delete(cache_key)
+            self._publish(cache_type, keys=[cache_key])
+            local_ttl = self._local_ttl(cache_type)
+            if stored and local_ttl:
+                self.local.set(cache_key, serialized, min(local_ttl, cache_ttl))
+        return stored
+
+    def key(self, cache_type: str, *args, tags: Iterable[str] = (), **kwargs) -> CacheKey:
+        """
+        Key of an entry at the current generations of its tags, for set(). Take it before
+        reading the data the entry is built from: a write committed in between invalidates
+        the key, and the entry is then stored where nothing reads it.
+        """
+        return CacheKey(cache_type, self._versioned_key(cache_type, args, kwargs, tags))
+
+    def lookup(self, cache_type: str, *args, tags: Iterable[str] = (), serialized: bool = False,
+               **kwargs) -> Tuple[Optional[Any], Optional[CacheKey]]:
+        """
+        (cached data or None, key to set() the data computed on a miss; None when the cache failed).
+        With serialized, cached data comes as its JSON text (str).
+        """
         try:
-            cache_key = self._generate_cache_key(cache_type, *args, **kwargs)
-            return self.cache_manager.get_cache(cache_key)
+            cache_key = self.key(cache_type, *args, tags=tags, **kwargs)
+            entry = self._read(cache_type, cache_key.key)
+            fresh = entry is not None and entry.expires_at > self.clock()
+            self._count(cache_type, fresh)
+            return (entry.value(serialized) if fresh else None), cache_key
         except Exception as e:
             logger.error(f"Cache get error for {cache_type}: {e}")
-            return None
-    
-    def set(self, cache_type: str, data: Any, *args, ttl: Optional[int] = None, **kwargs) -> bool:
-        """Set cached data with appropriate TTL"""
+            return None, None
+
+    def get(self, cache_type: str, *args, tags: Iterable[str] = (), **kwargs) -> Optional[Any]:
+        """Get cached data"""
+        return self.lookup(cache_type, *args, tags=tags, **kwargs)[0]
+
+    def set(self, cache_key: CacheKey, data: Any, ttl: Optional[int] = None) -> bool:
+        """Set cached data under a key taken with key() / lookup(), with the type's TTL by default"""
         try:
-            cache_key = self._generate_cache_key(cache_type, *args, **kwargs)
-            cache_ttl = ttl or self.cache_ttls.get(cache_type, self.default_ttl)
-            
-            return self.cache_manager.set_cache(cache_key, data, cache_ttl)
+            return self._write(cache_key.cache_type, cache_key.key, _encode(data), ttl)
         except Exception as e:
-            logger.error(f"Cache set error for {cache_type}: {e}")
+            logger.error(f"Cache set error for {cache_key.cache_type}: {e}")
             return False
-    
-    def delete(self, cache_type: str, *args, **kwargs) -> bool:
+
+    def get_or_compute(self, cache_type: str, loader: Callable[[], Any], *args, ttl: Optional[int] = None,
+                       tags: Iterable[str] = (), cacheable: Optional[Callable[[Any], bool]] = None,
+                       serialized: bool = False, **kwargs) -> Any:
+        """
+        Cached data, computed by loader() and stored when missing, with stampede protection:
+        one caller per key computes (in-process waiters share its result, other instances
+        wait for it through a short Redis lock); an entry past its TTL (kept stale_seconds
+        longer) is served to everyone else meanwhile; entries are refreshed a little before
+        they expire, earlier the longer they took to compute (probabilistic early refresh).
+
+        Usage:
+            schedule = smart_cache.get_or_compute('schedule_data', lambda: build_schedule(week), week)
+
+        Parameters:
+            cacheable (callable): Whether a computed value is stored (default: not None).
+            serialized (bool): Return cached values as their JSON text (str) instead of parsing
+                them; values computed by this call are returned as loader() returned them.
+        """
+        cacheable = cacheable or (lambda value: value is not None)
+        try:
+            cache_key = self._versioned_key(cache_type, args, kwargs, tags)
+            entry = self._read(cache_type, cache_key)
+        except Exception as e:
+            logger.error(f"Cache get error for {cache_type}: {e}")
+            return loader()
+
+        if entry is not None and not self._refresh_due(entry):
+            self._count(cache_type, True)
+            return entry.value(serialized)
+        return self._compute(cache_type, cache_key, loader, ttl, cacheable, entry, serialized)
+
+    def _refresh_due(self, entry: _Entry) -> bool:
+        """
+        True once an entry expired, or at random shortly before: with probability rising as
+        expiry nears, scaled by the time the value took to compute (XFetch)
+        """
+        now = self.clock()
+        if entry.expires_at <= now:
+            return True
+        if not self.early_refresh_beta or not entry.delta:
+            return False
+        return now - entry.delta * self.early_refresh_beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    def _serve_previous(self, cache_type: str, entry: _Entry, serialized: bool) -> Any:
+        """The entry being recomputed by another caller (expired, or due for an early refresh)"""
+        if entry.expires_at <= self.clock():
+            self._count_compute('stale_served', cache_type)
+        else:
+            self._count(cache_type, True)
+        return entry.value(serialized)
+
+    def _wait_for_entry(self, cache_key: str) -> Optional[_Entry]:
+        """Poll Redis for the fresh entry another instance is computing, None after lock_seconds"""
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            data = self.cache_manager.get_cache_raw(cache_key)
+            if data is not None:
+                entry = _Entry.parse(data)
+                if entry.expires_at > self.clock():
+                    return entry
+        return None
+
+    def _compute(self, cache_type: str, cache_key: str, loader: Callable[[], Any], ttl: Optional[int],
+                 cacheable: Callable[[Any], bool], previous: Optional[_Entry], serialized: bool) -> Any:
+        """Run loader() once per key at a time (see get_or_compute), previous = the entry being replaced"""
+        with self._flights_lock:
+            flight = self._flights.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[cache_key] = _Flight()
+
+        if not leader:
+            # Another thread of this process is computing the key
+            if previous is not None:
+                return self._serve_previous(cache_type, previous, serialized)
+            flight.done.wait(self.lock_seconds)
+            if flight.value is not None:
+                self._count_compute('coalesced', cache_type)
+                return flight.value.decode() if serialized else json.loads(flight.value)
+            return loader()
+
+        token = uuid.uuid4().hex
+        locked = None
+        try:
+            locked = self.cache_manager.acquire_lock(cache_key, token, self.lock_seconds)
+            if locked is False:
+                # Another instance is computing the key
+                if previous is not None:
+                    return self._serve_previous(cache_type, previous, serialized)
+                entry = self._wait_for_entry(cache_key)
+                if entry is not None:
+                    flight.value = entry.body
+                    self._count_compute('lock_waited', cache_type)
+                    return entry.value(serialized)
+
+            self._count(cache_type, False)
+            started_at = self.clock()
+            try:
+                value = loader()
+            except Exception as e:
+                if previous is None:
+                    raise
+                logger.error(f"Recomputing cached {cache_type} failed, serving the previous value: {e}")
+                return self._serve_previous(cache_type, previous, serialized)
+            self._count_compute('computed', cache_type)
+            if cacheable(value):
+                try:
+                    # Waiters get their own copy of the value
+                    flight.value = _encode(value)
+                    self._write(cache_type, cache_key, flight.value, ttl, delta=self.clock() - started_at)
+                except Exception as e:
+                    logger.error(f"Cache set error for {cache_type}: {e}")
+            return value
+        finally:
+            if locked:
+                self.cache_manager.release_lock(cache_key, token)
+            with self._flights_lock:
+                self._flights.pop(cache_key, None)
+            flight.done.set()
+
+    def delete(self, cache_type: str, *args, tags: Iterable[str] = (), **kwargs) -> bool:
         """Delete specific cached data"""
         try:
-            cache_key = self._generate_cache_key(cache_type, *args, **kwargs)
-            return self.cache_manager.delete_cache(cache_key)
+            cache_key = self._versioned_key(cache_type, args, kwargs, tags)
+            deleted = self.cache_manager.delete_cache(cache_key)
+            if self.local is not None:
+                self.local.delete(cache_key)
+                self._publish(cache_type, keys=[cache_key])
+            return deleted
         except Exception as e:
             logger.error(f"Cache delete error for {cache_type}: {e}")
             return False
     
     def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all cache entries matching pattern"""
+        """
+        Delete all cache entries matching pattern. SCANs the whole keyspace: for maintenance
+        only, the application invalidates with invalidate_tags().
+        """
         try:
-            return self.cache_manager.clear_cache_pattern(pattern)
+            deleted = self.cache_manager.clear_cache_pattern(pattern)
+            if self.local is not None:
+                self.local.invalidate_pattern(pattern)
+                self._publish(patterns=[pattern])
+            return deleted
         except Exception as e:
             logger.error(f"Cache pattern invalidation error for {pattern}: {e}")
             return 0
     
+    def invalidate_tags(self, *tags: str) -> Dict[str, int]:
+        """
+        Invalidate every entry carrying one of the tags: one INCR per tag in a single round trip,
+        whatever the number of entries (they are no longer read and expire). Returns the new generations.
+        """
+        try:
+            generations = self.tag_generations.bump(tags)
+        except Exception as e:
+            logger.error(f"Cache tag invalidation error for {', '.join(tags)}: {e}")
+            return {}
+        self._publish(tags=generations)
+        return generations
+
+    def invalidate_type(self, cache_type: str) -> int:
+        """Invalidate every cache entry of one cache type, returns the number of tags invalidated"""
+        return self.invalidate_types(cache_type)
+
+    def invalidate_types(self, *cache_types: str) -> int:
+        """Invalidate every cache entry of the cache types (one round trip)"""
+        return len(self.invalidate_tags(*(f"type:{cache_type}" for cache_type in cache_types)))
+
     def invalidate_user_cache(self, user_id: int) -> int:
         """Invalidate all cache entries for a specific user"""
-        patterns = [
-            f"user_profile:{user_id}:*",
-            f"*:user:{user_id}:*",
-            f"employee_list:*",  # User changes might affect employee lists
-        ]
-        
-        total_deleted = 0
-        for pattern in patterns:
-            total_deleted += self.invalidate_pattern(pattern)
-        
-        logger.info(f"Invalidated {total_deleted} cache entries for user {user_id}")
-        return total_deleted
+        # User changes might affect employee lists
+        invalidated = len(self.invalidate_tags(f"user:{user_id}", "type:employee_list"))
+        logger.info(f"Invalidated cache entries for user {user_id}")
+        return invalidated
     
     def invalidate_shift_cache(self, job_id: int = None, shift_id: int = None) -> int:
         """Invalidate shift-related cache entries"""
-        patterns = []
+        tags = []
         
         if job_id:
-            patterns.extend([
-                f"shift_data:job:{job_id}:*",
-                f"job_listings:*",
-                f"schedule_data:*"
-            ])
+            tags.extend([f"job:{job_id}", "type:job_listings", "schedule"])
         
         if shift_id:
-            patterns.extend([
-                f"shift_data:*:{shift_id}:*",
-                f"timesheet_data:shift:{shift_id}:*"
-            ])
+            tags.append(f"shift:{shift_id}")
         
-        total_deleted = 0
-        for pattern in patterns:
-            total_deleted += self.invalidate_pattern(pattern)
-        
-        logger.info(f"Invalidated {total_deleted} shift cache entries")
-        return total_deleted
+        invalidated = len(self.invalidate_tags(*tags))
+        logger.info(f"Invalidated shift cache entries ({', '.join(tags)})")
+        return invalidated
 
 def cached(cache_type: str, ttl: Optional[int] = None, key_args: Optional[List[str]] = None):
     """
@@ -154,18 +550,9 @@ def cached(cache_type: str, ttl: Optional[int] = None, key_args: Optional[List[s
             
             cache_key = ":".join(cache_key_parts)
             
-            # Try to get from cache
-            cached_result = smart_cache.get(cache_type, cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for {func.__name__}: {cache_key}")
-                return cached_result
-            
-            # Execute function and cache result
+            # Computed once per key at a time when missing or expired
             try:
-                result = func(*args, **kwargs)
-                smart_cache.set(cache_type, result, cache_key, ttl=ttl)
-                logger.debug(f"Cache miss for {func.__name__}: {cache_key}")
-                return result
+                return smart_cache.get_or_compute(cache_type, lambda: func(*args, **kwargs), cache_key, ttl=ttl)
             except Exception as e:
                 logger.error(f"Function execution error in cached decorator: {e}")
                 raise
@@ -185,6 +572,7 @@ class CacheWarmer:
             from db.controllers.users_controller import UsersController
             from main import get_db_session
             
+            cache_key = self.smart_cache.key('user_profile', user_id)
             with get_db_session() as session:
                 users_controller = UsersController(session)
                 
@@ -199,7 +587,7 @@ class CacheWarmer:
                         'is_admin': user.isAdmin,
                         'email': user.email
                     }
-                    self.smart_cache.set('user_profile', user_data, user_id)
+                    self.smart_cache.set(cache_key, user_data)
                     logger.info(f"Warmed cache for user {user_id}")
                 
         except Exception as e:
@@ -211,6 +599,7 @@ class CacheWarmer:
             from db.controllers.shifts_controller import ShiftsController
             from main import get_db_session
             
+            cache_key = self.smart_cache.key('shift_data', 'job', job_id)
             with get_db_session() as session:
                 shifts_controller = ShiftsController(session)
                 
@@ -228,7 +617,7 @@ class CacheWarmer:
                     for shift in shifts
                 ]
                 
-                self.smart_cache.set('shift_data', shift_data, 'job', job_id)
+                self.smart_cache.set(cache_key, shift_data)
                 logger.info(f"Warmed shift cache for job {job_id}")
                 
         except Exception as e:
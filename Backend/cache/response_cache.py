@@ -0,0 +1,417 @@
+"""
+Response Cache for EasyShifts
+Read-through caching of whole route responses in SmartCache (routes registered with
+cache=<cache type>), invalidated when a transaction that wrote one of the tables the
+cached payload is built from commits; schedule entries only by writes to shifts of
+the weeks they cover
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.util import identity_key
+
+from db.circuit_breaker import CLOSED
+from db.models import User, ClientCompany, Job, Shift, ShiftWorker, EmployeeCertification, WorkplaceSettings
+
+logger = logging.getLogger(__name__)
+
+# Cache type -> tables its payloads are read from; a committed write to any of them
+# invalidates every entry of the type
+CACHE_DEPENDENCIES: Dict[str, FrozenSet[str]] = {
+    'employee_list': frozenset({User.__tablename__}),
+    'job_listings': frozenset({Job.__tablename__}),
+    'client_companies': frozenset({ClientCompany.__tablename__, User.__tablename__, Job.__tablename__}),
+    'schedule_data': frozenset({
+        Shift.__tablename__, ShiftWorker.__tablename__, User.__tablename__, Job.__tablename__,
+        ClientCompany.__tablename__, EmployeeCertification.__tablename__, WorkplaceSettings.__tablename__,
+    }),
+}
+
+# Cache type -> table -> columns its payloads never read; a committed UPDATE that only
+# set these (e.g. users.last_login on every sign-in) leaves the type cached
+_USER_ACCOUNT_COLUMNS = frozenset({'last_login', 'password', 'google_id', 'google_picture', 'email'})
+UNREAD_COLUMNS: Dict[str, Dict[str, FrozenSet[str]]] = {
+    'employee_list': {User.__tablename__: _USER_ACCOUNT_COLUMNS},
+    'schedule_data': {User.__tablename__: _USER_ACCOUNT_COLUMNS},
+}
+
+# Cache type -> tables whose rows written by an ORM flush name the schedule weeks they
+# changed; when only those were written, the entries tagged with these weeks
+# (schedule_week_tags) are invalidated instead of the whole type
+WEEK_SCOPED: Dict[str, FrozenSet[str]] = {
+    'schedule_data': frozenset({Shift.__tablename__, ShiftWorker.__tablename__}),
+}
+WEEK_TABLES = frozenset().union(*WEEK_SCOPED.values())
+# Longer ranges carry LONG_RANGE_TAG instead of one tag per week, bumped with every week
+MAX_TAGGED_WEEKS = 12
+LONG_RANGE_TAG = 'schedule_weeks:long'
+
+# Table -> columns updated by the committed writes, None for inserts, deletes and
+# updates whose columns are unknown (every column counts as written)
+Writes = Mapping[str, Optional[FrozenSet[str]]]
+
+
+def week_of(day: date) -> date:
+    """Monday of the week of day"""
+    return day - timedelta(days=day.weekday())
+
+
+def week_tag(week: date) -> str:
+    return f"schedule_week:{week.isoformat()}"
+
+
+def schedule_week_tags(start: date, end: date) -> List[str]:
+    """Tags of a schedule entry covering start..end: one per week, LONG_RANGE_TAG past MAX_TAGGED_WEEKS"""
+    first = week_of(start)
+    weeks = (week_of(end) - first).days // 7 + 1
+    if not 1 <= weeks <= MAX_TAGGED_WEEKS:
+        return [LONG_RANGE_TAG]
+    return [week_tag(first + timedelta(weeks=index)) for index in range(weeks)]
+
+
+def _is_success(response: Any) -> bool:
+    return isinstance(response, dict) and response.get('success') is True
+
+
+def _stale(cache_type: str, table: str, columns: Optional[FrozenSet[str]]) -> bool:
+    unread = UNREAD_COLUMNS.get(cache_type, {}).get(table)
+    return columns is None or unread is None or not columns <= unread
+
+
+def _as_writes(writes: Union[Writes, Iterable[str]]) -> Writes:
+    return writes if isinstance(writes, Mapping) else dict.fromkeys(writes)
+
+
+def _stale_tables(cache_type: str, writes: Writes) -> Set[str]:
+    """Tables of writes whose changes a cache type's payloads read"""
+    return {table for table, columns in writes.items()
+            if table in CACHE_DEPENDENCIES[cache_type] and _stale(cache_type, table, columns)}
+
+
+def cache_types_for(writes: Union[Writes, Iterable[str]]) -> Set[str]:
+    """Cache types made stale by writes, a table -> updated columns mapping or table names (whole rows)"""
+    writes = _as_writes(writes)
+    return {cache_type for cache_type in CACHE_DEPENDENCIES if _stale_tables(cache_type, writes)}
+
+
+_MISSING = object()
+
+
+class SerializedResponse:
+    """
+    A cached response kept as the JSON text it was stored as. Server.py sends payload()
+    without parsing and re-serializing it; fields set on it afterwards (request_id,
+    correlation_id) are appended to the text, other reads parse it once.
+    """
+
+    def __init__(self, text: str, **fields):
+        self.text = text
+        self.fields = fields
+        self._data = None
+
+    def _parsed(self) -> dict:
+        if self._data is None:
+            self._data = json.loads(self.text)
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.fields:
+            return self.fields[key]
+        if key == 'success':
+            # Only successful responses are cached
+            return True
+        return self._parsed().get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.fields[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields or key == 'success' or key in self._parsed()
+
+    def to_dict(self) -> dict:
+        return {**self._parsed(), **self.fields}
+
+    def payload(self) -> str:
+        """The JSON to send: the cached text with the fields set since (JSON parsers keep the last duplicate key)"""
+        if not self.fields:
+            return self.text
+        fields = json.dumps(self.fields, default=str)
+        text = self.text.rstrip()
+        if text == '{}':
+            return fields
+        return f"{text[:-1]}, {fields[1:]}"
+
+
+class ResponseCache:
+    """Stores successful responses of cached routes and serves them until a write invalidates them"""
+
+    def __init__(self, cache: Any = None, enabled: Optional[bool] = None, breaker: Any = None,
+                 async_workers: int = 16):
+        """
+        Parameters:
+            cache (SmartCache): Defaults to cache.redis_cache.smart_cache (imported on first use).
+            enabled (bool): Defaults to RESPONSE_CACHE_ENABLED.
+            breaker (CircuitBreaker): Cache skipped while it is open (default: the Redis breaker).
+            async_workers (int): Threads running get_or_compute_async()'s blocking cache calls.
+        """
+        self._cache = cache
+        self._breaker = breaker
+        self.async_workers = async_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.enabled = enabled if enabled is not None else (
+            os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true')
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from cache.redis_cache import smart_cache
+            from config.redis_config import redis_breaker
+            self._cache = smart_cache
+            self._breaker = self._breaker or redis_breaker
+        return self._cache
+
+    def _available(self) -> bool:
+        """False while Redis is known to be down: requests go to the database without logging cache errors"""
+        self.cache  # resolves the default breaker
+        return self._breaker is None or self._breaker.state == CLOSED or self._breaker.retry_after() == 0
+
+    def key(self, route, ctx) -> Optional[tuple]:
+        """Cache key parts of a request, None when the request is not cacheable"""
+        if not self.enabled or route.cache is None:
+            return None
+        if route.cache_key is None:
+            return ()
+        try:
+            return route.cache_key(ctx)
+        except (TypeError, ValueError, LookupError, AttributeError) as e:
+            # Malformed request data: let the handler answer it
+            logger.debug(f"Request {ctx.request_id} is not cacheable: {e}")
+            return None
+
+    @staticmethod
+    def tags(route, ctx) -> tuple:
+        """Tags of a cacheable request's entry besides its type's (see schedule_week_tags)"""
+        return tuple(route.cache_tags(ctx)) if route.cache_tags is not None else ()
+
+    def get_or_compute(self, cache_type: str, key: tuple, compute: Callable[[], Any], request_id: Any = None,
+                       serialized: bool = False, tags: Iterable[str] = ()) -> Tuple[Any, bool]:
+        """
+        (response, computed): the cached response, or the one compute() returned (stored when
+        successful). Concurrent requests for the same key share one compute(). With serialized,
+        cached responses come as a SerializedResponse (sent without re-encoding).
+        """
+        if not self._available():
+            return compute(), True
+        computed = []
+
+        def loader():
+            computed.append(True)
+            return compute()
+
+        response = self.cache.get_or_compute(cache_type, loader, *key, tags=tags, cacheable=_is_success,
+                                             serialized=serialized)
+        if serialized and not computed:
+            response = SerializedResponse(response, request_id=request_id)
+        return response, bool(computed)
+
+    def _async_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.async_workers,
+                                                    thread_name_prefix='response-cache')
+            return self._executor
+
+    async def get_or_compute_async(self, cache_type: str, key: tuple, compute: Callable[[], Awaitable[Any]],
+                                   request_id: Any = None, serialized: bool = False,
+                                   tags: Iterable[str] = ()) -> Tuple[Any, bool]:
+        """
+        get_or_compute() for coroutine handlers. The blocking cache calls (Redis, recomputation
+        locks, waits for another caller's result) run on this cache's own threads, compute() is
+        awaited on the event loop; those threads are not the default executor's, which the
+        handlers themselves may need (e.g. CircuitBreaker.check_async) while a thread waits.
+        """
+        if not self._available():
+            return await compute(), True
+        loop = asyncio.get_running_loop()
+
+        def compute_on_loop():
+            return asyncio.run_coroutine_threadsafe(compute(), loop).result()
+
+        # The handler runs with the caller's context variables (query stats, request scope)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._async_executor(), context.run, self.get_or_compute,
+                                          cache_type, key, compute_on_loop, request_id, serialized, tags)
+
+    def invalidate_tables(self, tables: Union[Writes, Iterable[str]],
+                          weeks: Optional[Iterable[date]] = None) -> Set[str]:
+        """
+        Invalidate the cache types made stale by writes to tables, returns the types invalidated
+        as a whole. With the weeks of the rows written to WEEK_SCOPED tables (None = unknown),
+        a type only made stale by those is invalidated for these weeks only.
+        """
+        tables = _as_writes(tables)
+        cache_types = cache_types_for(tables)
+        tags = set()
+        if weeks:
+            for cache_type, scoped_tables in WEEK_SCOPED.items():
+                if cache_type in cache_types and _stale_tables(cache_type, tables) <= scoped_tables:
+                    cache_types.discard(cache_type)
+                    tags.update(week_tag(week) for week in weeks)
+                    tags.add(LONG_RANGE_TAG)
+        if cache_types or tags:
+            self.cache.invalidate_tags(*(f"type:{cache_type}" for cache_type in sorted(cache_types)), *sorted(tags))
+            logger.info(f"Invalidated cached {', '.join(sorted(cache_types) + sorted(tags))} "
+                        f"after writes to {', '.join(sorted(tables))}")
+        return cache_types
+
+
+def _updated_columns(context, table) -> Optional[FrozenSet[str]]:
+    """Columns an UPDATE sets (its bind parameters named after a column), None when unknown"""
+    compiled = context.compiled
+    columns = {key for key in list(compiled.column_keys or ()) + list(compiled.binds) if key in table.c}
+    return frozenset(columns) or None
+
+
+def _merge(writes: Dict[str, Optional[FrozenSet[str]]], table: str, columns: Optional[FrozenSet[str]]):
+    if table in writes:
+        columns = None if columns is None or writes[table] is None else writes[table] | columns
+    writes[table] = columns
+
+
+def _merge_weeks(info: dict, name: str, weeks: Optional[Set[date]]):
+    """Add weeks to info[name]; None (unknown) absorbs everything"""
+    known = info.get(name, set())
+    info[name] = None if weeks is None or known is None else known | weeks
+
+
+def _week_of_start(start) -> Optional[date]:
+    if start is None:
+        return None
+    return week_of(start.date() if isinstance(start, datetime) else start)
+
+
+def _attribute_values(target, name: str) -> list:
+    """Values an attribute had and has in this flush, without loading it (empty when expired)"""
+    history = inspect(target).attrs[name].history
+    return [*history.added, *history.unchanged, *history.deleted]
+
+
+def _shift_weeks(connection, shift: Shift) -> Set[Optional[date]]:
+    return {_week_of_start(start) for start in _attribute_values(shift, 'shift_start_datetime')} or {None}
+
+
+def _shift_worker_weeks(connection, worker: ShiftWorker) -> Set[Optional[date]]:
+    """Weeks of the shift(s) of an assignment: from the session's identity map, else one query"""
+    weeks = set()
+    session = object_session(worker)
+    for shift_id in _attribute_values(worker, 'shiftID') or [None]:
+        if shift_id is None:
+            return {None}
+        shift = session.identity_map.get(identity_key(Shift, shift_id)) if session is not None else None
+        start = shift.__dict__.get('shift_start_datetime') if shift is not None else None
+        if start is None:
+            start = connection.scalar(select(Shift.shift_start_datetime).where(Shift.id == shift_id))
+        weeks.add(_week_of_start(start))
+    return weeks
+
+
+_ROW_WEEKS = {Shift: _shift_weeks, ShiftWorker: _shift_worker_weeks}
+
+
+def _describe_rows(mapper, connection, target):
+    """
+    Mapper before_insert / before_update / before_delete: an ORM flush calls it for every
+    row of a table before it runs the table's statements, which then count as touching
+    these weeks (describing_weeks is cleared by the after_* event once they ran)
+    """
+    if not connection.info.get('watch_writes'):
+        return
+    weeks = _ROW_WEEKS[mapper.class_](connection, target)
+    _merge_weeks(connection.info.setdefault('describing_weeks', {}), mapper.local_table.name,
+                 None if None in weeks else weeks)
+
+
+def _described_rows(mapper, connection, target):
+    connection.info.get('describing_weeks', {}).pop(mapper.local_table.name, None)
+
+
+def _listen_for_row_weeks():
+    for model in _ROW_WEEKS:
+        if not event.contains(model, 'before_insert', _describe_rows):
+            for operation in ('insert', 'update', 'delete'):
+                event.listen(model, f'before_{operation}', _describe_rows)
+                event.listen(model, f'after_{operation}', _described_rows)
+
+
+def watch_writes(engine, on_commit: Callable[[Writes, Optional[Set[date]]], Any]):
+    """
+    Collects the tables written (INSERT / UPDATE / DELETE, ORM or Core) on each connection
+    of an engine, with the columns UPDATEs set, and hands the committed ones to on_commit
+    when the connection goes back to the pool, i.e. once the commit has completed (the
+    commit event fires before it); a rollback discards them.
+
+    on_commit also gets the weeks of the WEEK_TABLES rows written, None when a statement
+    on them did not come from an ORM flush (bulk / Core writes) or a row's week is unknown.
+    """
+    _listen_for_row_weeks()
+
+    @event.listens_for(engine, 'checkout')
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['watch_writes'] = True
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _written(conn, cursor, statement, parameters, context, executemany):
+        if context is None or not (context.isinsert or context.isupdate or context.isdelete):
+            return
+        table = getattr(getattr(context.compiled, 'statement', None), 'table', None)
+        if table is not None:
+            columns = _updated_columns(context, table) if context.isupdate else None
+            _merge(conn.info.setdefault('written_tables', {}), table.name, columns)
+            if table.name in WEEK_TABLES:
+                _merge_weeks(conn.info, 'written_weeks', conn.info.get('describing_weeks', {}).get(table.name))
+
+    @event.listens_for(engine, 'commit')
+    def _committed(conn):
+        tables = conn.info.pop('written_tables', None)
+        if tables:
+            committed = conn.info.setdefault('committed_tables', {})
+            for table, columns in tables.items():
+                _merge(committed, table, columns)
+        if 'written_weeks' in conn.info:
+            _merge_weeks(conn.info, 'committed_weeks', conn.info.pop('written_weeks'))
+
+    @event.listens_for(engine, 'rollback')
+    def _rolled_back(conn):
+        for name in ('written_tables', 'written_weeks', 'describing_weeks'):
+            conn.info.pop(name, None)
+
+    @event.listens_for(engine, 'checkin')
+    def _checked_in(dbapi_connection, connection_record):
+        tables = connection_record.info.pop('committed_tables', None)
+        weeks = connection_record.info.pop('committed_weeks', None)
+        if tables:
+            try:
+                on_commit(tables, weeks)
+            except Exception as e:
+                logger.error(f"Cache invalidation after commit failed: {e}")
+
+
+# Global response cache (router.response_cache)
+response_cache = ResponseCache()
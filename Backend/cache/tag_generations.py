@@ -0,0 +1,92 @@
+"""
+Cache Tag Generations for EasyShifts
+Every cache entry is tagged (its cache type, the user / job / shift it is about, the
+schedule) and its key embeds the current generation of each tag. Invalidating a tag is
+one INCR: the entries built with the old generation are never read again and expire.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TagGenerations:
+    """
+    Generation counters of cache tags, stored in Redis (without TTL) and remembered
+    in-process while `trusted()` says bumps from other instances are being received.
+    """
+
+    def __init__(self, get_connection: Callable[[], Any], prefix: str,
+                 trusted: Optional[Callable[[], bool]] = None, clock: Callable[[], float] = time.time):
+        """
+        Parameters:
+            get_connection (callable): Returns a Redis client.
+            prefix (str): Redis key prefix of the counters.
+            trusted (callable): True while remembered generations are kept up to date
+                (subscribed to the invalidation channel); otherwise every lookup reads Redis.
+            clock (callable): Wall clock seeding new counters.
+        """
+        self.get_connection = get_connection
+        self.prefix = prefix
+        self.trusted = trusted or (lambda: False)
+        self.clock = clock
+        self._known: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, tag: str) -> str:
+        return f"{self.prefix}{tag}"
+
+    def get(self, tags: List[str]) -> List[int]:
+        """Current generation of each tag (one MGET for the ones not remembered)"""
+        trusted = self.trusted()
+        with self._lock:
+            known = dict(self._known) if trusted else {}
+        missing = [tag for tag in tags if tag not in known]
+        if missing:
+            client = self.get_connection()
+            values = client.mget([self._key(tag) for tag in missing])
+            unset = [tag for tag, value in zip(missing, values) if value is None]
+            if unset:
+                # Seeded from the clock rather than 0 so that a counter lost from Redis does not
+                # bring back the entries written under its old generations
+                seed = int(self.clock() * 1000)
+                pipeline = client.pipeline(transaction=False)
+                for tag in unset:
+                    pipeline.set(self._key(tag), seed, nx=True)
+                pipeline.mget([self._key(tag) for tag in unset])
+                seeded = dict(zip(unset, pipeline.execute()[-1]))
+                values = [seeded[tag] if value is None else value for tag, value in zip(missing, values)]
+            fetched = {tag: int(value) for tag, value in zip(missing, values)}
+            known.update(fetched)
+            if trusted:
+                self.apply(fetched)
+        return [known[tag] for tag in tags]
+
+    def bump(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Increment the tags in one round trip, returns their new generations"""
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return {}
+        pipeline = self.get_connection().pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(self._key(tag))
+        generations = dict(zip(tags, (int(value) for value in pipeline.execute())))
+        self.apply(generations)
+        return generations
+
+    def apply(self, generations: Dict[str, int]):
+        """Remember generations (published by another instance, or read / bumped here)"""
+        with self._lock:
+            for tag, generation in generations.items():
+                if generation > self._known.get(tag, -1):
+                    self._known[tag] = generation
+
+    def clear(self):
+        with self._lock:
+            self._known.clear()
+
+    def __len__(self) -> int:
+        return len(self._known)
@@ -10,27 +10,5 @@ next_sunday = _calculate_next_sunday()
 
 DAYS_OF_WEEK = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
 
-# TEMPORARY COMPATIBILITY LAYER
-# This provides the old 'db' variable for backward compatibility
-# while we transition to proper session management
-try:
-    from main import create_session
-    db = create_session()
-    print("✅ Temporary db session created for backward compatibility")
-except Exception as e:
-    print(f"⚠️  Could not create temporary db session: {e}")
-    db = None
-
-# The global 'db' session is being phased out.
-# New code should call main.create_session() from main.py
-# Example in a handler:
-# from main import create_session
-# db_session = create_session()
-# try:
-#     # ... use db_session ...
-#     db_session.commit() # if changes were made
-# except:
-#     db_session.rollback()
-#     raise
-# finally:
-#     db_session.close()
+# The old global 'db' session (opened at import) is gone: importing a module must not
+# touch the database. Use main.get_db_session() or a controller's repository session.
@@ -5,15 +5,94 @@ Handles Redis connection, session management, and caching
 
 import os
 import json
+import time
 import asyncio
 import logging
+import threading
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, timedelta
 import redis
 from contextlib import asynccontextmanager
 
+from db.circuit_breaker import CircuitBreaker, DatabaseUnavailable
+from db.pool_metrics import Histogram
+
 logger = logging.getLogger(__name__)
 
+# Redis command latency histogram bucket upper bounds in milliseconds
+COMMAND_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class RedisCommandMetrics:
+    """Latency histogram and error count per Redis command (for /metrics)"""
+
+    def __init__(self):
+        self.latency_ms: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, command: str, elapsed_ms: float, failed: bool):
+        with self._lock:
+            histogram = self.latency_ms.get(command)
+            if histogram is None:
+                histogram = self.latency_ms[command] = Histogram(COMMAND_BUCKETS_MS)
+            histogram.observe(elapsed_ms)
+            if failed:
+                self.errors[command] = self.errors.get(command, 0) + 1
+
+    def collect(self) -> list:
+        with self._lock:
+            return [{'command': command, 'errors': self.errors.get(command, 0),
+                     'buckets': list(zip(histogram.buckets, histogram.cumulative_counts())),
+                     'count': histogram.count, 'sum': histogram.sum}
+                    for command, histogram in sorted(self.latency_ms.items())]
+
+
+redis_command_metrics = RedisCommandMetrics()
+
+# Opens after repeated connection errors: commands then fail at once instead of each waiting
+# for the socket timeout; the first command after REDIS_BREAKER_RESET_SECONDS is the probe
+redis_breaker = CircuitBreaker(
+    'redis',
+    failure_threshold=int(os.getenv('REDIS_BREAKER_FAILURE_THRESHOLD', '3')),
+    reset_timeout=float(os.getenv('REDIS_BREAKER_RESET_SECONDS', '30')),
+)
+
+
+class TimedRedis(redis.Redis):
+    """
+    redis.Redis that records the latency of every command in redis_command_metrics and
+    fails fast with redis.ConnectionError while redis_breaker is open
+    """
+
+    @staticmethod
+    def _check_breaker():
+        try:
+            redis_breaker.check()
+        except DatabaseUnavailable as e:
+            raise redis.ConnectionError(f"Redis is unavailable, retrying in {e.retry_after:.0f}s") from e
+
+    def pipeline(self, *args, **kwargs):
+        self._check_breaker()
+        return super().pipeline(*args, **kwargs)
+
+    def execute_command(self, *args, **options):
+        self._check_breaker()
+        started_at = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute_command(*args, **options)
+            failed = False
+            redis_breaker.record_success()
+            return result
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            redis_breaker.record_failure(e)
+            raise
+        finally:
+            redis_command_metrics.observe(str(args[0]).upper() if args else 'UNKNOWN',
+                                          (time.perf_counter() - started_at) * 1000, failed)
+
+
 class RedisConfig:
     """Redis configuration and connection management"""
     
@@ -35,10 +114,13 @@ class RedisConfig:
         self.session_timeout = int(os.getenv('SESSION_TIMEOUT_MINUTES', '480')) * 60  # 8 hours in seconds
         self.session_prefix = 'easyshifts:session:'
         self.cache_prefix = 'easyshifts:cache:'
+        self.cache_tag_prefix = 'easyshifts:cachetag:'
+        self.cache_lock_prefix = 'easyshifts:cachelock:'
         self.websocket_prefix = 'easyshifts:ws:'
         
         # Initialize connections
         self._sync_pool = None
+        self._binary_pool = None
         self._async_pool = None
         
     def get_redis_url(self) -> str:
@@ -47,32 +129,59 @@ class RedisConfig:
             return f"redis://:{self.password}@{self.host}:{self.port}/{self.db}"
         return f"redis://{self.host}:{self.port}/{self.db}"
     
+    def _create_pool(self, decode_responses: bool) -> redis.ConnectionPool:
+        return redis.ConnectionPool(
+            host=self.host,
+            port=self.port,
+            password=self.password,
+            db=self.db,
+            max_connections=self.max_connections,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            retry_on_timeout=self.retry_on_timeout,
+            decode_responses=decode_responses
+        )
+
     def get_sync_connection(self) -> redis.Redis:
         """Get synchronous Redis connection with connection pooling"""
         if not self._sync_pool:
-            self._sync_pool = redis.ConnectionPool(
-                host=self.host,
-                port=self.port,
-                password=self.password,
-                db=self.db,
-                max_connections=self.max_connections,
-                socket_timeout=self.socket_timeout,
-                socket_connect_timeout=self.socket_connect_timeout,
-                retry_on_timeout=self.retry_on_timeout,
-                decode_responses=True
-            )
+            self._sync_pool = self._create_pool(decode_responses=True)
         
-        return redis.Redis(connection_pool=self._sync_pool)
+        return TimedRedis(connection_pool=self._sync_pool)
+
+    def get_binary_connection(self) -> redis.Redis:
+        """Synchronous Redis connection returning bytes (cache values may be compressed)"""
+        if not self._binary_pool:
+            self._binary_pool = self._create_pool(decode_responses=False)
+
+        return TimedRedis(connection_pool=self._binary_pool)
     
     async def get_async_connection(self) -> redis.Redis:
         """Get asynchronous Redis connection using redis-py (compatible with Python 3.13)"""
         # For now, return sync connection - we'll upgrade to async later when aioredis is compatible
         return self.get_sync_connection()
     
+    def prewarm(self, connections: int = 2) -> int:
+        """Open `connections` pooled connections with a PING each; returns how many were opened"""
+        pool = self.get_sync_connection().connection_pool
+        opened = []
+        try:
+            for _ in range(min(connections, self.max_connections)):
+                connection = pool.get_connection()
+                opened.append(connection)
+                connection.send_command('PING')
+                connection.read_response()
+        finally:
+            for connection in opened:
+                pool.release(connection)
+        return len(opened)
+
     async def close_connections(self):
         """Close all Redis connections"""
         if self._sync_pool:
             self._sync_pool.disconnect()
+        if self._binary_pool:
+            self._binary_pool.disconnect()
 
 # Global Redis configuration instance
 redis_config = RedisConfig()
@@ -223,6 +332,9 @@ session_manager = RedisSessionManager()
 
 class RedisCacheManager:
     """Manages application caching in Redis"""
+
+    # Deletes a lock only if it still holds the caller's token
+    RELEASE_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
     
     def __init__(self, config: RedisConfig = None):
         self.config = config or redis_config
@@ -230,18 +342,22 @@ class RedisCacheManager:
     def _get_cache_key(self, key: str) -> str:
         """Get Redis key for cache"""
         return f"{self.config.cache_prefix}{key}"
+
+    def _get_lock_key(self, key: str) -> str:
+        """Get Redis key for the recomputation lock of a cache key"""
+        return f"{self.config.cache_lock_prefix}{key}"
     
     def set_cache(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set cache value with TTL"""
+        return self.set_cache_raw(key, json.dumps(value, default=str), ttl)
+
+    def set_cache_raw(self, key: str, data: Union[str, bytes], ttl: int = 3600) -> bool:
+        """Set an already serialized cache value with TTL"""
         try:
-            redis_client = self.config.get_sync_connection()
+            redis_client = self.config.get_binary_connection()
             cache_key = self._get_cache_key(key)
             
-            redis_client.setex(
-                cache_key,
-                ttl,
-                json.dumps(value, default=str)
-            )
+            redis_client.setex(cache_key, ttl, data)
             
             return True
             
@@ -251,20 +367,39 @@ class RedisCacheManager:
     
     def get_cache(self, key: str) -> Optional[Any]:
         """Get cache value"""
+        cached_data = self.get_cache_raw(key)
+        return json.loads(cached_data) if cached_data else None
+
+    def get_cache_raw(self, key: str) -> Optional[bytes]:
+        """Get the serialized cache value (bytes)"""
         try:
-            redis_client = self.config.get_sync_connection()
+            redis_client = self.config.get_binary_connection()
             cache_key = self._get_cache_key(key)
             
-            cached_data = redis_client.get(cache_key)
-            if cached_data:
-                return json.loads(cached_data)
-            
-            return None
+            return redis_client.get(cache_key) or None
             
         except Exception as e:
             logger.error(f"Failed to get cache {key}: {e}")
             return None
     
+    def acquire_lock(self, key: str, token: str, ttl_seconds: float) -> Optional[bool]:
+        """Take the short lock of a cache key (SET NX PX); None when Redis could not be asked"""
+        try:
+            redis_client = self.config.get_sync_connection()
+            return bool(redis_client.set(self._get_lock_key(key), token, nx=True, px=int(ttl_seconds * 1000)))
+        except Exception as e:
+            logger.warning(f"Failed to lock cache {key}: {e}")
+            return None
+
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock taken with token (left alone when it expired and was taken by someone else)"""
+        try:
+            redis_client = self.config.get_sync_connection()
+            return bool(redis_client.eval(self.RELEASE_LOCK_SCRIPT, 1, self._get_lock_key(key), token))
+        except Exception as e:
+            logger.warning(f"Failed to unlock cache {key}: {e}")
+            return False
+
     def delete_cache(self, key: str) -> bool:
         """Delete cache value"""
         try:
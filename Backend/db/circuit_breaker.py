@@ -0,0 +1,205 @@
+"""
+Database Circuit Breaker for EasyShifts
+Retry with jittered backoff for connection errors, and a circuit breaker that makes
+requests fail fast with DatabaseUnavailable while the database is down instead of
+piling up handlers that each wait for a connection timeout
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, DisconnectionError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DATABASE_UNAVAILABLE_ERROR = "Database is temporarily unavailable, please retry shortly."
+
+
+class DatabaseUnavailable(RuntimeError):
+    """Raised instead of connecting while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float, cause: Optional[str] = None):
+        super().__init__(DATABASE_UNAVAILABLE_ERROR if cause is None else f"{DATABASE_UNAVAILABLE_ERROR} ({cause})")
+        self.retry_after = retry_after
+
+    def to_response(self, request_id: Any) -> dict:
+        """Structured error response for the client"""
+        return {"request_id": request_id, "success": False, "error": DATABASE_UNAVAILABLE_ERROR,
+                "error_code": "database_unavailable", "retry_after": round(self.retry_after, 1)}
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through and connection failures are counted.
+    Open: calls fail with DatabaseUnavailable until reset_timeout has passed.
+    Half open: the first caller after that runs the probe (SELECT 1); success closes
+    the breaker, failure opens it again. Other callers keep failing fast meanwhile.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 probe: Optional[Callable[[], Any]] = None, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def check(self):
+        """Raises DatabaseUnavailable while open; runs the half-open probe when it is due"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN or self.clock() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise DatabaseUnavailable(self.retry_after())
+            if self.probe is None:
+                # Without a probe the next real call is the probe
+                self.state = HALF_OPEN
+                return
+            self.state = HALF_OPEN
+
+        try:
+            self.probe()
+        except Exception as e:
+            self.record_failure(e)
+            raise DatabaseUnavailable(self.retry_after(), str(e)) from e
+        self.record_success()
+
+    async def check_async(self):
+        """check() for the event loop: a due probe runs on the default executor"""
+        if self.state == CLOSED:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.check)
+
+    def record_success(self):
+        with self._lock:
+            if self.state == OPEN:
+                # A connection opened before the breaker tripped, proves nothing
+                return
+            if self.state == HALF_OPEN:
+                logger.info(f"Circuit breaker {self.name} closed, {self.name} is reachable again")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.times_opened += 1
+                logger.error(f"Circuit breaker {self.name} opened after {self.failures} connection failure(s): "
+                             f"{error}; failing fast for {self.reset_timeout}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_after': round(self.retry_after(), 1) if self.state != CLOSED else 0.0,
+            'times_opened': self.times_opened,
+            'rejected': self.rejected,
+            'last_error': self.last_error,
+        }
+
+
+def watch_engine(engine, breaker: CircuitBreaker):
+    """Feeds an engine's connection successes and failures into a circuit breaker"""
+
+    @event.listens_for(engine, 'checkout')
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        breaker.record_success()
+
+    @event.listens_for(engine, 'handle_error')
+    def _failed(context):
+        # Failed connects and dropped connections; query errors (deadlocks, constraint
+        # violations) say nothing about the database being reachable
+        if context.connection is None or context.is_disconnect:
+            breaker.record_failure(context.original_exception)
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class RetryPolicy:
+    """Retries connection errors with exponential backoff and full jitter"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None, jitter: Callable[[], float] = random.random):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number attempt (0-based)"""
+        return self.jitter() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def _raise_if_open(self, error: BaseException):
+        # This failure tripped the breaker, no point in retrying
+        if self.breaker is not None and self.breaker.state == OPEN:
+            raise DatabaseUnavailable(self.breaker.retry_after(), str(error)) from error
+
+    def _should_retry(self, attempt: int, error: BaseException) -> bool:
+        if attempt + 1 >= self.attempts:
+            logger.error(f"Database connection failed after {self.attempts} attempts: {error}")
+            return False
+        logger.warning(f"Database connection error (attempt {attempt + 1}/{self.attempts}): {error}")
+        return True
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Runs func, retrying connection errors. Never sleeps on an event loop thread:
+        there the first error is raised right away.
+        """
+        for attempt in range(self.attempts):
+            if self.breaker is not None:
+                self.breaker.check()
+            try:
+                return func()
+            except (OperationalError, DisconnectionError) as e:
+                self._raise_if_open(e)
+                if _on_event_loop_thread() or not self._should_retry(attempt, e):
+                    raise
+            time.sleep(self.delay(attempt))
+
+    async def call_async(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """call() for coroutines, waiting with asyncio.sleep"""
+        for attempt in range(self.attempts):
+            if self.breaker is not None:
+                await self.breaker.check_async()
+            try:
+                return await func()
+            except (OperationalError, DisconnectionError) as e:
+                self._raise_if_open(e)
+                if not self._should_retry(attempt, e):
+                    raise
+            await asyncio.sleep(self.delay(attempt))
@@ -34,26 +34,76 @@ class BaseController:
         """
         return self.repository.create_entity(entity_data)
 
-    def get_entity(self, entity_id: str) -> EntityType:
+    def create_entities(self, entities_data: list[dict]) -> list[EntityType]:
+        """
+        Creates several entities using the associated repository (one INSERT, one commit).
+
+        Parameters:
+            entities_data (list[dict]): Dictionaries containing entity data.
+
+        Returns:
+            List[EntityType]: The created entities, in input order.
+        """
+        return self.repository.create_entities(entities_data)
+
+    def update_entities(self, updates: list[dict]) -> int:
+        """
+        Updates several entities by primary key using the associated repository.
+
+        Parameters:
+            updates (list[dict]): Primary key column(s) plus the columns to change, per entity.
+
+        Returns:
+            int: Number of entities updated.
+        """
+        return self.repository.update_entities(updates)
+
+    def delete_where(self, *criteria, **filters) -> int:
+        """
+        Deletes every entity matching the given criteria using the associated repository.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        return self.repository.delete_where(*criteria, **filters)
+
+    def get_entity(self, entity_id: str, options: tuple = ()) -> EntityType:
         """
         Retrieves an entity using the associated repository.
 
         Parameters:
             entity_id (str): ID of the entity to retrieve.
+            options (tuple): Loader options for its relationships (see db/loading.py).
 
         Returns:
             EntityType: The retrieved entity if found, else None.
         """
-        return self.repository.get_entity(entity_id)
+        return self.repository.get_entity(entity_id, options)
+
+    def get_entities_by_ids(self, entity_ids, options: tuple = ()) -> list[EntityType]:
+        """
+        Retrieves several entities by their IDs using the associated repository (one IN query).
 
-    def get_all_entities(self) -> list[EntityType]:
+        Parameters:
+            entity_ids (Iterable): IDs of the entities to retrieve.
+            options (tuple): Loader options for their relationships (see db/loading.py).
+
+        Returns:
+            List[EntityType]: The entities found, in the order of entity_ids.
+        """
+        return self.repository.get_entities_by_ids(entity_ids, options)
+
+    def get_all_entities(self, options: tuple = ()) -> list[EntityType]:
         """
         Retrieves all entities using the associated repository.
 
+        Parameters:
+            options (tuple): Loader options for their relationships (see db/loading.py).
+
         Returns:
             List[EntityType]: A list of all entities.
         """
-        return self.repository.get_all_entities()
+        return self.repository.get_all_entities(options)
 
     def update_entity(self, entity_id: str, updated_data: dict) -> EntityType:
         """
@@ -7,7 +7,7 @@ from typing import List
 
 
 class ClientCompaniesController(BaseController):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         self.repository = ClientCompaniesRepository(db)
         self.service = ClientCompaniesService(self.repository)
         super().__init__(self.repository, self.service)
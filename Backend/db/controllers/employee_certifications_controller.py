@@ -10,7 +10,7 @@ class EmployeeCertificationsController(BaseController):
     Controller for managing employee certifications.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         self.repository = EmployeeCertificationsRepository(db)
         self.service = EmployeeCertificationsService(self.repository)
         super().__init__(self.repository, self.service)
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from main import get_scoped_session
+
 from ..models import (
     CompanyProfile, UserManagementSettings, CertificationsSettings,
     ClientManagementSettings
@@ -26,8 +28,8 @@ class ExtendedSettingsController:
     Controller for managing extended settings across all categories.
     """
 
-    def __init__(self, db_session: Session):
-        self.db_session = db_session
+    def __init__(self, db_session: Session = None):
+        self.db_session = get_scoped_session(db_session)
 
     def get_all_extended_settings(self) -> Dict[str, Any]:
         """
@@ -6,8 +6,34 @@ from db.controllers.base_controller import BaseController
 from typing import List, Dict # Corrected: Dict instead of dict
 
 
+def convert_job_for_client(job: Job) -> dict:
+    """
+    Converts a job to a dictionary format for client-side consumption.
+
+    Parameters:
+        job (Job): The job to convert.
+
+    Returns:
+        dict: A dictionary representation of the job.
+    """
+    return {
+        "id": job.id,
+        "name": job.name,
+        "client_company_id": job.client_company_id,
+        "venue_name": job.venue_name,
+        "venue_address": job.venue_address,
+        "venue_contact_info": job.venue_contact_info,
+        "description": job.description,
+        "created_by": job.created_by,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "is_active": job.is_active,
+        "estimated_start_date": job.estimated_start_date.isoformat() if job.estimated_start_date else None,
+        "estimated_end_date": job.estimated_end_date.isoformat() if job.estimated_end_date else None
+    }
+
+
 class JobsController(BaseController):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         self.repository = JobsRepository(db)
         self.service = JobsService(self.repository)
         super().__init__(self.repository, self.service)
@@ -18,20 +44,7 @@ class JobsController(BaseController):
         job_data should include: name, client_company_id, venue_name, venue_address
         """
         job = self.service.create_job(job_data)
-        return {
-            "id": job.id,
-            "name": job.name,
-            "client_company_id": job.client_company_id,
-            "venue_name": job.venue_name,
-            "venue_address": job.venue_address,
-            "venue_contact_info": job.venue_contact_info,
-            "description": job.description,
-            "created_by": job.created_by,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "is_active": job.is_active,
-            "estimated_start_date": job.estimated_start_date.isoformat() if job.estimated_start_date else None,
-            "estimated_end_date": job.estimated_end_date.isoformat() if job.estimated_end_date else None
-        }
+        return convert_job_for_client(job)
 
     def get_jobs_by_workplace_id(self, workplace_id: int) -> List[dict]:
         """
@@ -54,22 +67,7 @@ class JobsController(BaseController):
         Since there's only one company, all managers can see all jobs.
         """
         jobs = self.service.get_all_active_jobs()
-        return [
-            {
-                "id": job.id,
-                "name": job.name,
-                "client_company_id": job.client_company_id,
-                "venue_name": job.venue_name,
-                "venue_address": job.venue_address,
-                "venue_contact_info": job.venue_contact_info,
-                "description": job.description,
-                "created_by": job.created_by,
-                "created_at": job.created_at.isoformat() if job.created_at else None,
-                "is_active": job.is_active,
-                "estimated_start_date": job.estimated_start_date.isoformat() if job.estimated_start_date else None,
-                "estimated_end_date": job.estimated_end_date.isoformat() if job.estimated_end_date else None
-            } for job in jobs
-        ]
+        return [convert_job_for_client(job) for job in jobs]
 
     def get_jobs_by_client_company_id(self, client_company_id: int):
         """
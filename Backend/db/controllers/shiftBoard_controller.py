@@ -7,7 +7,7 @@ from config.constants import next_sunday
 
 
 class ShiftBoardController:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         self.repository = ShiftBoardRepository(db)
         self.service = ShiftBoardService(self.repository)
 
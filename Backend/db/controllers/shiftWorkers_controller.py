@@ -5,6 +5,7 @@ from db.controllers.base_controller import BaseController
 from db.repositories.shiftWorkers_repository import ShiftWorkersRepository
 from db.services.shiftWorkers_service import ShiftWorkersService
 from db.models import EmployeeType, ShiftWorker
+from db.unit_of_work import commit_or_flush
 
 
 class ShiftWorkersController(BaseController):
@@ -14,12 +15,13 @@ class ShiftWorkersController(BaseController):
     Controller class for managing ShiftWorker entities.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         """
         Initializes the ShiftWorkersController with a database session.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
         """
         self.repository = ShiftWorkersRepository(db)
         self.service = ShiftWorkersService(self.repository)
@@ -60,16 +62,17 @@ class ShiftWorkersController(BaseController):
         """
         return self.repository.get_worker_shifts_by_worker_id(worker_id)
 
-    def get_shift_workers_by_shift_id(self, shift_id: str):
+    def get_shift_workers_by_shift_id(self, shift_id: str, options: tuple = ()):
         """
         Retrieves all workers for a shift by shift ID.
         Args:
             shift_id (str): ID of the shift to retrieve workers for.
+            options (tuple): Loader options, e.g. db.loading.SHIFT_WORKER_WITH_USER.
 
         Returns:
             List[ShiftWorker]: A list of all workers for the shift.
         """
-        return self.repository.get_shift_workers_by_shift_id(shift_id)
+        return self.repository.get_shift_workers_by_shift_id(shift_id, options)
 
     def is_shift_assigned_to_worker(self, shift_id: str, worker_id: str):
         """
@@ -162,8 +165,8 @@ class ShiftWorkersController(BaseController):
                 if hasattr(shift_worker, key):
                     setattr(shift_worker, key, value)
 
-            self.repository.db.commit()
-            self.repository.db.refresh(shift_worker)
+            if commit_or_flush(self.repository.db):
+                self.repository.db.refresh(shift_worker)
             return shift_worker
         return None
 
@@ -191,7 +194,7 @@ class ShiftWorkersController(BaseController):
                 # Recalculate hours when submitting
                 sw.calculate_total_hours()
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
         except Exception as e:
             print(f"Error submitting timesheet: {e}")
@@ -221,7 +224,7 @@ class ShiftWorkersController(BaseController):
                 sw.approved_at = datetime.now()
                 sw.approved_by = approved_by_id
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
         except Exception as e:
             print(f"Error approving timesheet: {e}")
@@ -297,7 +300,7 @@ class ShiftWorkersController(BaseController):
                 sw.approved_at = None
                 sw.approved_by = None
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
         except Exception as e:
             print(f"Error rejecting timesheet: {e}")
@@ -364,7 +367,7 @@ class ShiftWorkersController(BaseController):
             # Recalculate total hours
             shift_worker.calculate_total_hours()
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
 
         except Exception as e:
@@ -388,7 +391,7 @@ class ShiftWorkersController(BaseController):
             shift_worker.marked_absent_by = manager_id
             shift_worker.current_status = 'absent'
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
 
         except Exception as e:
@@ -407,7 +410,7 @@ class ShiftWorkersController(BaseController):
 
             shift_worker.shift_notes = notes
 
-            self.repository.db.commit()
+            commit_or_flush(self.repository.db)
             return True
 
         except Exception as e:
@@ -443,15 +446,13 @@ class ShiftWorkersController(BaseController):
         Generate a draft timesheet for a shift.
         """
         try:
-            from ..controllers.users_controller import UsersController
             from ..controllers.shifts_controller import ShiftsController
+            from ..loading import SHIFT_WITH_WORKERS
 
-            workers = self.get_workers_by_shift_id(shift_id)
-            users_controller = UsersController(self.repository.db)
+            # Shift, its workers and their users in two queries
             shifts_controller = ShiftsController(self.repository.db)
-
-            # Get shift details
-            shift = shifts_controller.get_shift_by_id(shift_id)
+            shift = shifts_controller.get_entity(shift_id, SHIFT_WITH_WORKERS)
+            workers = shift.workers
 
             timesheet_data = {
                 'shift_id': shift_id,
@@ -470,7 +471,7 @@ class ShiftWorkersController(BaseController):
             }
 
             for worker in workers:
-                user = users_controller.get_entity(worker.userID)
+                user = worker.user
 
                 worker_data = {
                     'user_id': worker.userID,
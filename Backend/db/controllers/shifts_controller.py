@@ -1,13 +1,14 @@
 from datetime import date, datetime
-from main import get_db_session
 from sqlalchemy import Date
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 from typing import List
 from typing import List
 from db.controllers.base_controller import BaseController
 from db.models import Shift
 from db.repositories.shifts_repository import ShiftsRepository
+from db.repositories.shiftWorkers_repository import ShiftWorkersRepository
+from db.loading import SHIFT_WITH_WORKERS
 from db.services.shifts_service import ShiftsService
 from db.controllers.shiftWorkers_controller import ShiftWorkersController
 
@@ -19,12 +20,13 @@ class ShiftsController(BaseController):
     Controller class for managing shift entities.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         """
         Initializes the ShiftsController with a database session.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
         """
         self.repository = ShiftsRepository(db)
         self.service = ShiftsService(self.repository)
@@ -160,23 +162,12 @@ class ShiftsController(BaseController):
             List of shifts within the date range
         """
         try:
-            from sqlalchemy import and_, or_
+            from sqlalchemy import or_
             from ..models import Shift, Job, User
+            from ..repositories.shifts_repository import shift_start_in_range
 
-            query = self.repository.db.query(Shift)
-
-            # Filter by date range - check both new datetime fields and legacy date fields
-            date_filter = or_(
-                and_(
-                    Shift.shift_start_datetime >= start_date,
-                    Shift.shift_start_datetime <= end_date
-                ),
-                and_(
-                    Shift.shiftDate >= start_date,
-                    Shift.shiftDate <= end_date
-                )
-            )
-            query = query.filter(date_filter)
+            # One half-open range on the indexed start column (legacy fields are derived from it)
+            query = self.repository.db.query(Shift).filter(*shift_start_in_range(start_date, end_date))
 
             # Filter by workplace if specified
             if workplace_id:
@@ -187,7 +178,7 @@ class ShiftsController(BaseController):
                     User.id == workplace_id  # For manager's own workplace
                 ))
 
-            return query.order_by(Shift.shift_start_datetime.asc(), Shift.shiftDate.asc()).all()
+            return query.order_by(Shift.shift_start_datetime.asc(), Shift.id.asc()).all()
 
         except Exception as e:
             print(f"Error getting shifts by date range: {e}")
@@ -212,47 +203,50 @@ def convert_shift_for_client(shift: Shift, db, is_manager=True) -> dict:
     If the user is a manager, the dictionary will also include the workers assigned to the shift.
 
     Parameters:
-        shift (Shift): The shift to convert.
+        shift (Shift): The shift to convert. Loading it with db.loading.SHIFT_WITH_WORKERS
+            avoids a query for its workers.
         db (Session): SQLAlchemy Session for database interactions.
         is_manager (bool): A boolean indicating whether the user is a manager.
 
     Returns:
         dict: A dictionary representation of the shift.
     """
-    with get_db_session() as session:
-        shift_workers_controller = ShiftWorkersController(session)
-
-        shifts_for_client = {
-            'id': shift.id,
-            'job_id': shift.job_id,
-            "required_employee_counts": shift.required_employee_counts if shift.required_employee_counts else {},
-            "client_po_number": shift.client_po_number if shift.client_po_number else "",
-            "shift_description": shift.shift_description if shift.shift_description else "",
-            "special_instructions": shift.special_instructions if shift.special_instructions else ""
-        }
-
-        # Add new datetime fields if available
-        if hasattr(shift, 'shift_start_datetime') and shift.shift_start_datetime:
-            shifts_for_client['shift_start_datetime'] = shift.shift_start_datetime.isoformat()
-            if hasattr(shift, 'shift_end_datetime') and shift.shift_end_datetime:
-                shifts_for_client['shift_end_datetime'] = shift.shift_end_datetime.isoformat()
-
-        # Add legacy fields for backward compatibility
-        if hasattr(shift, 'shiftDate') and shift.shiftDate:
-            shifts_for_client['shiftDate'] = shift.shiftDate.isoformat()
-        if hasattr(shift, 'shiftPart') and shift.shiftPart:
-            shifts_for_client['shiftPart'] = shift.shiftPart.value
-
-        if is_manager:
-            workers = shift_workers_controller.convert_shift_workers_by_shift_id_to_client(shift.id)
-            shifts_for_client["workers"] = workers
-
-        return shifts_for_client
+    shifts_for_client = {
+        'id': shift.id,
+        'job_id': shift.job_id,
+        "required_employee_counts": shift.required_employee_counts if shift.required_employee_counts else {},
+        "client_po_number": shift.client_po_number if shift.client_po_number else "",
+        "shift_description": shift.shift_description if shift.shift_description else "",
+        "special_instructions": shift.special_instructions if shift.special_instructions else ""
+    }
+
+    # Add new datetime fields if available
+    if hasattr(shift, 'shift_start_datetime') and shift.shift_start_datetime:
+        shifts_for_client['shift_start_datetime'] = shift.shift_start_datetime.isoformat()
+        if hasattr(shift, 'shift_end_datetime') and shift.shift_end_datetime:
+            shifts_for_client['shift_end_datetime'] = shift.shift_end_datetime.isoformat()
+
+    # Add legacy fields for backward compatibility
+    if hasattr(shift, 'shiftDate') and shift.shiftDate:
+        shifts_for_client['shiftDate'] = shift.shiftDate.isoformat()
+    if hasattr(shift, 'shiftPart') and shift.shiftPart:
+        shifts_for_client['shiftPart'] = shift.shiftPart.value
+
+    if is_manager:
+        if 'workers' in shift.__dict__:
+            # Already loaded together with the shift
+            workers = ShiftWorkersRepository.convert_shift_workers_to_client(shift.workers)
+        else:
+            workers = ShiftWorkersController(db).convert_shift_workers_by_shift_id_to_client(shift.id)
+        shifts_for_client["workers"] = workers
+
+    return shifts_for_client
 
 
 def convert_shifts_for_client(shifts: list[Shift], db, is_manager=True) -> list[dict]:
     """
     Converts a list of shifts to a dictionary format for client-side consumption.
+    For managers the workers of all shifts are loaded in one query up front.
 
     Parameters:
         shifts (List[Shift]): The shifts to convert.
@@ -262,4 +256,8 @@ def convert_shifts_for_client(shifts: list[Shift], db, is_manager=True) -> list[
     Returns:
         List[dict]: A list of dictionary representations of the shifts.
     """
+    if is_manager and shifts:
+        # Populates Shift.workers (and ShiftWorker.user) on the shifts already in their session
+        session = object_session(shifts[0]) or db
+        session.query(Shift).filter(Shift.id.in_([shift.id for shift in shifts])).options(*SHIFT_WITH_WORKERS).all()
     return [convert_shift_for_client(shift, db, is_manager) for shift in shifts]
@@ -13,12 +13,13 @@ class UserRequestsController(BaseController):
     Controller class for managing UserRequest entities.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         """
         Initializes the UserRequestsController with a database session.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
         """
         self.repository = UserRequestsRepository(db)
         self.service = UserRequestsService(self.repository)
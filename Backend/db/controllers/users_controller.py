@@ -13,12 +13,13 @@ class UsersController(BaseController):
     Controller class for managing user entities.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         """
         Initializes the UserController with a database session.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
         """
         self.repository = UsersRepository(db)
         self.service = UsersService(self.repository)
@@ -233,6 +234,15 @@ class UsersController(BaseController):
         """
         return self.repository.get_user_by_email(email)
 
+    def get_active_employees(self):
+        """
+        Get all active employees (non-manager users).
+
+        Returns:
+            List[User]: List of active employees.
+        """
+        return self.repository.get_active_employees()
+
     def get_all_approved_workers(self):
         """
         Get all approved workers (non-manager users).
@@ -15,12 +15,13 @@ class WorkPlacesController(BaseController):
     Controller class for managing workPlaces entities.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         """
         Initializes the WorkPlacesController with a database session.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
         """
         self.repository = WorkPlacesRepository(db)
         self.service = WorkPlacesService(self.repository)
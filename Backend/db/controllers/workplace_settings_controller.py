@@ -10,7 +10,7 @@ class WorkplaceSettingsController(BaseController):
     Controller for managing workplace settings.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         self.repository = WorkplaceSettingsRepository(db)
         self.service = WorkplaceSettingsService(self.repository)
         super().__init__(self.repository, self.service)
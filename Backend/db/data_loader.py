@@ -0,0 +1,195 @@
+"""
+Data Loader for EasyShifts
+Per-request batching of primary key lookups: every get_entity() made while handling one
+message goes through the request session's DataLoader, which memoizes results and
+coalesces lookups into batched "WHERE id IN (...)" queries
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from db.models import Base
+
+DATA_LOADER_KEY = 'data_loader'
+MAX_BATCH_SIZE = int(os.getenv('DB_DATALOADER_MAX_BATCH', '500'))
+
+# entity class -> [(foreign key attribute, referenced entity class)]
+_foreign_keys: Dict[type, List[Tuple[str, type]]] = {}
+_foreign_keys_lock = threading.Lock()
+
+
+def _single_id_primary_key(entity_type: type):
+    """The primary key column when it is a single column named 'id', else None"""
+    primary_key = inspect(entity_type).primary_key
+    if len(primary_key) == 1 and primary_key[0].key == 'id':
+        return primary_key[0]
+    return None
+
+
+def _get_foreign_keys(entity_type: type) -> List[Tuple[str, type]]:
+    """Foreign key attributes of an entity that reference another entity's id"""
+    foreign_keys = _foreign_keys.get(entity_type)
+    if foreign_keys is not None:
+        return foreign_keys
+
+    with _foreign_keys_lock:
+        tables = {mapper.local_table: mapper.class_ for mapper in Base.registry.mappers}
+        mapper = inspect(entity_type)
+        foreign_keys = []
+        for attr in mapper.column_attrs:
+            for column in attr.columns:
+                for fk in column.foreign_keys:
+                    target = tables.get(fk.column.table)
+                    if target is not None and fk.column.key == 'id' and _single_id_primary_key(target) is not None:
+                        foreign_keys.append((attr.key, target))
+        _foreign_keys[entity_type] = foreign_keys
+    return foreign_keys
+
+
+class DataLoader:
+    """
+    Memoizing, batching primary key loader bound to one session.
+
+    Rows loaded through the session announce the ids they reference (e.g. a ShiftWorker
+    announces its userID). The first lookup of any User id then fetches that id together
+    with every announced User id in one IN query, so loops like
+
+        for sw in shift_workers:
+            users_controller.get_entity(sw.userID)
+
+    cost one query instead of one per iteration. Entities already in the session's
+    identity map are returned without a query.
+    """
+
+    def __init__(self, session: Session, max_batch_size: int = MAX_BATCH_SIZE):
+        self.session = session
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[type, Set[Any]] = defaultdict(set)
+        # Strong references, the identity map alone would let unused batch rows be collected
+        self._entities: Dict[Tuple[type, Any], Any] = {}
+        # Ids known not to exist
+        self._absent: Set[Tuple[type, Any]] = set()
+
+        # Metrics
+        self.hits = 0
+        self.batched_queries = 0
+        self.batched_ids = 0
+
+    def track(self, instance):
+        """Announce the ids a freshly loaded row references"""
+        for attr, target in _get_foreign_keys(type(instance)):
+            value = instance.__dict__.get(attr)
+            if value is not None:
+                self._pending[target].add(value)
+
+    def prime(self, entity_type: type, ids: Iterable[Any]):
+        """Announce ids that are about to be looked up"""
+        self._pending[entity_type].update(i for i in ids if i is not None)
+
+    def _cached(self, entity_type: type, entity_id: Any):
+        """A loaded entity that is still persistent in the session, else None"""
+        entity = self._entities.get((entity_type, entity_id))
+        if entity is None:
+            entity = self.session.identity_map.get(self.session.identity_key(entity_type, entity_id))
+        if entity is not None and not inspect(entity).persistent:
+            # Deleted (or expunged) since it was loaded
+            self._entities.pop((entity_type, entity_id), None)
+            return None
+        return entity
+
+    @staticmethod
+    def _normalize(primary_key, entity_id: Any) -> Any:
+        """Handlers often pass ids as strings, the identity map is keyed by the column type"""
+        if isinstance(entity_id, str):
+            try:
+                if primary_key.type.python_type is int:
+                    return int(entity_id)
+            except (NotImplementedError, ValueError):
+                pass
+        return entity_id
+
+    def load(self, entity_type: type, entity_id: Any):
+        """Load one entity by id (None if it does not exist)"""
+        return self.load_many(entity_type, [entity_id]).get(
+            self._normalize(_single_id_primary_key(entity_type), entity_id))
+
+    def load_many(self, entity_type: type, ids: Iterable[Any]) -> Dict[Any, Any]:
+        """Load several entities by id in as few queries as possible, keyed by id"""
+        primary_key = _single_id_primary_key(entity_type)
+        ids = [self._normalize(primary_key, i) for i in ids if i is not None]
+
+        found = {}
+        missing = set()
+        for entity_id in ids:
+            entity = self._cached(entity_type, entity_id)
+            if entity is not None:
+                found[entity_id] = entity
+                self.hits += 1
+            elif (entity_type, entity_id) not in self._absent:
+                missing.add(entity_id)
+
+        if missing:
+            pending = self._pending.pop(entity_type, set())
+            batch = list(missing)
+            # Fill the batch with announced ids that are not loaded yet
+            for entity_id in pending:
+                if len(batch) >= self.max_batch_size:
+                    self._pending[entity_type].add(entity_id)
+                elif (entity_id not in found and (entity_type, entity_id) not in self._absent
+                      and self._cached(entity_type, entity_id) is None):
+                    batch.append(entity_id)
+            batch = list(dict.fromkeys(batch))
+
+            for start in range(0, len(batch), self.max_batch_size):
+                chunk = batch[start:start + self.max_batch_size]
+                rows = self.session.query(entity_type).filter(primary_key.in_(chunk)).all()
+                self.batched_queries += 1
+                self.batched_ids += len(chunk)
+                loaded = set()
+                for row in rows:
+                    entity_id = getattr(row, primary_key.key)
+                    loaded.add(entity_id)
+                    self._entities[(entity_type, entity_id)] = row
+                    if entity_id in missing:
+                        found[entity_id] = row
+                self._absent.update((entity_type, entity_id) for entity_id in chunk if entity_id not in loaded)
+
+        return found
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'batched_queries': self.batched_queries,
+            'batched_ids': self.batched_ids,
+            'pending': sum(len(ids) for ids in self._pending.values()),
+        }
+
+
+def enable_data_loader(session: Session) -> DataLoader:
+    """Attach a DataLoader to a session (done for every request scope session)"""
+    loader = session.info.get(DATA_LOADER_KEY)
+    if loader is None:
+        loader = DataLoader(session)
+        session.info[DATA_LOADER_KEY] = loader
+    return loader
+
+
+def get_data_loader(session: Session) -> Optional[DataLoader]:
+    """The session's DataLoader, or None when batching is not enabled for it"""
+    return session.info.get(DATA_LOADER_KEY) if session is not None else None
+
+
+def data_loader_enabled() -> bool:
+    return os.getenv('DB_DATALOADER_ENABLED', 'true').lower() == 'true'
+
+
+@event.listens_for(Base, 'load', propagate=True)
+def _track_loaded_instance(target, context):
+    loader = get_data_loader(context.session)
+    if loader is not None:
+        loader.track(target)
@@ -0,0 +1,94 @@
+"""
+Relationship Loading for EasyShifts
+Loader option presets for the Shift / Job / ClientCompany / ShiftWorker / User graph,
+and a guard that turns accidental lazy loads into errors
+"""
+
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
+
+from db.models import Shift, Job, ShiftWorker
+
+# Many-to-one parents are joined into the same SELECT, collections are loaded with one
+# extra "WHERE id IN (...)" query per relationship, however many parents there are.
+# Every preset ends with raiseload('*') on the loaded children so anything not listed
+# here fails instead of silently issuing one query per row.
+
+JOB_WITH_CLIENT = (
+    joinedload(Job.client_company).raiseload('*'),
+)
+
+SHIFT_WITH_JOB = (
+    joinedload(Shift.job).joinedload(Job.client_company).raiseload('*'),
+)
+
+SHIFT_WITH_WORKERS = (
+    selectinload(Shift.workers).joinedload(ShiftWorker.user).raiseload('*'),
+)
+
+SHIFT_DETAILS = SHIFT_WITH_JOB + SHIFT_WITH_WORKERS
+
+SHIFT_WORKER_WITH_USER = (
+    joinedload(ShiftWorker.user).raiseload('*'),
+)
+
+SHIFT_WORKER_WITH_SHIFT = (
+    joinedload(ShiftWorker.shift).joinedload(Shift.job).joinedload(Job.client_company).raiseload('*'),
+)
+
+# Applied last to refuse every relationship not loaded by an explicit option
+NO_LAZY_LOADS = (raiseload('*'),)
+
+
+class LazyLoadError(InvalidRequestError):
+    """Raised when a relationship is lazy loaded on a guarded session"""
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    if orm_execute_state.lazy_loaded_from is not None:
+        state = orm_execute_state.lazy_loaded_from
+        raise LazyLoadError(
+            f"Lazy load issued from {state.class_.__name__} {state.identity}; "
+            f"load the relationship with a loader option (see db/loading.py)"
+        )
+
+
+def guard_lazy_loads(session: Session) -> Session:
+    """Make every lazy load on a session raise LazyLoadError"""
+    if not event.contains(session, 'do_orm_execute', _raise_on_lazy_load):
+        event.listen(session, 'do_orm_execute', _raise_on_lazy_load)
+    return session
+
+
+def allow_lazy_loads(session: Session) -> Session:
+    """Remove the lazy load guard from a session"""
+    if event.contains(session, 'do_orm_execute', _raise_on_lazy_load):
+        event.remove(session, 'do_orm_execute', _raise_on_lazy_load)
+    return session
+
+
+@contextmanager
+def no_lazy_loads(session: Session):
+    """
+    Context manager refusing lazy loads on a session for the duration of a block.
+
+    Usage:
+        with no_lazy_loads(session):
+            payload = convert_shifts_for_client(shifts, session)
+    """
+    already_guarded = event.contains(session, 'do_orm_execute', _raise_on_lazy_load)
+    guard_lazy_loads(session)
+    try:
+        yield session
+    finally:
+        if not already_guarded:
+            allow_lazy_loads(session)
+
+
+def lazy_load_guard_enabled() -> bool:
+    """True when DB_RAISE_ON_LAZY_LOAD asks for every session to be guarded (tests, staging)"""
+    return os.getenv('DB_RAISE_ON_LAZY_LOAD', 'false').lower() == 'true'
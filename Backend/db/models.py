@@ -1,7 +1,8 @@
 import datetime
 from datetime import time
 from sqlalchemy import Column, String, Boolean, Date, Enum, PrimaryKeyConstraint, ForeignKey, DateTime, JSON, func, \
-    Integer, Float, Text, Time
+    Integer, Float, Text, Time, Index
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from uuid import uuid4
@@ -64,8 +65,16 @@ class User(Base):
     google_picture = Column(String(500), nullable=True)
     last_login = Column(DateTime, nullable=True)
 
+    # Indexes (added to existing databases by migrations/versions/v0001_hot_path_indexes.py)
+    __table_args__ = (
+        Index('ix_users_client_company', 'client_company_id'),
+        Index('ix_users_role_flags', 'isManager', 'isActive', 'isApproval'),
+    )
+
     # Relationships
     certifications = relationship("EmployeeCertification", back_populates="user", uselist=False)
+    shift_assignments = relationship("ShiftWorker", back_populates="user", foreign_keys="ShiftWorker.userID",
+                                     passive_deletes=True)
 
 
 class ClientCompany(Base):
@@ -82,6 +91,9 @@ class ClientCompany(Base):
     name = Column(String(NAMES_LEN * 2), unique=True, nullable=False)
     # Add other client company details here, e.g., address, contact_person
 
+    # Relationships
+    jobs = relationship("Job", back_populates="client_company", passive_deletes=True)
+
 
 class Job(Base):
     """
@@ -125,6 +137,15 @@ class Job(Base):
     estimated_start_date = Column(Date, nullable=True)
     estimated_end_date = Column(Date, nullable=True)
 
+    __table_args__ = (
+        Index('ix_jobs_client_company', 'client_company_id', 'is_active'),
+    )
+
+    # Relationships
+    client_company = relationship("ClientCompany", back_populates="jobs")
+    creator = relationship("User", foreign_keys=[created_by])
+    shifts = relationship("Shift", back_populates="job", passive_deletes=True)
+
 
 class WorkPlace(Base):
     """
@@ -164,6 +185,30 @@ class ShiftPart(enum.Enum):
     Evening = 'evening'
 
 
+# Start and end hour of each legacy shift part
+SHIFT_PART_HOURS = {
+    ShiftPart.Morning: (8, 12),
+    ShiftPart.Noon: (12, 17),
+    ShiftPart.Evening: (17, 22),
+}
+
+
+def shift_part_for(start: datetime.datetime) -> ShiftPart:
+    """The legacy shift part a start time falls in"""
+    if start.hour < SHIFT_PART_HOURS[ShiftPart.Noon][0]:
+        return ShiftPart.Morning
+    if start.hour < SHIFT_PART_HOURS[ShiftPart.Evening][0]:
+        return ShiftPart.Noon
+    return ShiftPart.Evening
+
+
+def legacy_shift_times(shift_date: datetime.date, shift_part: ShiftPart) -> tuple:
+    """Start and end datetimes of a shift given in the legacy date + part format"""
+    start_hour, end_hour = SHIFT_PART_HOURS[shift_part or ShiftPart.Morning]
+    return (datetime.datetime.combine(shift_date, time(start_hour)),
+            datetime.datetime.combine(shift_date, time(end_hour)))
+
+
 class Shift(Base):
     """
     Represents shifts in the system for Hands on Labor.
@@ -180,7 +225,7 @@ class Shift(Base):
         shift_description (str): Description of what this specific shift involves (e.g., "Setup Day", "Event Day", "Teardown").
         special_instructions (str): Any special instructions specific to this shift.
 
-        # Legacy fields for backward compatibility
+        # Legacy fields, derived from shift_start_datetime on every write
         shiftDate (Date): DEPRECATED - Use shift_start_datetime instead.
         shiftPart (str): DEPRECATED - Use shift_start_datetime instead.
 
@@ -192,12 +237,12 @@ class Shift(Base):
     job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
 
     # Datetime fields
-    shift_start_datetime = Column(DateTime, nullable=True)  # Will become required after migration
+    shift_start_datetime = Column(DateTime, nullable=False)  # Canonical start, all date range queries use it
     shift_end_datetime = Column(DateTime, nullable=True)
 
-    # Legacy fields for backward compatibility
-    shiftDate = Column(Date, nullable=True)  # Made nullable for migration
-    shiftPart = Column(Enum(ShiftPart), nullable=True)  # Made nullable for migration
+    # Legacy fields for backward compatibility (derived, see _derive_legacy_shift_fields)
+    shiftDate = Column(Date, nullable=True)
+    shiftPart = Column(Enum(ShiftPart), nullable=True)
 
     # Shift-specific information
     required_employee_counts = Column(JSON, nullable=True)
@@ -207,6 +252,74 @@ class Shift(Base):
 
     # Note: venue_name and venue_address removed - inherited from job
 
+    __table_args__ = (
+        Index('ix_shifts_start_datetime', 'shift_start_datetime'),
+        Index('ix_shifts_date_part', 'shiftDate', 'shiftPart'),
+        Index('ix_shifts_job_start', 'job_id', 'shift_start_datetime'),
+    )
+
+    # Relationships
+    job = relationship("Job", back_populates="shifts")
+    workers = relationship("ShiftWorker", back_populates="shift", passive_deletes=True)
+
+
+@event.listens_for(Shift, 'before_insert')
+@event.listens_for(Shift, 'before_update')
+def _derive_legacy_shift_fields(mapper, connection, shift):
+    """
+    Keeps shift_start_datetime the single source of truth: shifts still created in the
+    legacy date + part format get their datetimes from it, updates of only shiftDate /
+    shiftPart move the start accordingly, and shiftDate / shiftPart are then always
+    rewritten from the start time.
+    """
+    if shift.shift_start_datetime is None and shift.shiftDate is not None:
+        shift.shift_start_datetime, legacy_end = legacy_shift_times(shift.shiftDate, shift.shiftPart)
+        if shift.shift_end_datetime is None:
+            shift.shift_end_datetime = legacy_end
+    elif shift.shiftDate is not None:
+        _move_to_legacy_fields(shift)
+
+    if shift.shift_start_datetime is not None:
+        shift.shiftDate = shift.shift_start_datetime.date()
+        shift.shiftPart = shift_part_for(shift.shift_start_datetime)
+
+
+def _move_to_legacy_fields(shift):
+    """
+    Moves a stored shift whose shiftDate / shiftPart were changed without its start: to the
+    new date at the same time of day, or to the start hour of the new part. The end moves with it.
+    """
+    state = inspect(shift)
+    if not state.has_identity or state.attrs.shift_start_datetime.history.has_changes():
+        return
+    part_changed = state.attrs.shiftPart.history.has_changes()
+    if not part_changed and not state.attrs.shiftDate.history.has_changes():
+        return
+
+    old_start = shift.shift_start_datetime
+    if part_changed:
+        new_start = legacy_shift_times(shift.shiftDate, shift.shiftPart)[0]
+    else:
+        new_start = datetime.datetime.combine(shift.shiftDate, old_start.time())
+    if shift.shift_end_datetime is not None and not state.attrs.shift_end_datetime.history.has_changes():
+        shift.shift_end_datetime += new_start - old_start
+    shift.shift_start_datetime = new_start
+
+
+def derive_legacy_shift_values(values: dict) -> dict:
+    """
+    The column values of a bulk Shift UPDATE (which skips the mapper events) with shiftDate /
+    shiftPart derived from shift_start_datetime. Raises ValueError for rows changing only the
+    legacy fields: without the stored start they cannot be moved consistently.
+    """
+    start = values.get('shift_start_datetime')
+    if start is not None:
+        return {**values, 'shiftDate': start.date(), 'shiftPart': shift_part_for(start)}
+    if 'shiftDate' in values or 'shiftPart' in values:
+        raise ValueError("Bulk shift updates must set shift_start_datetime, "
+                         "shiftDate and shiftPart are derived from it")
+    return values
+
 
 class ShiftWorker(Base):
     """
@@ -273,8 +386,15 @@ class ShiftWorker(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('shiftID', 'userID', 'role_assigned'),
+        # The primary key leads with shiftID, lookups by worker need their own index
+        Index('ix_shift_workers_user', 'userID', 'shiftID'),
+        Index('ix_shift_workers_times_submitted', 'times_submitted_at'),
     )
 
+    # Relationships
+    shift = relationship("Shift", back_populates="workers")
+    user = relationship("User", back_populates="shift_assignments", foreign_keys=[userID])
+
     def get_time_pairs(self):
         """Get all clock in/out time pairs as a list."""
         pairs = []
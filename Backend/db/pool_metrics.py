@@ -0,0 +1,225 @@
+"""
+Connection Pool Metrics for EasyShifts
+In-process telemetry of the database pool from SQLAlchemy pool events: checked-out
+gauge, overflow, timeouts, invalidations, checkout wait and hold time histograms,
+connections held too long (with the request holding them), and a pool size
+recommendation derived from the observed load
+"""
+
+import math
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+HOLD_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Checkouts waiting longer than this at p95 mean the pool is too small for the load
+WAIT_TARGET_MS = 50
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative buckets, like Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf when beyond the last bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return float(self.buckets[index]) if index < len(self.buckets) else math.inf
+        return math.inf
+
+    def cumulative_counts(self) -> List[int]:
+        """Observations at or below each bucket bound, the last entry being +Inf"""
+        cumulative, counts = 0, []
+        for bucket_count in self.counts:
+            cumulative += bucket_count
+            counts.append(cumulative)
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        # None for a quantile beyond the last bucket (JSON has no infinity)
+        quantiles = {name: self.quantile(q) for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))}
+        return {'count': self.count, 'sum': round(self.sum, 2), 'buckets': buckets,
+                **{name: value if math.isfinite(value) else None for name, value in quantiles.items()}}
+
+
+class PoolMetrics:
+    """Counters, gauges and histograms of one engine's connection pool"""
+
+    def __init__(self, long_held_seconds: float = 10.0, owner: Optional[Callable[[], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Parameters:
+            long_held_seconds (float): Connections held longer than this are reported.
+            owner (callable): Returns what is using the database right now (the request_id).
+            clock (callable): Monotonic time source.
+        """
+        self.long_held_seconds = long_held_seconds
+        self.owner = owner or (lambda: None)
+        self.clock = clock
+        self.started_at = clock()
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.long_held_count = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.hold_ms = Histogram(HOLD_BUCKETS_MS)
+        self._busy_seconds = 0.0
+        # id(connection record) -> (checked out at, owner)
+        self._held: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, engine):
+        """Listen to the pool events of an engine"""
+
+        @event.listens_for(engine, 'connect')
+        def _connected(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, 'checkout')
+        def _checked_out(dbapi_connection, connection_record, connection_proxy):
+            owner = self.owner()
+            pool = engine.pool
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+                self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+                if hasattr(pool, 'size') and pool.checkedout() > pool.size():
+                    self.overflow_checkouts += 1
+                self._held[id(connection_record)] = (self.clock(), owner)
+
+        @event.listens_for(engine, 'checkin')
+        def _checked_in(dbapi_connection, connection_record):
+            with self._lock:
+                held = self._held.pop(id(connection_record), None)
+                if held is None:
+                    return
+                self.checked_out -= 1
+                seconds = self.clock() - held[0]
+                self._busy_seconds += seconds
+                self.hold_ms.observe(seconds * 1000)
+                if seconds > self.long_held_seconds:
+                    self.long_held_count += 1
+            if seconds > self.long_held_seconds:
+                logger.warning(f"Database connection held for {seconds:.1f}s by request {held[1]}")
+
+        @event.listens_for(engine, 'invalidate')
+        def _invalidated(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    @contextmanager
+    def timed_checkout(self):
+        """Times a connection checkout (the pool wait) and counts pool timeouts"""
+        started_at = self.clock()
+        try:
+            yield
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._lock:
+                self.wait_ms.observe((self.clock() - started_at) * 1000)
+
+    def long_held(self) -> List[Dict[str, Any]]:
+        """Connections checked out for longer than long_held_seconds right now"""
+        now = self.clock()
+        with self._lock:
+            held = list(self._held.values())
+        return [{'request_id': owner, 'held_seconds': round(now - started_at, 1)}
+                for started_at, owner in held if now - started_at > self.long_held_seconds]
+
+    def average_in_use(self) -> float:
+        """Average connections checked out since the metrics started (Little's law: busy time / elapsed)"""
+        now = self.clock()
+        with self._lock:
+            busy = self._busy_seconds + sum(now - started_at for started_at, _ in self._held.values())
+        elapsed = now - self.started_at
+        return busy / elapsed if elapsed > 0 else 0.0
+
+    def recommend(self, pool_size: int, max_overflow: int, max_connections: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pool size suggested by the load seen so far.
+
+        pool_size covers the average concurrency with 50% headroom; max_overflow covers
+        the observed peak, grown by half again when checkouts waited or timed out.
+        Both are capped at max_connections (SystemAdminSettings.max_database_connections).
+        """
+        average = self.average_in_use()
+        p95_wait = self.wait_ms.quantile(0.95)
+        reasons = []
+
+        recommended_size = max(2, math.ceil(average * 1.5))
+        total = max(self.peak_checked_out, recommended_size)
+        if self.timeouts or p95_wait > WAIT_TARGET_MS:
+            total = math.ceil(total * 1.5)
+            reasons.append(f"checkouts waited (p95 {p95_wait:g} ms, {self.timeouts} timeouts)")
+        if recommended_size < pool_size and self.peak_checked_out < pool_size:
+            reasons.append(f"at most {self.peak_checked_out} of {pool_size} pooled connections were used")
+        if max_connections and total > max_connections:
+            total = max_connections
+            recommended_size = min(recommended_size, total)
+            reasons.append(f"capped at max_database_connections={max_connections}")
+
+        return {
+            'current': {'pool_size': pool_size, 'max_overflow': max_overflow},
+            'recommended': {'pool_size': recommended_size, 'max_overflow': total - recommended_size},
+            'average_in_use': round(average, 2),
+            'peak_in_use': self.peak_checked_out,
+            'sample_seconds': round(self.clock() - self.started_at),
+            'reasons': reasons,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                'checked_out': self.checked_out,
+                'peak_checked_out': self.peak_checked_out,
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'long_held_total': self.long_held_count,
+                'checkout_wait_ms': self.wait_ms.get_stats(),
+                'hold_ms': self.hold_ms.get_stats(),
+            }
+        stats['long_held'] = self.long_held()
+        return stats
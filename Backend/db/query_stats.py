@@ -0,0 +1,132 @@
+"""
+Per-Request Query Statistics for EasyShifts
+Cursor events attribute every SQL statement to the request being handled (through a
+contextvar): query count, total database time and the slowest statement. A request
+running more queries than its budget is logged with the statement shapes it repeated,
+which is how N+1 loops show up.
+"""
+
+import os
+import re
+import time
+import logging
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Statistics of the request being handled, None outside of track_queries()
+_query_stats = contextvars.ContextVar('query_stats', default=None)
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+
+
+def query_budget() -> int:
+    """Queries a request may run before it is reported (DB_QUERY_BUDGET, 0 = never)"""
+    return int(os.getenv('DB_QUERY_BUDGET', '50'))
+
+
+def statement_shape(statement: str) -> str:
+    """A statement with its literals and IN lists collapsed, equal for every loop iteration"""
+    shape = _LITERALS.sub('?', _WHITESPACE.sub(' ', statement).strip())
+    return _IN_LISTS.sub('(...)', shape)
+
+
+class QueryStats:
+    """Queries run while handling one request"""
+
+    def __init__(self, request_id: Any = None):
+        self.request_id = request_id
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        # Raw statement text -> executions; shapes are only computed when reporting
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def repeated_shapes(self, minimum: int = 2) -> List[Tuple[str, int]]:
+        """Statement shapes run at least `minimum` times, most repeated first"""
+        shapes: Counter = Counter()
+        for statement, executions in self.statements.items():
+            shapes[statement_shape(statement)] += executions
+        return [(shape, executions) for shape, executions in shapes.most_common() if executions >= minimum]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'request_id': self.request_id,
+            'queries': self.count,
+            'db_ms': round(self.total_ms, 2),
+            'slowest_ms': round(self.slowest_ms, 2),
+            'slowest_statement': self.slowest_statement,
+        }
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+# The start time is kept on the statement's execution context: after_cursor_execute does
+# not fire for a statement that raises, and nothing outlives the context to go stale
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None and context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    started = getattr(context, '_query_started_at', None)
+    if stats is not None and started is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def watch_queries(engine):
+    """Attribute the statements run on an engine to the request being tracked"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def report_over_budget(stats: QueryStats, budget: int, name: Optional[str] = None):
+    """Warn about a request that ran more than `budget` queries, naming its repeated statements"""
+    if not budget or stats.count <= budget:
+        return
+    repeated = '; '.join(f"{executions}x {shape[:200]}" for shape, executions in stats.repeated_shapes()[:3])
+    logger.warning(
+        f"Request {stats.request_id} ({name or 'unknown'}) ran {stats.count} queries "
+        f"(budget {budget}) in {stats.total_ms:.1f} ms"
+        + (f"; repeated statements (possible N+1): {repeated}" if repeated else "")
+    )
+
+
+@contextmanager
+def track_queries(request_id: Any = None, name: Optional[str] = None, budget: Optional[int] = None):
+    """
+    Collect the queries run in this block into a QueryStats, and warn when they exceed
+    the budget (DB_QUERY_BUDGET by default).
+
+    Usage:
+        with track_queries(2001, 'schedule') as stats:
+            handler(...)
+        stats.count, stats.total_ms, stats.slowest_statement
+    """
+    stats = QueryStats(request_id)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+        report_over_budget(stats, query_budget() if budget is None else budget, name)
@@ -0,0 +1,240 @@
+"""
+Schedule Read Model for EasyShifts
+Builds the enhanced schedule payload (request 2001) with a fixed number of set-based
+queries, independent of how many shifts, assignments or jobs are in the range
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, Generator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from main import get_scoped_session
+from db.models import Job, ClientCompany, Shift, ShiftWorker, User, EmployeeCertification, WorkplaceSettings
+from db.repositories.shifts_repository import shift_start_in_range
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleReadModel:
+    """
+    Read-only projection of shifts, assignments, workers, jobs and clients for a date range.
+
+    Queries issued by build():
+        1. shifts in the date range
+        2. jobs (with their client company name)
+        3. shift assignments of those shifts (with the worker name)
+        4. approved workers with their certifications (include_workers)
+        5. client companies (include_clients)
+        6. workplace settings
+
+    The payload is assembled by _steps(), a generator that yields each statement and
+    receives its result (or the exception it raised), so build() and build_async() share
+    every line of it.
+    """
+
+    def __init__(self, db: Session = None):
+        """
+        Parameters:
+            db (Session | AsyncSession): Session for database interactions (an AsyncSession
+                for build_async()). None uses the session of the current request scope.
+        """
+        self.db = get_scoped_session(db)
+
+    def build(self, start_date, end_date, view_type: str = 'week', include_workers: bool = True,
+              include_jobs: bool = True, include_clients: bool = True) -> dict:
+        """
+        Builds the schedule payload for a date range.
+
+        Parameters:
+            start_date (date): First day of the range.
+            end_date (date): Last day of the range.
+            view_type (str): Calendar view requested by the client, echoed back.
+            include_workers (bool): Include the approved worker list.
+            include_jobs (bool): Include every job, not only the jobs of the shifts in range.
+            include_clients (bool): Include the client company list.
+
+        Returns:
+            dict: The 'data' part of the 2001 response.
+        """
+        steps = self._steps(start_date, end_date, view_type, include_workers, include_jobs, include_clients)
+        try:
+            statement = next(steps)
+            while True:
+                try:
+                    result = self.db.execute(statement)
+                except Exception as e:
+                    # Raised at the yield, where _steps() may handle it
+                    statement = steps.throw(e)
+                else:
+                    statement = steps.send(result)
+        except StopIteration as done:
+            return done.value
+
+    async def build_async(self, start_date, end_date, view_type: str = 'week', include_workers: bool = True,
+                          include_jobs: bool = True, include_clients: bool = True) -> dict:
+        """build() on an AsyncSession, awaiting each query on the event loop"""
+        steps = self._steps(start_date, end_date, view_type, include_workers, include_jobs, include_clients)
+        try:
+            statement = next(steps)
+            while True:
+                try:
+                    result = await self.db.execute(statement)
+                except Exception as e:
+                    statement = steps.throw(e)
+                else:
+                    statement = steps.send(result)
+        except StopIteration as done:
+            return done.value
+
+    def _steps(self, start_date, end_date, view_type, include_workers, include_jobs,
+               include_clients) -> Generator:
+        """Yields the statements of the payload, each receiving its Result, and returns the payload"""
+        shifts = (yield select(Shift).where(*shift_start_in_range(start_date, end_date)).order_by(
+            Shift.shift_start_datetime, Shift.id)).scalars().all()
+        shift_ids = [shift.id for shift in shifts]
+
+        job_ids = None if include_jobs else {shift.job_id for shift in shifts if shift.job_id}
+        jobs = {}
+        if job_ids is None or job_ids:
+            rows = (yield self._jobs_statement(job_ids)).all()
+            jobs = {job.id: (job, client_name) for job, client_name in rows}
+
+        assignments = defaultdict(list)
+        if shift_ids:
+            assignments = self._assignments(
+                (yield select(ShiftWorker, User.name).join(User, ShiftWorker.userID == User.id).where(
+                    ShiftWorker.shiftID.in_(shift_ids)
+                ).order_by(ShiftWorker.shiftID, ShiftWorker.userID)).all())
+
+        enhanced_shifts = [self._shift_dict(shift, jobs.get(shift.job_id), assignments.get(shift.id, []))
+                           for shift in shifts]
+
+        response_data = {
+            'shifts': enhanced_shifts,
+            'view_type': view_type,
+            'date_range': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat()
+            }
+        }
+
+        if include_workers:
+            # Number of shifts in range each worker is assigned to
+            shift_counts = Counter(user_id for shift in enhanced_shifts
+                                   for user_id in {aw['user_id'] for aw in shift['assigned_workers']})
+            rows = (yield select(User, EmployeeCertification).outerjoin(
+                EmployeeCertification, EmployeeCertification.user_id == User.id
+            ).where(
+                User.isApproval == True,
+                User.isManager == False,
+                User.isActive == True
+            ).order_by(User.id)).all()
+            response_data['workers'] = self._workers(rows, shift_counts)
+
+        if include_jobs:
+            response_data['jobs'] = [self._job_dict(job, client_name) for job, client_name in jobs.values()]
+
+        if include_clients:
+            clients = (yield select(ClientCompany).order_by(ClientCompany.id)).scalars().all()
+            response_data['clients'] = [{
+                'id': client.id,
+                'companyName': client.name,
+                'name': client.name,
+                'isActive': True  # ClientCompany model doesn't have isActive field
+            } for client in clients]
+
+        try:
+            workplace_settings = (yield select(WorkplaceSettings).limit(1)).scalars().first()
+            response_data['workplace_settings'] = workplace_settings.to_dict() if workplace_settings else None
+        except Exception as e:
+            # The schedule is still served without the settings
+            logger.warning(f"Could not load workplace settings for the schedule: {e}")
+            response_data['workplace_settings'] = None
+
+        return response_data
+
+    @staticmethod
+    def _jobs_statement(job_ids: Optional[set]):
+        """Jobs as (job, client company name); job_ids=None selects every job"""
+        statement = select(Job, ClientCompany.name).outerjoin(ClientCompany, Job.client_company_id == ClientCompany.id)
+        if job_ids is not None:
+            statement = statement.where(Job.id.in_(job_ids))
+        return statement.order_by(Job.id)
+
+    @staticmethod
+    def _assignments(rows) -> Dict[int, List[dict]]:
+        """Assigned workers keyed by shift id, from (ShiftWorker, worker name) rows"""
+        assignments = defaultdict(list)
+        for sw, worker_name in rows:
+            assignments[sw.shiftID].append({
+                'user_id': sw.userID,
+                'name': worker_name,
+                'role_assigned': sw.role_assigned.value if sw.role_assigned else 'stagehand',
+                'is_approved': sw.is_approved,
+                'times_submitted_at': sw.times_submitted_at.isoformat() if sw.times_submitted_at else None
+            })
+        return assignments
+
+    @staticmethod
+    def _workers(rows, shift_counts: Counter) -> List[dict]:
+        """Approved, active non-manager workers with their certifications, from (User, certification) rows"""
+        workers = []
+        seen = set()
+        for worker, certification in rows:
+            if worker.id in seen:
+                continue
+            seen.add(worker.id)
+            workers.append({
+                'id': worker.id,
+                'name': worker.name,
+                'employee_type': worker.employee_type.value if worker.employee_type else 'stagehand',
+                'is_active': worker.isActive,
+                'certifications': certification.to_dict() if certification else None,
+                'availability_score': 100,  # Placeholder
+                'current_shifts_count': shift_counts.get(worker.id, 0)
+            })
+        return workers
+
+    @staticmethod
+    def _shift_dict(shift, job_row: Optional[tuple], assigned_workers: List[dict]) -> dict:
+        shift_dict = {
+            'id': shift.id,
+            'job_id': shift.job_id,
+            'shift_start_datetime': shift.shift_start_datetime.isoformat() if shift.shift_start_datetime else None,
+            'shift_end_datetime': shift.shift_end_datetime.isoformat() if shift.shift_end_datetime else None,
+            'client_po_number': shift.client_po_number,
+            'role_requirements': shift.required_employee_counts or {},
+            # Legacy fields for backward compatibility
+            'shiftDate': shift.shiftDate.isoformat() if shift.shiftDate else None,
+            'shiftPart': shift.shiftPart.value if shift.shiftPart else None,
+        }
+
+        if job_row:
+            job, client_name = job_row
+            shift_dict['job_name'] = job.name
+            shift_dict['job_location'] = f"{job.venue_name}, {job.venue_address}"
+            shift_dict['venue_name'] = job.venue_name
+            shift_dict['venue_address'] = job.venue_address
+            if client_name:
+                shift_dict['client_company_name'] = client_name
+
+        shift_dict['assigned_workers'] = assigned_workers
+        return shift_dict
+
+    @staticmethod
+    def _job_dict(job, client_name: Optional[str]) -> dict:
+        job_dict = {
+            'id': job.id,
+            'jobName': job.name,
+            'location': f"{job.venue_name}, {job.venue_address}",
+            'venue_name': job.venue_name,
+            'venue_address': job.venue_address,
+            'client_company_id': job.client_company_id,
+            'isActive': job.is_active
+        }
+        if client_name:
+            job_dict['client_company_name'] = client_name
+        return job_dict
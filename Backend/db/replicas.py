@@ -0,0 +1,183 @@
+"""
+Read Replicas for EasyShifts
+Chooses a replica engine for read-only requests: replicas lagging more than the
+allowed number of seconds are skipped, and a client that just wrote keeps reading
+from the primary until its write has had time to replicate (read-your-writes)
+"""
+
+import time
+import logging
+import threading
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+REPLICA_KEY = 'replica'
+
+
+class ReplicaWriteError(RuntimeError):
+    """Raised when a session bound to a read replica tries to flush changes"""
+
+
+def replication_lag(connection) -> Optional[float]:
+    """
+    Seconds a replica is behind its primary.
+
+    Returns:
+        float | None: 0.0 for a server that is not replicating (a plain second instance),
+            None when replication is configured but stopped.
+    """
+    if connection.dialect.name not in ('mysql', 'mariadb'):
+        return 0.0
+
+    row = None
+    for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+        try:
+            row = connection.exec_driver_sql(statement).mappings().first()
+            break
+        except DBAPIError:
+            # SHOW REPLICA STATUS needs MariaDB 10.5 / MySQL 8.0.22
+            continue
+    if row is None:
+        return 0.0
+
+    lag = row.get('Seconds_Behind_Master', row.get('Seconds_Behind_Source'))
+    return float(lag) if lag is not None else None
+
+
+def guard_replica_writes(session: Session, name: str):
+    """Makes a replica-bound session fail loudly instead of writing to the replica"""
+    session.info[REPLICA_KEY] = name
+
+    @event.listens_for(session, 'before_flush')
+    def _refuse_flush(session, flush_context, instances):
+        raise ReplicaWriteError(f"Session is bound to read replica '{name}'; "
+                                f"routes that write must be registered with access=WRITE")
+
+
+class Replica:
+    """One replica engine and its last measured lag"""
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.reads = 0
+        self._check_lock = threading.Lock()
+
+
+class ReplicaSet:
+    """Read replicas with lag-aware, round-robin selection and per-client write stickiness"""
+
+    def __init__(self, engines: Dict[str, Engine], max_lag: float = 5.0, check_interval: float = 5.0,
+                 sticky_seconds: Optional[float] = None,
+                 lag_probe: Callable[[Any], Optional[float]] = replication_lag,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Parameters:
+            engines (dict): Replica name -> engine.
+            max_lag (float): Replicas further behind than this many seconds are not read from.
+            check_interval (float): Seconds a measured lag is trusted before measuring again.
+            sticky_seconds (float): Seconds a client reads from the primary after a write.
+                Defaults to max_lag + check_interval, the most a used replica can be behind.
+            lag_probe (callable): Measures the lag over a replica connection.
+            clock (callable): Monotonic time source.
+        """
+        self.replicas: List[Replica] = [Replica(name, engine) for name, engine in engines.items()]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds if sticky_seconds is not None else max_lag + check_interval
+        self.lag_probe = lag_probe
+        self.clock = clock
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self._next = count()
+        self._sticky_until: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, sticky_key: Any):
+        """Send the reads of sticky_key to the primary until the write has replicated"""
+        if sticky_key is None:
+            return
+        now = self.clock()
+        with self._lock:
+            self._sticky_until[sticky_key] = now + self.sticky_seconds
+            if len(self._sticky_until) > 1000:
+                self._sticky_until = {key: until for key, until in self._sticky_until.items() if until > now}
+
+    def is_sticky(self, sticky_key: Any) -> bool:
+        if sticky_key is None:
+            return False
+        until = self._sticky_until.get(sticky_key)
+        return until is not None and until > self.clock()
+
+    def replica_for_read(self, sticky_key: Any = None) -> Optional[Replica]:
+        """
+        Picks the replica for a read-only request.
+
+        Returns:
+            Replica | None: None when the read must go to the primary (client just wrote,
+                or no replica is within max_lag).
+        """
+        if self.is_sticky(sticky_key):
+            self.sticky_reads += 1
+            return None
+
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            lag = self._current_lag(replica)
+            if lag is not None and lag <= self.max_lag:
+                replica.reads += 1
+                return replica
+
+        self.primary_reads += 1
+        return None
+
+    def _current_lag(self, replica: Replica) -> Optional[float]:
+        """Last measured lag, measured again once check_interval has passed"""
+        now = self.clock()
+        if replica.checked_at is not None and now - replica.checked_at < self.check_interval:
+            return replica.lag
+
+        # One thread measures, the others keep using the previous value meanwhile
+        if not replica._check_lock.acquire(blocking=replica.checked_at is None):
+            return replica.lag
+        try:
+            if replica.checked_at is not None and self.clock() - replica.checked_at < self.check_interval:
+                return replica.lag
+            try:
+                with replica.engine.connect() as connection:
+                    replica.lag = self.lag_probe(connection)
+                replica.error = None
+            except Exception as e:
+                logger.warning(f"Read replica {replica.name} is unavailable: {e}")
+                replica.lag = None
+                replica.error = str(e)
+            if replica.lag is not None and replica.lag > self.max_lag:
+                logger.warning(f"Read replica {replica.name} is {replica.lag:.0f}s behind, reading from the primary")
+            replica.checked_at = self.clock()
+            return replica.lag
+        finally:
+            replica._check_lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'max_lag': self.max_lag,
+            'primary_reads': self.primary_reads,
+            'sticky_reads': self.sticky_reads,
+            'replicas': [{'name': replica.name, 'lag': replica.lag, 'reads': replica.reads, 'error': replica.error}
+                         for replica in self.replicas],
+        }
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
@@ -1,9 +1,13 @@
 from __future__ import annotations
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy import inspect, update
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import declarative_base, DeclarativeMeta
 from typing import Type, TypeVar
 from db.models import User
+from main import get_scoped_session
+from db.data_loader import get_data_loader
+from db.unit_of_work import commit_or_flush
 
 Base = declarative_base()
 EntityType = TypeVar("EntityType", bound=DeclarativeMeta)
@@ -22,10 +26,11 @@ class BaseRepository:
         Initializes the BaseRepository with a database session and entity type.
 
         Parameters:
-            db (Session): SQLAlchemy Session for database interactions.
+            db (Session): SQLAlchemy Session for database interactions. None uses the
+                session of the current request scope.
             entity_type (Type[EntityType]): Type of the entity to be managed by the repository.
         """
-        self.db = db
+        self.db = get_scoped_session(db)
         self.entity_type = entity_type
 
     def create_entity(self, entity_data: dict) -> EntityType:
@@ -44,8 +49,8 @@ class BaseRepository:
 
             # Add that entity to the db, commit it and refresh it
             self.db.add(db_entity)
-            self.db.commit()
-            self.db.refresh(db_entity)
+            if commit_or_flush(self.db):
+                self.db.refresh(db_entity)
 
             # Return the created entity
             return db_entity
@@ -55,12 +60,43 @@ class BaseRepository:
             print(f"Error creating entity: {e}")
             raise
 
-    def get_entity(self, entity_id: str) -> EntityType:
+    def create_entities(self, entities_data: list[dict]) -> list[EntityType]:
+        """
+        Creates several entities with one batched INSERT and one commit.
+
+        Parameters:
+            entities_data (list[dict]): Dictionaries containing entity data.
+
+        Returns:
+            List[EntityType]: The created entities (with their generated IDs), in input order.
+        """
+        if not entities_data:
+            return []
+        try:
+            db_entities = [self.entity_type(**entity_data) for entity_data in entities_data]
+            self.db.add_all(db_entities)
+            # The INSERT runs as one executemany; generated ids are assigned here
+            self.db.flush()
+            ids = [db_entity.id for db_entity in db_entities] if self._has_id_primary_key() else None
+
+            if commit_or_flush(self.db) and ids:
+                # Reload the expired entities with one query instead of one refresh per row
+                self.db.query(self.entity_type).filter(self.entity_type.id.in_(ids)).all()
+
+            return db_entities
+        except Exception as e:
+            # Rollback the session on any error
+            self.db.rollback()
+            print(f"Error creating entities: {e}")
+            raise
+
+    def get_entity(self, entity_id: str, options: tuple = ()) -> EntityType:
         """
         Retrieves an entity by its ID.
 
         Parameters:
             entity_id (str): ID of the entity to retrieve.
+            options (tuple): Loader options for its relationships (see db/loading.py).
 
         Raises:
             NoResultFound: If the entity with the specified ID is not found.
@@ -68,21 +104,77 @@ class BaseRepository:
         Returns:
             EntityType: The retrieved entity if found, else None.
         """
-        entity = self.db.query(self.entity_type).filter(self.entity_type.id == entity_id).first()
+        loader = get_data_loader(self.db)
+        if loader is not None and not options and self._has_id_primary_key():
+            # Memoized and batched with the other lookups of this request
+            entity = loader.load(self.entity_type, entity_id)
+        else:
+            entity = self._query(options).filter(self.entity_type.id == entity_id).first()
 
         if entity is None:
             raise NoResultFound(f'Entity with ID {entity_id} not found')
 
         return entity
 
-    def get_all_entities(self) -> list[EntityType]:
+    def get_entities_by_ids(self, entity_ids, options: tuple = ()) -> list[EntityType]:
+        """
+        Retrieves several entities by their IDs with a single IN query.
+
+        Parameters:
+            entity_ids (Iterable): IDs of the entities to retrieve. Duplicates and None are ignored.
+            options (tuple): Loader options for their relationships (see db/loading.py).
+
+        Returns:
+            List[EntityType]: The entities found, in the order of entity_ids. Missing IDs are skipped.
+        """
+        entity_ids = list(dict.fromkeys(i for i in entity_ids if i is not None))
+        if not entity_ids:
+            return []
+
+        loader = get_data_loader(self.db)
+        if loader is not None and not options and self._has_id_primary_key():
+            found = loader.load_many(self.entity_type, entity_ids)
+        else:
+            rows = self._query(options).filter(self.entity_type.id.in_(entity_ids)).all()
+            found = {row.id: row for row in rows}
+
+        entities = []
+        for entity_id in entity_ids:
+            entity = found.get(entity_id)
+            if entity is None and isinstance(entity_id, str) and entity_id.isdigit():
+                entity = found.get(int(entity_id))
+            if entity is not None:
+                entities.append(entity)
+        return entities
+
+    def get_all_entities(self, options: tuple = ()) -> list[EntityType]:
         """
         Retrieves all entities from the database.
 
+        Parameters:
+            options (tuple): Loader options for their relationships (see db/loading.py).
+
         Returns:
             List[EntityType]: A list of all entities.
         """
-        return self.db.query(self.entity_type).all()
+        return self._query(options).all()
+
+    def _has_id_primary_key(self) -> bool:
+        primary_key = inspect(self.entity_type).primary_key
+        return len(primary_key) == 1 and primary_key[0].key == 'id'
+
+    def _query(self, options: tuple = ()):
+        """
+        Starts a query for the entity type with the given loader options.
+
+        Parameters:
+            options (tuple): Loader options, e.g. db.loading.SHIFT_WITH_WORKERS.
+
+        Returns:
+            Query: The query.
+        """
+        query = self.db.query(self.entity_type)
+        return query.options(*options) if options else query
 
     def update_entity(self, entity_id: str, updated_data: dict) -> EntityType | None:
         """
@@ -103,8 +195,8 @@ class BaseRepository:
             if db_entity:
                 for key, value in updated_data.items():
                     setattr(db_entity, key, value)
-                self.db.commit()
-                self.db.refresh(db_entity)
+                if commit_or_flush(self.db):
+                    self.db.refresh(db_entity)
 
             return db_entity
         except Exception as e:
@@ -130,7 +222,7 @@ class BaseRepository:
             # If it exists, delete it
             if db_entity:
                 self.db.delete(db_entity)
-                self.db.commit()
+                commit_or_flush(self.db)
 
             return db_entity
         except Exception as e:
@@ -139,5 +231,57 @@ class BaseRepository:
             print(f"Error deleting entity: {e}")
             raise
 
+    def update_entities(self, updates: list[dict]) -> int:
+        """
+        Updates several entities by primary key with one executemany UPDATE and one commit.
+
+        Parameters:
+            updates (list[dict]): One dictionary per entity holding its primary key column(s)
+                (e.g. "id", or shiftID/userID/role_assigned for shift workers) and the
+                columns to change. Rows with the same set of keys are sent in one batch.
+
+        Returns:
+            int: Number of entities updated.
+        """
+        if not updates:
+            return 0
+        try:
+            self.db.execute(update(self.entity_type), updates)
+            commit_or_flush(self.db)
+            return len(updates)
+        except Exception as e:
+            # Rollback the session on any error
+            self.db.rollback()
+            print(f"Error updating entities: {e}")
+            raise
+
+    def delete_where(self, *criteria, **filters) -> int:
+        """
+        Deletes every entity matching the given criteria with one DELETE and one commit.
+
+        Parameters:
+            *criteria: SQLAlchemy filter expressions, e.g. Shift.job_id == 5.
+            **filters: Column equality filters, e.g. shiftID=5.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        if not criteria and not filters:
+            raise ValueError("delete_where needs at least one criterion")
+        try:
+            query = self.db.query(self.entity_type)
+            if criteria:
+                query = query.filter(*criteria)
+            if filters:
+                query = query.filter_by(**filters)
+            deleted = query.delete(synchronize_session='fetch')
+            commit_or_flush(self.db)
+            return deleted
+        except Exception as e:
+            # Rollback the session on any error
+            self.db.rollback()
+            print(f"Error deleting entities: {e}")
+            raise
+
 
 
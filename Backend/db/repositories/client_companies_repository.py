@@ -4,7 +4,7 @@ from db.repositories.base_repository import BaseRepository
 
 
 class ClientCompaniesRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, ClientCompany)
 
     # Add any client company specific query methods here if needed in the future
@@ -10,7 +10,7 @@ class EmployeeCertificationsRepository(BaseRepository):
     Repository for managing employee certifications.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, EmployeeCertification)
 
     def get_by_user_id(self, user_id: int) -> Optional[EmployeeCertification]:
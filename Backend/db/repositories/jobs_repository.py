@@ -1,3 +1,4 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from db.models import Job
 from db.repositories.base_repository import BaseRepository
@@ -5,7 +6,7 @@ from typing import List
 
 
 class JobsRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, Job)
 
     def get_jobs_by_workplace_id(self, workplace_id: int) -> List[Job]:
@@ -15,12 +16,17 @@ class JobsRepository(BaseRepository):
         """
         return self.db.query(Job).filter(Job.workplace_id == workplace_id).all()
 
+    @staticmethod
+    def active_jobs_statement():
+        """SELECT of all active jobs, newest first (shared with the async read handlers)"""
+        return select(Job).where(Job.is_active == True).order_by(Job.created_at.desc())
+
     def get_all_active_jobs(self) -> List[Job]:
         """
         Retrieves all active jobs for Hands on Labor.
         Since there's only one company, all jobs are available to all managers.
         """
-        return self.db.query(Job).filter(Job.is_active == True).order_by(Job.created_at.desc()).all()
+        return self.db.execute(self.active_jobs_statement()).scalars().all()
 
     def get_jobs_by_client_company_id(self, client_company_id: int):
         """
@@ -4,13 +4,15 @@ from sqlalchemy import Date
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
 from db.models import ShiftBoard, ShiftPart
+from main import get_scoped_session
 from config.constants import next_sunday
-from db.controllers.shifts_controller import ShiftsController, convert_shift_for_client
+from db.controllers.shifts_controller import ShiftsController, convert_shifts_for_client
+from db.unit_of_work import commit_or_flush
 
 
 class ShiftBoardRepository:
-    def __init__(self, db: Session):
-        self.db = db
+    def __init__(self, db: Session = None):
+        self.db = get_scoped_session(db)
         self.shiftBoard = ShiftBoard
 
     def create_entity(self, entity_data: dict):
@@ -28,8 +30,8 @@ class ShiftBoardRepository:
 
         # Add that entity to the db, commit it and refresh it
         self.db.add(db_entity)
-        self.db.commit()
-        self.db.refresh(db_entity)
+        if commit_or_flush(self.db):
+            self.db.refresh(db_entity)
 
         # Return the created entity
         return db_entity
@@ -87,7 +89,7 @@ class ShiftBoardRepository:
             setattr(entity, key, value)
 
         # Commit the changes
-        self.db.commit()
+        commit_or_flush(self.db)
 
         # Return the updated entity
         return entity
@@ -119,7 +121,7 @@ class ShiftBoardRepository:
 
         # Delete the entity
         self.db.delete(entity)
-        self.db.commit()
+        commit_or_flush(self.db)
 
         # Return the deleted entity
         return entity
@@ -178,6 +180,9 @@ class ShiftBoardRepository:
         # Get the next Sunday date
         next_sunday_date = next_sunday
 
+        # Shifts to create as (day name, part, shift data), inserted together below
+        planned_shifts = []
+
         for i in range(7):  # Iterate over 7 days of the week
             # Calculate the date for the current day
             current_date = next_sunday_date + timedelta(days=i)
@@ -200,17 +205,16 @@ class ShiftBoardRepository:
                     "shiftPart": part,
                     "workPlaceID": workplace_id
                 }
+                planned_shifts.append((day_name, part, shift_data))
 
-                # Create a shift entity
-                shift = shift_controller.create_entity(shift_data)
-
-                # Convert the shift to a client-friendly format
-                shift_for_client = convert_shift_for_client(shift, self.db)
+        # Create all the shift entities with one commit
+        shifts = shift_controller.create_entities([shift_data for _, _, shift_data in planned_shifts])
 
-                # Get the workers list for the shift
-                workers_list = shift_for_client["workers"]
+        # Convert the shifts to a client-friendly format
+        shifts_for_client = convert_shifts_for_client(shifts, self.db)
 
-                # Referring the value `workers_list` to the corresponding key in the content_template
-                content_template[day_name][part] = workers_list
+        for (day_name, part, _), shift_for_client in zip(planned_shifts, shifts_for_client):
+            # Referring the workers list of the shift to the corresponding key in the content_template
+            content_template[day_name][part] = shift_for_client["workers"]
 
         return content_template
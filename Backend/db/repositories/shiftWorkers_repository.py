@@ -1,15 +1,18 @@
 
 from datetime import date, datetime
 from typing import List, Type, Tuple
+from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session, aliased
 from db.models import ShiftWorker, Shift, Job, ClientCompany, EmployeeType
 from db.repositories.base_repository import BaseRepository
 from db.repositories.users_repository import UsersRepository
+from db.loading import SHIFT_WORKER_WITH_USER
+from db.unit_of_work import commit_or_flush
 
 
 class ShiftWorkersRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, ShiftWorker)
 
     def get_entity_shift_worker(self, shift_id: str, user_id: str) -> Type[ShiftWorker]:
@@ -54,7 +57,7 @@ class ShiftWorkersRepository(BaseRepository):
             raise NoResultFound(f"No shift worker found with shiftID {shift_id} and userID {user_id}")
 
         self.db.delete(db_entity)
-        self.db.commit()
+        commit_or_flush(self.db)
 
     def update_shift_worker_times(self, shift_id: int, user_id: int, role_assigned: EmployeeType, clock_in_time: datetime | None, clock_out_time: datetime | None) -> Type[ShiftWorker] | None:
         """
@@ -76,8 +79,8 @@ class ShiftWorkersRepository(BaseRepository):
             db_entity.clock_in_time = clock_in_time
             db_entity.clock_out_time = clock_out_time
             db_entity.times_submitted_at = datetime.now()
-            self.db.commit()
-            self.db.refresh(db_entity)
+            if commit_or_flush(self.db):
+                self.db.refresh(db_entity)
         return db_entity
 
     def delete_entity_by_composite_key(self, shift_id: int, user_id: int, role_assigned: EmployeeType):
@@ -87,7 +90,7 @@ class ShiftWorkersRepository(BaseRepository):
         db_entity = self.get_entity_shift_worker_by_composite_key(shift_id, user_id, role_assigned)
         if db_entity:
             self.db.delete(db_entity)
-            self.db.commit()
+            commit_or_flush(self.db)
             return db_entity
         return None
 
@@ -103,17 +106,18 @@ class ShiftWorkersRepository(BaseRepository):
         """
         return self.db.query(ShiftWorker).filter(ShiftWorker.userID == worker_id).all()
 
-    def get_shift_workers_by_shift_id(self, shift_id: str) -> List[ShiftWorker]:
+    def get_shift_workers_by_shift_id(self, shift_id: str, options: tuple = ()) -> List[ShiftWorker]:
         """
         Retrieves all workers for a shift by shift ID.
 
         Parameters:
             shift_id (str): ID of the shift to retrieve workers for.
+            options (tuple): Loader options, e.g. db.loading.SHIFT_WORKER_WITH_USER.
 
         Returns:
             List[ShiftWorker]: A list of all workers for the shift.
         """
-        return self.db.query(self.entity_type).filter(self.entity_type.shiftID == shift_id).all()
+        return self._query(options).filter(self.entity_type.shiftID == shift_id).all()
 
     def is_shift_assigned_to_worker(self, shift_id: str, worker_id: str) -> bool:
         """
@@ -146,19 +150,32 @@ class ShiftWorkersRepository(BaseRepository):
         Returns:
             List[dict]: A list of dictionaries, each containing worker id, name, and role_assigned.
         """
-        users_repository = UsersRepository(self.db)
-        shift_worker_entities = self.get_shift_workers_by_shift_id(shift_id)
+        shift_worker_entities = self.get_shift_workers_by_shift_id(shift_id, SHIFT_WORKER_WITH_USER)
+        return self.convert_shift_workers_to_client(shift_worker_entities)
+
+    @staticmethod
+    def convert_shift_workers_to_client(shift_worker_entities: List[ShiftWorker]) -> list[dict]:
+        """
+        Formats already loaded shift workers (with their user loaded) for the client.
+
+        Args:
+            shift_worker_entities (List[ShiftWorker]): Shift workers loaded with SHIFT_WORKER_WITH_USER
+                or through Shift.workers with SHIFT_WITH_WORKERS.
+
+        Returns:
+            List[dict]: A list of dictionaries, each containing worker id, name, and role_assigned.
+        """
         worker_details_list = []
         for sw_entity in shift_worker_entities:
-            try:
-                user = users_repository.get_entity(sw_entity.userID)
-                worker_details_list.append({
-                    "id": user.id,
-                    "name": user.name,
-                    "role_assigned": sw_entity.role_assigned.value # Assuming role_assigned is an Enum
-                })
-            except NoResultFound:
-                print(f"Warning: User with ID {sw_entity.userID} not found during shift worker conversion for shift {shift_id}.")
+            user = sw_entity.user
+            if user is None:
+                print(f"Warning: User with ID {sw_entity.userID} not found during shift worker conversion for shift {sw_entity.shiftID}.")
+                continue
+            worker_details_list.append({
+                "id": user.id,
+                "name": user.name,
+                "role_assigned": sw_entity.role_assigned.value # Assuming role_assigned is an Enum
+            })
         return worker_details_list
 
     def get_supervised_shifts_details(self, user_id: int) -> List[dict]:
@@ -177,8 +194,13 @@ class ShiftWorkersRepository(BaseRepository):
                 - job_name (str)
                 - client_company_name (str)
         """
-        results = (
-            self.db.query(
+        return self.convert_supervised_shifts(self.db.execute(self.supervised_shifts_statement(user_id)).all())
+
+    @staticmethod
+    def supervised_shifts_statement(user_id: int):
+        """SELECT behind get_supervised_shifts_details (shared with the async read handlers)"""
+        return (
+            select(
                 Shift.id.label("shift_id"),
                 Shift.shiftDate.label("shift_date"),
                 Shift.shiftPart.label("shift_part"),
@@ -186,15 +208,18 @@ class ShiftWorkersRepository(BaseRepository):
                 Job.name.label("job_name"),
                 ClientCompany.name.label("client_company_name"),
             )
+            .select_from(ShiftWorker)
             .join(Shift, ShiftWorker.shiftID == Shift.id)
             .join(Job, Shift.job_id == Job.id)
             .join(ClientCompany, Job.client_company_id == ClientCompany.id)
-            .filter(ShiftWorker.userID == user_id)
-            .filter(ShiftWorker.role_assigned == EmployeeType.CREW_CHIEF)
-            .order_by(Shift.shiftDate.desc(), Shift.shiftPart)
-            .all()
+            .where(ShiftWorker.userID == user_id)
+            .where(ShiftWorker.role_assigned == EmployeeType.CREW_CHIEF)
+            .order_by(Shift.shift_start_datetime.desc())
         )
 
+    @staticmethod
+    def convert_supervised_shifts(results) -> List[dict]:
+        """Rows of supervised_shifts_statement() in the client format"""
         return [
             {
                 "shift_id": row.shift_id,
@@ -286,12 +311,10 @@ class ShiftWorkersRepository(BaseRepository):
             .filter(ShiftWorker.userID == employee_id)
         )
 
-        if start_date:
-            query = query.filter(Shift.shiftDate >= start_date)
-        if end_date:
-            query = query.filter(Shift.shiftDate <= end_date)
+        from db.repositories.shifts_repository import shift_start_in_range
+        query = query.filter(*shift_start_in_range(start_date or None, end_date or None))
 
-        results = query.order_by(Shift.shiftDate.desc()).all()
+        results = query.order_by(Shift.shift_start_datetime.desc()).all()
 
         timesheet_records = []
         for row in results:
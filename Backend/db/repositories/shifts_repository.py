@@ -1,32 +1,68 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 from typing import List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from db.models import Shift
+from db.models import Shift, derive_legacy_shift_values
 from db.repositories.base_repository import BaseRepository
 from db.repositories.shiftWorkers_repository import ShiftWorkersRepository
 
 
+def _parse_bound(value):
+    """ISO strings from requests: 'YYYY-MM-DD' is a whole day, anything longer a datetime"""
+    if isinstance(value, str):
+        return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    return value
+
+
+def shift_start_in_range(start=None, end=None) -> list:
+    """
+    Half-open range predicate on Shift.shift_start_datetime, the one indexed start column.
+
+    Dates are whole days, so an end date includes every shift starting on that day:
+    shift_start_in_range(date(2025, 1, 6), date(2025, 1, 12)) matches
+    2025-01-06 00:00 <= shift_start_datetime < 2025-01-13 00:00. Datetimes are used as given
+    (end exclusive). ISO strings are parsed first ('2025-01-12' is a date, '2025-01-12T18:00'
+    a datetime). A missing bound leaves that side of the range open.
+
+    Returns:
+        list: Filter criteria for query.filter(*criteria).
+    """
+    criteria = []
+    start, end = _parse_bound(start), _parse_bound(end)
+    if start is not None:
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, time.min)
+        criteria.append(Shift.shift_start_datetime >= start)
+    if end is not None:
+        if not isinstance(end, datetime):
+            end = datetime.combine(end + timedelta(days=1), time.min)
+        criteria.append(Shift.shift_start_datetime < end)
+    return criteria
+
+
 class ShiftsRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, Shift)
 
-    def get_shifts_by_job_id(self, job_id: int) -> List[Shift]:
+    def update_entities(self, updates: list[dict]) -> int:
+        """Bulk UPDATE skips the mapper events: shiftDate / shiftPart are derived here instead"""
+        return super().update_entities([derive_legacy_shift_values(values) for values in updates])
+
+    @staticmethod
+    def shifts_by_job_statement(job_id: int, options: tuple = ()):
+        """SELECT of a job's shifts ordered by start time (shared with the async read handlers)"""
+        return select(Shift).where(Shift.job_id == job_id).order_by(
+            Shift.shift_start_datetime, Shift.id).options(*options)
+
+    def get_shifts_by_job_id(self, job_id: int, options: tuple = ()) -> List[Shift]:
         """
-        Retrieves all shifts associated with a specific job ID, ordered by date and part.
+        Retrieves all shifts associated with a specific job ID, ordered by start time.
+
+        Parameters:
+            job_id (int): ID of the job.
+            options (tuple): Loader options, e.g. db.loading.SHIFT_WITH_WORKERS.
         """
-        try:
-            # Try to order by new datetime fields first, fallback to legacy fields
-            # Use COALESCE to handle NULL values instead of NULLS LAST (MariaDB compatibility)
-            from sqlalchemy import func
-            return self.db.query(Shift).filter(Shift.job_id == job_id).order_by(
-                func.coalesce(Shift.shift_start_datetime, '9999-12-31 23:59:59').asc(),
-                Shift.shiftDate,
-                Shift.shiftPart
-            ).all()
-        except Exception as e:
-            # Fallback to legacy fields only if datetime fields don't exist
-            print(f"Using legacy shift fields due to: {e}")
-            return self.db.query(Shift).filter(Shift.job_id == job_id).order_by(Shift.shiftDate, Shift.shiftPart).all()
+        return self.db.execute(self.shifts_by_job_statement(job_id, options)).scalars().all()
 
     def get_shift_by_day_and_part_and_workplace(self, day: str, part: str, workplace: int):
         return self.db.query(Shift).filter(Shift.shiftDay == day, Shift.shiftPart == part,
@@ -42,9 +78,7 @@ class ShiftsRepository(BaseRepository):
         Returns:
             List of shifts of the worker since the given date.
         """
-        return self.db.query(Shift).filter(
-            Shift.shiftDate >= given_date
-        ).all()
+        return self.db.query(Shift).filter(*shift_start_in_range(given_date)).all()
 
     def get_all_shifts_since_date_for_given_worker(self, date: date, worker_id: str) -> List[Shift]:
         """
@@ -93,8 +127,7 @@ class ShiftsRepository(BaseRepository):
         Returns: List of shifts of the workplace between the given dates.
         """
         return self.db.query(Shift).filter(
-            Shift.shiftDate >= start_date,
-            Shift.shiftDate <= end_date,
+            *shift_start_in_range(start_date, end_date),
             Shift.workPlaceID == workplace_id
         ).all()
 
@@ -112,10 +145,7 @@ class ShiftsRepository(BaseRepository):
         shift_workers_repository = ShiftWorkersRepository(self.db)
 
         # Get all shifts between the given dates
-        shifts = self.db.query(Shift).filter(
-            Shift.shiftDate >= start_date,
-            Shift.shiftDate <= end_date
-        ).all()
+        shifts = self.db.query(Shift).filter(*shift_start_in_range(start_date, end_date)).all()
 
         # Filter shifts based on the given worker ID
         shifts_for_worker = [shift for shift in shifts if
@@ -134,7 +164,8 @@ class ShiftsRepository(BaseRepository):
         Returns:
             Shift: The shift by day and part.
         """
-        return self.db.query(Shift).filter(Shift.workPlaceID == workplace_id, Shift.shiftDate == shift_date,
+        return self.db.query(Shift).filter(Shift.workPlaceID == workplace_id,
+                                           *shift_start_in_range(shift_date, shift_date),
                                            Shift.shiftPart == shift_part).first()
 
     def get_shift_by_date_and_part(self, shift_date, shift_part):
@@ -149,5 +180,5 @@ class ShiftsRepository(BaseRepository):
         Returns:
             Shift: The shift by date and part.
         """
-        return self.db.query(Shift).filter(Shift.shiftDate == shift_date,
+        return self.db.query(Shift).filter(*shift_start_in_range(shift_date, shift_date),
                                            Shift.shiftPart == shift_part).first()
@@ -4,7 +4,7 @@ from db.repositories.base_repository import BaseRepository
 
 
 class UserRequestsRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, UserRequest)
 
     def get_request_by_userid(self, id: str):
@@ -1,12 +1,14 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from db.models import User
 from db.repositories.base_repository import BaseRepository
 from db.repositories.userRequests_repository import UserRequestsRepository
 from datetime import datetime
+from db.unit_of_work import commit_or_flush
 
 
 class UsersRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, User)
 
     def delete_entity(self, entity_id: str):
@@ -99,7 +101,7 @@ class UsersRepository(BaseRepository):
         # If user is found, update isApproval attribute and commit changes
         if user:
             user.isApproval = True
-            self.db.commit()
+            commit_or_flush(self.db)
 
     def get_user_by_name(self, name: str):
         """
@@ -156,7 +158,7 @@ class UsersRepository(BaseRepository):
                 user.email = google_data.get('email')
                 user.google_picture = google_data.get('picture')
                 user.last_login = datetime.now()
-                self.db.commit()
+                commit_or_flush(self.db)
                 return True
             return False
         except Exception as e:
@@ -188,13 +190,27 @@ class UsersRepository(BaseRepository):
             )
 
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
+            if commit_or_flush(self.db):
+                self.db.refresh(new_user)
             return new_user
         except Exception as e:
             self.db.rollback()
             raise e
 
+    @staticmethod
+    def active_employees_statement():
+        """SELECT of active non-manager users (shared with the async read handlers)"""
+        return select(User).where(User.isManager == False, User.isActive == True).order_by(User.id)
+
+    def get_active_employees(self):
+        """
+        Retrieves all active employees (non-manager users).
+
+        Returns:
+            List[User]: List of active employees.
+        """
+        return self.db.execute(self.active_employees_statement()).scalars().all()
+
     def get_users_by_client_company_id(self, client_company_id: int):
         """
         Retrieves all users belonging to a specific client company.
@@ -230,7 +246,7 @@ class UsersRepository(BaseRepository):
             user = self.db.query(User).filter(User.id == user_id).first()
             if user:
                 user.last_login = datetime.now()
-                self.db.commit()
+                commit_or_flush(self.db)
                 return True
             return False
         except Exception as e:
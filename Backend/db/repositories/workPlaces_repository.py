@@ -7,7 +7,7 @@ from db.controllers.users_controller import UsersController
 
 
 class WorkPlacesRepository(BaseRepository):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, WorkPlace)
 
     def get_users_by_workplace_id(self, workplace_id: str):
@@ -3,6 +3,7 @@ from sqlalchemy.exc import NoResultFound
 from typing import Optional
 from .base_repository import BaseRepository
 from ..models import WorkplaceSettings
+from ..unit_of_work import commit_or_flush
 
 
 class WorkplaceSettingsRepository(BaseRepository):
@@ -10,7 +11,7 @@ class WorkplaceSettingsRepository(BaseRepository):
     Repository for managing workplace settings.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session = None):
         super().__init__(db, WorkplaceSettings)
 
     def get_first(self) -> Optional[WorkplaceSettings]:
@@ -43,8 +44,8 @@ class WorkplaceSettingsRepository(BaseRepository):
                 if hasattr(existing, key):
                     setattr(existing, key, value)
 
-            self.db.commit()
-            self.db.refresh(existing)
+            if commit_or_flush(self.db):
+                self.db.refresh(existing)
             return existing
         else:
             # Create new settings
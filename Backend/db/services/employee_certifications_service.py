@@ -1,9 +1,7 @@
 from typing import List, Optional
-from main import get_db_session
 from ..repositories.employee_certifications_repository import EmployeeCertificationsRepository
 from ..controllers.users_controller import UsersController
 from ..controllers.workPlaces_controller import WorkPlacesController
-from config.constants import db
 
 
 class EmployeeCertificationsService:
@@ -29,12 +27,8 @@ class EmployeeCertificationsService:
         certifications = self.repository.get_users_with_role_capability(role)
         
         employees = []
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
-        with get_db_session() as session:
-
-            workplaces_controller = WorkPlacesController(session)
+        users_controller = UsersController()
+        workplaces_controller = WorkPlacesController()
         
         for cert in certifications:
             try:
@@ -78,12 +72,8 @@ class EmployeeCertificationsService:
             List[dict]: List of employee data with certification info
         """
         employees = []
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
-        with get_db_session() as session:
-
-            workplaces_controller = WorkPlacesController(session)
+        users_controller = UsersController()
+        workplaces_controller = WorkPlacesController()
         
         # Get all active, approved employees
         if workplace_id:
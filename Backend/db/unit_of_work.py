@@ -0,0 +1,59 @@
+"""
+Unit of Work for EasyShifts
+Lets a caller stage the writes of many repository calls and commit them once
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy.orm import Session
+
+from main import get_scoped_session
+
+UNIT_OF_WORK_KEY = 'unit_of_work'
+
+
+def in_unit_of_work(session: Session) -> bool:
+    """True while a unit_of_work() block is open on the session"""
+    return bool(session.info.get(UNIT_OF_WORK_KEY))
+
+
+def commit_or_flush(session: Session) -> bool:
+    """
+    Commits the session, or only flushes it inside a unit of work.
+    Repositories call this instead of session.commit().
+
+    Returns:
+        bool: True if the session was committed.
+    """
+    if in_unit_of_work(session):
+        session.flush()
+        return False
+    session.commit()
+    return True
+
+
+@contextmanager
+def unit_of_work(session: Session = None):
+    """
+    Context manager turning repository commits into flushes and committing once at the end.
+    Rolls everything back if the block raises. Nested blocks join the outer one.
+
+    Usage:
+        with unit_of_work() as session:
+            for item in worker_times:
+                shift_workers_controller.submit_times_for_worker_on_shift(...)
+    """
+    session = get_scoped_session(session)
+    if in_unit_of_work(session):
+        yield session
+        return
+
+    session.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield session
+        session.info.pop(UNIT_OF_WORK_KEY, None)
+        session.commit()
+    except Exception:
+        session.info.pop(UNIT_OF_WORK_KEY, None)
+        session.rollback()
+        raise
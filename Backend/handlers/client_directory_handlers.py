@@ -22,15 +22,9 @@ def handle_get_client_directory(user_session: UserSession) -> dict:
 
     try:
         with get_db_session() as db:
-            with get_db_session() as session:
-
-                client_companies_controller = ClientCompaniesController(session)
-            with get_db_session() as session:
-
-                users_controller = UsersController(session)
-            with get_db_session() as session:
-
-                jobs_controller = JobsController(session)
+            client_companies_controller = ClientCompaniesController()
+            users_controller = UsersController()
+            jobs_controller = JobsController()
 
             # Get all client companies
             companies = client_companies_controller.get_all_entities()
@@ -122,15 +116,9 @@ def handle_get_client_company_details(data: dict, user_session: UserSession) ->
 
     try:
         with get_db_session() as db:
-            with get_db_session() as session:
-
-                client_companies_controller = ClientCompaniesController(session)
-            with get_db_session() as session:
-
-                users_controller = UsersController(session)
-            with get_db_session() as session:
-
-                jobs_controller = JobsController(session)
+            client_companies_controller = ClientCompaniesController()
+            users_controller = UsersController()
+            jobs_controller = JobsController()
 
             # Get company details
             company = client_companies_controller.get_entity(company_id)
@@ -221,9 +209,7 @@ def handle_update_client_user_status(data: dict, user_session: UserSession) -> d
 
     try:
         with get_db_session() as db:
-            with get_db_session() as session:
-
-                users_controller = UsersController(session)
+            users_controller = UsersController()
             user = users_controller.get_entity(user_id)
 
             if not user:
@@ -270,15 +256,9 @@ def handle_get_client_analytics(user_session: UserSession) -> dict:
 
     try:
         with get_db_session() as db:
-            with get_db_session() as session:
-
-                client_companies_controller = ClientCompaniesController(session)
-            with get_db_session() as session:
-
-                users_controller = UsersController(session)
-            with get_db_session() as session:
-
-                jobs_controller = JobsController(session)
+            client_companies_controller = ClientCompaniesController()
+            users_controller = UsersController()
+            jobs_controller = JobsController()
 
             # Get all data
             companies = client_companies_controller.get_all_entities()
@@ -1,11 +1,12 @@
-from sqlalchemy.exc import NoResultFound
-from main import get_db_session
+from main import get_db_session, get_async_db_session
 from db.services.shiftWorkers_service import ShiftWorkersService
 from db.repositories.shiftWorkers_repository import ShiftWorkersRepository
 from user_session import UserSession
 from db.models import EmployeeType, User, ShiftWorker
 from db.controllers.users_controller import UsersController
 from db.controllers.shiftWorkers_controller import ShiftWorkersController
+from db.loading import SHIFT_WORKER_WITH_USER
+from db.unit_of_work import unit_of_work
 
 
 def handle_get_crew_chief_shifts(user_session: UserSession):
@@ -38,6 +39,21 @@ def handle_get_crew_chief_shifts(user_session: UserSession):
         return {"request_id": 100, "success": False, "error": str(e)}
 
 
+async def handle_get_crew_chief_shifts_async(user_session: UserSession):
+    """handle_get_crew_chief_shifts on the asyncio database path (runs on the event loop)"""
+    if not user_session:
+        return {"success": False, "error": "User session not found."}
+
+    try:
+        async with get_async_db_session() as session:
+            result = await session.execute(ShiftWorkersRepository.supervised_shifts_statement(user_session.get_id))
+            shifts_details = ShiftWorkersRepository.convert_supervised_shifts(result.all())
+        return {"request_id": 100, "success": True, "data": shifts_details}
+    except Exception as e:
+        print(f"Error in handle_get_crew_chief_shifts_async: {e}")
+        return {"request_id": 100, "success": False, "error": str(e)}
+
+
 def handle_get_crew_members_for_shift(request_data: dict, user_session: UserSession) -> dict:
     """
     Handles the request for a Crew Chief to get details of crew members assigned to a specific shift.
@@ -50,33 +66,33 @@ def handle_get_crew_members_for_shift(request_data: dict, user_session: UserSess
         return {"request_id": 101, "success": False, "error": "shift_id is required."}
 
     try:
-        with get_db_session() as session:
-            shift_workers_controller = ShiftWorkersController(session)
-            users_controller = UsersController(session)
+        shift_workers_controller = ShiftWorkersController()
 
-        shift_worker_entities = shift_workers_controller.get_shift_workers_by_shift_id(str(shift_id))
+        # Crew members and their users in one query
+        shift_worker_entities = shift_workers_controller.get_shift_workers_by_shift_id(
+            str(shift_id), SHIFT_WORKER_WITH_USER)
         crew_members_details = []
 
         for sw_entity in shift_worker_entities:
-            try:
-                user = users_controller.get_entity(str(sw_entity.userID))
-                clock_in_time = sw_entity.clock_in_time.isoformat() if sw_entity.clock_in_time else None
-                clock_out_time = sw_entity.clock_out_time.isoformat() if sw_entity.clock_out_time else None
-                times_submitted_at = sw_entity.times_submitted_at.isoformat() if sw_entity.times_submitted_at else None
-
-                crew_members_details.append({
-                    "user_id": sw_entity.userID,
-                    "name": user.name,
-                    "role_assigned": sw_entity.role_assigned.value,
-                    "clock_in_time": clock_in_time,
-                    "clock_out_time": clock_out_time,
-                    "times_submitted_at": times_submitted_at
-                })
-            except NoResultFound:
+            user = sw_entity.user
+            if user is None:
                 # Handle case where user might have been deleted but shiftWorker entry remains
                 print(f"Warning: User with ID {sw_entity.userID} not found for shift {shift_id}.")
                 continue # Skip this entry and continue with others
 
+            clock_in_time = sw_entity.clock_in_time.isoformat() if sw_entity.clock_in_time else None
+            clock_out_time = sw_entity.clock_out_time.isoformat() if sw_entity.clock_out_time else None
+            times_submitted_at = sw_entity.times_submitted_at.isoformat() if sw_entity.times_submitted_at else None
+
+            crew_members_details.append({
+                "user_id": sw_entity.userID,
+                "name": user.name,
+                "role_assigned": sw_entity.role_assigned.value,
+                "clock_in_time": clock_in_time,
+                "clock_out_time": clock_out_time,
+                "times_submitted_at": times_submitted_at
+            })
+
         return {"request_id": 101, "success": True, "data": crew_members_details}
     except Exception as e:
         print(f"Error in handle_get_crew_members_for_shift: {e}")
@@ -97,7 +113,8 @@ def handle_submit_shift_times(request_data: dict, user_session: UserSession) ->
         return {"request_id": 102, "success": False, "error": "shift_id and worker_times list are required."}
 
     try:
-        with get_db_session() as session:
+        # All times of the shift are saved together with one commit, or not at all
+        with unit_of_work() as session:
             shift_workers_controller = ShiftWorkersController(session)
 
             all_successful = True
@@ -129,10 +146,12 @@ def handle_submit_shift_times(request_data: dict, user_session: UserSession) ->
                     all_successful = False
                     errors.append(f"Error updating times for user {user_id} on shift {shift_id}: {str(update_e)}")
 
-            if all_successful:
-                return {"request_id": 102, "success": True, "message": "All worker times submitted successfully."}
-            else:
-                return {"request_id": 102, "success": False, "error": "Some worker times failed to submit.", "details": errors}
+            if not all_successful:
+                session.rollback()
+                return {"request_id": 102, "success": False,
+                        "error": "Some worker times failed to submit, no times were saved.", "details": errors}
+
+        return {"request_id": 102, "success": True, "message": "All worker times submitted successfully."}
 
     except Exception as e:
         print(f"Error in handle_submit_shift_times: {e}")
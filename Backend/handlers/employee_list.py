@@ -1,5 +1,6 @@
-from main import get_db_session
+from main import get_db_session, get_async_db_session
 from db.controllers.users_controller import UsersController
+from db.repositories.users_repository import UsersRepository
 from db.controllers.employee_certifications_controller import EmployeeCertificationsController
 from user_session import UserSession
 import re
@@ -17,17 +18,7 @@ def handle_employee_list(user_session: UserSession) -> dict:
                 users_controller = UsersController(session)
 
                 # For Hands on Labor: All managers can see all employees (no workplace restrictions)
-                all_users = users_controller.get_all_entities()
-
-                active_workers = []
-                for user in all_users:
-                    # Only include non-manager users (employees)
-                    if not user.isManager and user.isActive:
-                        active_workers.append({
-                            "userName": user.username,
-                            "name": user.name,
-                            "approved": user.isApproval
-                        })
+                active_workers = [_employee_list_entry(user) for user in users_controller.get_active_employees()]
 
                 return {"request_id": request_id, "success": True, "data": active_workers}
         except Exception as e:
@@ -38,6 +29,34 @@ def handle_employee_list(user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "User does not have access to manager-specific pages."}
 
 
+async def handle_employee_list_async(user_session: UserSession) -> dict:
+    """handle_employee_list on the asyncio database path (runs on the event loop)"""
+    request_id = 60
+    if user_session is None:
+        return {"request_id": request_id, "success": False, "error": "User session not found."}
+
+    if not user_session.can_access_manager_page():
+        return {"request_id": request_id, "success": False, "error": "User does not have access to manager-specific pages."}
+
+    try:
+        async with get_async_db_session() as session:
+            result = await session.execute(UsersRepository.active_employees_statement())
+            active_workers = [_employee_list_entry(user) for user in result.scalars().all()]
+        return {"request_id": request_id, "success": True, "data": active_workers}
+    except Exception as e:
+        print(f"Error fetching employee list: {e}")
+        return {"request_id": request_id, "success": False, "error": f"An error occurred while fetching employee list: {str(e)}"}
+
+
+def _employee_list_entry(user) -> dict:
+    """An active, non-manager user as listed for managers"""
+    return {
+        "userName": user.username,
+        "name": user.name,
+        "approved": user.isApproval
+    }
+
+
 def handle_get_all_approved_worker_details(user_session: UserSession) -> dict:
     """
     Get all approved workers with their certification details for Hands on Labor.
@@ -1,11 +1,9 @@
 from datetime import datetime, timedelta
-from main import get_db_session
+from main import get_async_db_session
 from db.controllers.shifts_controller import ShiftsController
 from db.controllers.shiftWorkers_controller import ShiftWorkersController
 from db.controllers.users_controller import UsersController
-from db.controllers.jobs_controller import JobsController
-from db.controllers.client_companies_controller import ClientCompaniesController
-from db.controllers.workplace_settings_controller import WorkplaceSettingsController
+from db.read_models.schedule_read_model import ScheduleReadModel
 from user_session import UserSession
 
 
@@ -18,184 +16,58 @@ def handle_get_schedule_data(data: dict, user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "User session not found."}
     
     try:
-        start_date_str = data.get('start_date')
-        end_date_str = data.get('end_date')
-        view_type = data.get('view_type', 'week')
-        include_workers = data.get('include_workers', True)
-        include_jobs = data.get('include_jobs', True)
-        include_clients = data.get('include_clients', True)
-        filters = data.get('filters', {})
-        
-        if not start_date_str or not end_date_str:
+        request = _parse_schedule_request(data)
+        if request is None:
             return {"request_id": request_id, "success": False, "error": "start_date and end_date are required."}
-        
-        # Parse dates
-        start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
-        end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00')).date()
-        
-        # Initialize controllers
-        with get_db_session() as session:
 
-            shifts_controller = ShiftsController(session)
-        with get_db_session() as session:
+        # Shifts, assignments, workers, jobs and clients in a fixed number of queries
+        response_data = ScheduleReadModel().build(**request)
 
-            shift_workers_controller = ShiftWorkersController(session)
-        with get_db_session() as session:
+        return {"request_id": request_id, "success": True, "data": response_data}
 
-            users_controller = UsersController(session)
-        with get_db_session() as session:
+    except Exception as e:
+        print(f"Error getting schedule data: {e}")
+        return {"request_id": request_id, "success": False, "error": "Failed to retrieve schedule data."}
 
-            jobs_controller = JobsController(session)
-        with get_db_session() as session:
 
-            client_companies_controller = ClientCompaniesController(session)
-        with get_db_session() as session:
+async def handle_get_schedule_data_async(data: dict, user_session: UserSession) -> dict:
+    """handle_get_schedule_data on the asyncio database path (runs on the event loop)"""
+    request_id = 2001
+    if not user_session:
+        return {"request_id": request_id, "success": False, "error": "User session not found."}
 
-            workplace_settings_controller = WorkplaceSettingsController(session)
-        
-        # Get user and determine access level
-        user = users_controller.get_entity(user_session.get_id)
+    try:
+        request = _parse_schedule_request(data)
+        if request is None:
+            return {"request_id": request_id, "success": False, "error": "start_date and end_date are required."}
 
-        # Get shifts in date range (no workplace_id needed for single company)
-        shifts = shifts_controller.get_shifts_by_date_range(start_date, end_date, None)
-        
-        # Enhance shifts with worker assignments and requirements
-        enhanced_shifts = []
-        for shift in shifts:
-            shift_dict = {
-                'id': shift.id,
-                'job_id': shift.job_id,
-                'shift_start_datetime': shift.shift_start_datetime.isoformat() if shift.shift_start_datetime else None,
-                'shift_end_datetime': shift.shift_end_datetime.isoformat() if shift.shift_end_datetime else None,
-                'client_po_number': shift.client_po_number,
-                'role_requirements': shift.required_employee_counts or {},
-                # Legacy fields for backward compatibility
-                'shiftDate': shift.shiftDate.isoformat() if shift.shiftDate else None,
-                'shiftPart': shift.shiftPart.value if shift.shiftPart else None,
-            }
-            
-            # Get job information
-            if shift.job_id:
-                job = jobs_controller.get_entity(shift.job_id)
-                if job:
-                    shift_dict['job_name'] = job.name
-                    shift_dict['job_location'] = f"{job.venue_name}, {job.venue_address}"
-                    shift_dict['venue_name'] = job.venue_name
-                    shift_dict['venue_address'] = job.venue_address
-                    if job.client_company_id:
-                        client = client_companies_controller.get_entity(job.client_company_id)
-                        if client:
-                            shift_dict['client_company_name'] = client.name
-            
-            # Get assigned workers
-            assigned_workers = shift_workers_controller.get_shift_workers_by_shift_id(shift.id)
-            shift_dict['assigned_workers'] = []
-            
-            for sw in assigned_workers:
-                worker = users_controller.get_entity(sw.userID)
-                if worker:
-                    shift_dict['assigned_workers'].append({
-                        'user_id': sw.userID,
-                        'name': worker.name,
-                        'role_assigned': sw.role_assigned.value if sw.role_assigned else 'stagehand',
-                        'is_approved': sw.is_approved,
-                        'times_submitted_at': sw.times_submitted_at.isoformat() if sw.times_submitted_at else None
-                    })
-            
-            enhanced_shifts.append(shift_dict)
-        
-        # Prepare response data
-        response_data = {
-            'shifts': enhanced_shifts,
-            'view_type': view_type,
-            'date_range': {
-                'start': start_date.isoformat(),
-                'end': end_date.isoformat()
-            }
-        }
-        
-        # Include workers if requested
-        if include_workers:
-            workers = users_controller.get_all_approved_workers()
-            workers_data = []
-            
-            for worker in workers:
-                worker_dict = {
-                    'id': worker.id,
-                    'name': worker.name,
-                    'employee_type': worker.employee_type.value if worker.employee_type else 'stagehand',
-                    'is_active': worker.isActive,
-                    'certifications': None
-                }
-                
-                # Get certifications
-                if hasattr(worker, 'certifications') and worker.certifications:
-                    worker_dict['certifications'] = worker.certifications.to_dict()
-                
-                # Calculate availability score (could be enhanced with actual availability data)
-                worker_dict['availability_score'] = 100  # Placeholder
-                worker_dict['current_shifts_count'] = len([s for s in enhanced_shifts 
-                                                         if any(aw['user_id'] == worker.id for aw in s['assigned_workers'])])
-                
-                workers_data.append(worker_dict)
-            
-            response_data['workers'] = workers_data
-        
-        # Include jobs if requested
-        if include_jobs:
-            jobs = jobs_controller.get_all_entities()
-            jobs_data = []
-            
-            for job in jobs:
-                job_dict = {
-                    'id': job.id,
-                    'jobName': job.name,
-                    'location': f"{job.venue_name}, {job.venue_address}",
-                    'venue_name': job.venue_name,
-                    'venue_address': job.venue_address,
-                    'client_company_id': job.client_company_id,
-                    'isActive': job.is_active
-                }
+        async with get_async_db_session() as session:
+            response_data = await ScheduleReadModel(session).build_async(**request)
 
-                if job.client_company_id:
-                    client = client_companies_controller.get_entity(job.client_company_id)
-                    if client:
-                        job_dict['client_company_name'] = client.name
-                
-                jobs_data.append(job_dict)
-            
-            response_data['jobs'] = jobs_data
-        
-        # Include clients if requested
-        if include_clients:
-            clients = client_companies_controller.get_all_entities()
-            clients_data = []
-            
-            for client in clients:
-                clients_data.append({
-                    'id': client.id,
-                    'companyName': client.name,
-                    'name': client.name,
-                    'isActive': True  # ClientCompany model doesn't have isActive field
-                })
-            
-            response_data['clients'] = clients_data
-        
-        # Include workplace settings for Hands on Labor
-        try:
-            workplace_settings = workplace_settings_controller.get_settings()
-            if workplace_settings:
-                response_data['workplace_settings'] = workplace_settings.to_dict()
-        except:
-            response_data['workplace_settings'] = None
-        
         return {"request_id": request_id, "success": True, "data": response_data}
-        
+
     except Exception as e:
         print(f"Error getting schedule data: {e}")
         return {"request_id": request_id, "success": False, "error": "Failed to retrieve schedule data."}
 
 
+def _parse_schedule_request(data: dict):
+    """ScheduleReadModel.build() arguments of a 2001 request, None when the date range is missing"""
+    start_date_str = data.get('start_date')
+    end_date_str = data.get('end_date')
+    if not start_date_str or not end_date_str:
+        return None
+
+    return {
+        'start_date': datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date(),
+        'end_date': datetime.fromisoformat(end_date_str.replace('Z', '+00:00')).date(),
+        'view_type': data.get('view_type', 'week'),
+        'include_workers': data.get('include_workers', True),
+        'include_jobs': data.get('include_jobs', True),
+        'include_clients': data.get('include_clients', True),
+    }
+
+
 def handle_assign_worker_to_shift_enhanced(data: dict, user_session: UserSession) -> dict:
     """
     Assign a worker to a shift with role specification.
@@ -213,16 +85,12 @@ def handle_assign_worker_to_shift_enhanced(data: dict, user_session: UserSession
             return {"request_id": request_id, "success": False, "error": "shift_id and worker_id are required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
             # Check if user is crew chief on this shift
-            with get_db_session() as session:
-
-                shift_workers_controller = ShiftWorkersController(session)
+            shift_workers_controller = ShiftWorkersController()
             shift_workers = shift_workers_controller.get_shift_workers_by_shift_id(shift_id)
             is_crew_chief = any(sw.userID == user_session.get_id and 
                               sw.role_assigned.value == 'crew_chief' 
@@ -232,9 +100,7 @@ def handle_assign_worker_to_shift_enhanced(data: dict, user_session: UserSession
                 return {"request_id": request_id, "success": False, "error": "Insufficient permissions to assign workers."}
         
         # Assign worker to shift
-        with get_db_session() as session:
-
-            shift_workers_controller = ShiftWorkersController(session)
+        shift_workers_controller = ShiftWorkersController()
         assignment_data = {
             'shiftID': shift_id,
             'userID': worker_id,
@@ -270,16 +136,12 @@ def handle_unassign_worker_from_shift_enhanced(data: dict, user_session: UserSes
             return {"request_id": request_id, "success": False, "error": "shift_id and worker_id are required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
             # Check if user is crew chief on this shift
-            with get_db_session() as session:
-
-                shift_workers_controller = ShiftWorkersController(session)
+            shift_workers_controller = ShiftWorkersController()
             shift_workers = shift_workers_controller.get_shift_workers_by_shift_id(shift_id)
             is_crew_chief = any(sw.userID == user_session.get_id and 
                               sw.role_assigned.value == 'crew_chief' 
@@ -289,9 +151,7 @@ def handle_unassign_worker_from_shift_enhanced(data: dict, user_session: UserSes
                 return {"request_id": request_id, "success": False, "error": "Insufficient permissions to unassign workers."}
         
         # Unassign worker from shift
-        with get_db_session() as session:
-
-            shift_workers_controller = ShiftWorkersController(session)
+        shift_workers_controller = ShiftWorkersController()
         success = shift_workers_controller.delete_entity_by_composite_key(shift_id, worker_id, role_assigned)
         
         if success:
@@ -314,9 +174,7 @@ def handle_create_shift_enhanced(data: dict, user_session: UserSession) -> dict:
     
     try:
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
@@ -334,9 +192,7 @@ def handle_create_shift_enhanced(data: dict, user_session: UserSession) -> dict:
             return {"request_id": request_id, "success": False, "error": "shift_start_datetime is required."}
 
         # Create shift
-        with get_db_session() as session:
-
-            shifts_controller = ShiftsController(session)
+        shifts_controller = ShiftsController()
         shift_data = {
             'shift_start_datetime': datetime.fromisoformat(shift_start_datetime.replace('Z', '+00:00')),
             'job_id': job_id,
@@ -354,9 +210,7 @@ def handle_create_shift_enhanced(data: dict, user_session: UserSession) -> dict:
         
         # Auto-assign worker if specified
         if auto_assign_worker and auto_assign_worker.get('worker_id'):
-            with get_db_session() as session:
-
-                shift_workers_controller = ShiftWorkersController(session)
+            shift_workers_controller = ShiftWorkersController()
             assignment_data = {
                 'shiftID': shift.id,
                 'userID': auto_assign_worker['worker_id'],
@@ -396,18 +250,14 @@ def handle_update_shift_enhanced(data: dict, user_session: UserSession) -> dict:
             return {"request_id": request_id, "success": False, "error": "shift_id is required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Only managers can update shifts."}
         
         # Update shift
-        with get_db_session() as session:
-
-            shifts_controller = ShiftsController(session)
+        shifts_controller = ShiftsController()
         update_data = {}
         
         if 'shift_start_datetime' in data:
@@ -460,18 +310,14 @@ def handle_delete_shift_enhanced(data: dict, user_session: UserSession) -> dict:
             return {"request_id": request_id, "success": False, "error": "shift_id is required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Only managers can delete shifts."}
         
         # Delete shift (this should also cascade delete shift workers)
-        with get_db_session() as session:
-
-            shifts_controller = ShiftsController(session)
+        shifts_controller = ShiftsController()
         success = shifts_controller.delete_entity(shift_id)
         
         if success:
@@ -1,5 +1,4 @@
 from datetime import datetime
-from main import get_db_session
 from db.controllers.workplace_settings_controller import WorkplaceSettingsController
 from user_session import UserSession
 
@@ -13,9 +12,7 @@ def handle_get_all_settings(user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         settings_dict = controller.get_settings_dict()
         return {"request_id": request_id, "success": True, "data": settings_dict}
     except Exception as e:
@@ -32,9 +29,7 @@ def handle_update_scheduling_settings(data: dict, user_session: UserSession) ->
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate the data
         service = controller.service
@@ -59,9 +54,7 @@ def handle_update_notification_settings(data: dict, user_session: UserSession) -
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         updated_settings = controller.update_notification_settings(data)
         return {"request_id": request_id, "success": True, "data": updated_settings.to_dict()}
     except Exception as e:
@@ -78,9 +71,7 @@ def handle_update_request_window_settings(data: dict, user_session: UserSession)
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate the data
         service = controller.service
@@ -110,9 +101,7 @@ def handle_update_worker_management_settings(data: dict, user_session: UserSessi
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate the data
         service = controller.service
@@ -136,9 +125,7 @@ def handle_update_timesheet_settings(data: dict, user_session: UserSession) -> d
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate the data
         service = controller.service
@@ -162,9 +149,7 @@ def handle_update_display_settings(data: dict, user_session: UserSession) -> dic
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate the data
         service = controller.service
@@ -188,9 +173,7 @@ def handle_reset_settings_to_defaults(user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         reset_settings = controller.reset_to_defaults()
         return {"request_id": request_id, "success": True, "data": reset_settings.to_dict()}
     except Exception as e:
@@ -207,9 +190,7 @@ def handle_get_settings_template(user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         template = controller.service.get_default_settings_template()
         return {"request_id": request_id, "success": True, "data": template}
     except Exception as e:
@@ -226,9 +207,7 @@ def handle_export_settings(user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         settings_dict = controller.get_settings_dict()
 
         # Add export metadata
@@ -254,9 +233,7 @@ def handle_import_settings(data: dict, user_session: UserSession) -> dict:
         return {"request_id": request_id, "success": False, "error": "Unauthorized access."}
     
     try:
-        with get_db_session() as session:
-
-            controller = WorkplaceSettingsController(session)
+        controller = WorkplaceSettingsController()
         
         # Validate import data structure
         if "settings" not in data:
@@ -290,9 +267,7 @@ def handle_update_company_profile_settings(data: dict, user_session: UserSession
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_company_profile_settings(data)
@@ -316,9 +291,7 @@ def handle_update_user_management_settings(data: dict, user_session: UserSession
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_user_management_settings(data)
@@ -342,9 +315,7 @@ def handle_update_certifications_settings(data: dict, user_session: UserSession)
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_certifications_settings(data)
@@ -368,9 +339,7 @@ def handle_update_client_management_settings(data: dict, user_session: UserSessi
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_client_management_settings(data)
@@ -394,9 +363,7 @@ def handle_update_job_configuration_settings(data: dict, user_session: UserSessi
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_job_configuration_settings(data)
@@ -420,9 +387,7 @@ def handle_update_timesheet_advanced_settings(data: dict, user_session: UserSess
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_timesheet_advanced_settings(data)
@@ -446,9 +411,7 @@ def handle_update_google_integration_settings(data: dict, user_session: UserSess
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_google_integration_settings(data)
@@ -472,9 +435,7 @@ def handle_update_reporting_settings(data: dict, user_session: UserSession) -> d
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_reporting_settings(data)
@@ -498,9 +459,7 @@ def handle_update_security_settings(data: dict, user_session: UserSession) -> di
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_security_settings(data)
@@ -524,9 +483,7 @@ def handle_update_mobile_accessibility_settings(data: dict, user_session: UserSe
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_mobile_accessibility_settings(data)
@@ -550,9 +507,7 @@ def handle_update_system_admin_settings(data: dict, user_session: UserSession) -
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
 
         # Validate the data
         errors = controller.validate_system_admin_settings(data)
@@ -576,9 +531,7 @@ def handle_get_extended_settings(user_session: UserSession) -> dict:
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         settings_dict = controller.get_all_extended_settings()
         return {"request_id": request_id, "success": True, "data": settings_dict}
     except Exception as e:
@@ -596,9 +549,7 @@ def handle_reset_extended_settings_to_defaults(user_session: UserSession) -> dic
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         reset_settings = controller.reset_all_to_defaults(user_session.get_id)
         return {"request_id": request_id, "success": True, "data": reset_settings}
     except Exception as e:
@@ -616,9 +567,7 @@ def handle_test_google_connection(data: dict, user_session: UserSession) -> dict
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         test_result = controller.test_google_connection(user_session.get_id, data)
         return {"request_id": request_id, "success": True, "data": test_result}
     except Exception as e:
@@ -636,9 +585,7 @@ def handle_manual_google_sync(user_session: UserSession) -> dict:
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         sync_result = controller.trigger_manual_google_sync(user_session.get_id)
         return {"request_id": request_id, "success": True, "data": sync_result}
     except Exception as e:
@@ -656,9 +603,7 @@ def handle_system_health_check(user_session: UserSession) -> dict:
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         health_result = controller.run_system_health_check(user_session.get_id)
         return {"request_id": request_id, "success": True, "data": health_result}
     except Exception as e:
@@ -676,9 +621,7 @@ def handle_manual_backup(user_session: UserSession) -> dict:
 
     try:
         from db.controllers.extended_settings_controller import ExtendedSettingsController
-        with get_db_session() as session:
-
-            controller = ExtendedSettingsController(session)
+        controller = ExtendedSettingsController()
         backup_result = controller.trigger_manual_backup(user_session.get_id)
         return {"request_id": request_id, "success": True, "data": backup_result}
     except Exception as e:
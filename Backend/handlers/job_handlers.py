@@ -1,6 +1,6 @@
-from config.constants import db
-from main import get_db_session
-from db.controllers.jobs_controller import JobsController
+from main import get_async_db_session
+from db.controllers.jobs_controller import JobsController, convert_job_for_client
+from db.repositories.jobs_repository import JobsRepository
 from user_session import UserSession
 
 
@@ -25,9 +25,7 @@ def handle_create_job(data: dict, user_session: UserSession):
         return {"request_id": 210, "success": False, "error": "name, client_company_id, venue_name, and venue_address are required."}
 
     try:
-        with get_db_session() as session:
-
-            controller = JobsController(session)
+        controller = JobsController()
         job_data = {
             "name": job_name,
             "client_company_id": int(client_company_id),
@@ -66,9 +64,7 @@ def handle_get_jobs_by_manager(user_session: UserSession):
         return {"success": False, "error": "User does not have manager privileges."}
 
     try:
-        with get_db_session() as session:
-
-            controller = JobsController(session)
+        controller = JobsController()
         print(f"Fetching all jobs for Hands on Labor")
         jobs = controller.get_all_active_jobs()
         print(f"Found {len(jobs)} jobs: {jobs}")
@@ -78,3 +74,20 @@ def handle_get_jobs_by_manager(user_session: UserSession):
         import traceback
         traceback.print_exc()
         return {"request_id": 211, "success": False, "error": str(e)}
+
+
+async def handle_get_jobs_by_manager_async(user_session: UserSession):
+    """handle_get_jobs_by_manager on the asyncio database path (runs on the event loop)"""
+    if not user_session:
+        return {"success": False, "error": "User session not found."}
+    if not user_session.can_access_manager_page():
+        return {"success": False, "error": "User does not have manager privileges."}
+
+    try:
+        async with get_async_db_session() as session:
+            result = await session.execute(JobsRepository.active_jobs_statement())
+            jobs = [convert_job_for_client(job) for job in result.scalars().all()]
+        return {"request_id": 211, "success": True, "data": jobs}
+    except Exception as e:
+        print(f"Error in handle_get_jobs_by_manager_async: {e}")
+        return {"request_id": 211, "success": False, "error": str(e)}
@@ -119,7 +119,7 @@ def handle_login(data, client_ip=None):
 
                 # Cache user profile for performance
                 try:
-                    smart_cache.set('user_profile', user_data, user.id)
+                    smart_cache.set(smart_cache.key('user_profile', user.id), user_data)
                 except Exception as cache_error:
                     logger.warning(f"Failed to cache user profile for '{username}': {cache_error}")
                     # Continue anyway, caching is not critical
@@ -1,11 +1,9 @@
 from datetime import datetime, timedelta
-from main import get_db_session
 from enum import Enum
-from config.constants import db
 from db.controllers.shifts_controller import ShiftsController
 from db.controllers.jobs_controller import JobsController
 from db.controllers.client_companies_controller import ClientCompaniesController
-from db.models import ShiftPart
+from db.models import ShiftPart, legacy_shift_times
 
 class DayName(Enum):
     Sunday = 'Sunday'
@@ -22,12 +20,8 @@ def get_or_create_default_job(user_session):
     For Hands on Labor, we need a default job to link shifts to.
     """
     try:
-        with get_db_session() as session:
-
-            jobs_controller = JobsController(session)
-        with get_db_session() as session:
-
-            client_companies_controller = ClientCompaniesController(session)
+        jobs_controller = JobsController()
+        client_companies_controller = ClientCompaniesController()
 
         # Try to get existing default job
         all_jobs = jobs_controller.get_all_active_jobs()
@@ -86,30 +80,17 @@ def make_shifts(user_session):
             # Get or create a default job for these shifts
             default_job_id = get_or_create_default_job(user_session)
 
-            with get_db_session() as session:
-
-
-                shifts_controller = ShiftsController(session)
+            shifts_controller = ShiftsController()
             current_date = datetime.now()
             next_sunday = current_date + timedelta(days=(6 - current_date.weekday() + 1) % 7)
             next_week_dates = [next_sunday + timedelta(days=i) for i in range(7)]
             shift_parts = [ShiftPart.Morning, ShiftPart.Noon, ShiftPart.Evening]
 
-            # Define shift times for each part
-            shift_times = {
-                ShiftPart.Morning: (8, 0, 12, 0),    # 8:00 AM - 12:00 PM
-                ShiftPart.Noon: (12, 0, 17, 0),     # 12:00 PM - 5:00 PM
-                ShiftPart.Evening: (17, 0, 22, 0)   # 5:00 PM - 10:00 PM
-            }
-
-            created_shifts = []
+            shifts_data = []
             for date in next_week_dates:
                 for shift_part in shift_parts:
-                    start_hour, start_min, end_hour, end_min = shift_times[shift_part]
-
-                    # Create datetime objects for shift start and end
-                    shift_start = datetime.combine(date.date(), datetime.min.time().replace(hour=start_hour, minute=start_min))
-                    shift_end = datetime.combine(date.date(), datetime.min.time().replace(hour=end_hour, minute=end_min))
+                    # Create datetime objects for shift start and end (times of each part in SHIFT_PART_HOURS)
+                    shift_start, shift_end = legacy_shift_times(date.date(), shift_part)
 
                     # Create shift with new schema
                     shift_data = {
@@ -123,9 +104,10 @@ def make_shifts(user_session):
                         "shiftPart": shift_part
                     }
 
-                    created_shift = shifts_controller.create_entity(shift_data)
-                    created_shifts.append(created_shift)
-                    print(f"Created shift: {shift_part.value} on {date.date()}")
+                    shifts_data.append(shift_data)
+
+            # Insert the whole week with one commit
+            created_shifts = shifts_controller.create_entities(shifts_data)
 
             print(f"Successfully created {len(created_shifts)} shifts for the week starting {next_sunday.date()}")
             return True
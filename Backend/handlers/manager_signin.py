@@ -1,4 +1,3 @@
-from main import get_db_session
 from db.controllers.shiftBoard_controller import ShiftBoardController
 from db.controllers.users_controller import UsersController
 from handlers.login import handle_login
@@ -21,9 +20,7 @@ def handle_manager_signin(data):
     try:
         print("IN")
         # Initialize the users controller
-        with get_db_session() as session:
-
-            user_controller = UsersController(session)
+        user_controller = UsersController()
 
         # Insert the new manager into the database
         print(data)
@@ -6,12 +6,13 @@ Implements all the missing request handlers identified in the analysis
 
 import json
 import logging
-from datetime import datetime
-from main import get_db_session
+from datetime import datetime, timedelta
+from main import get_db_session, database_breaker
 from db.controllers.users_controller import UsersController
-from db.controllers.shifts_controller import ShiftsController
+from db.controllers.shifts_controller import ShiftsController, convert_shifts_for_client
 from db.controllers.jobs_controller import JobsController
 from user_session import UserSession
+from websocket.metrics import connection_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -71,11 +72,8 @@ def handle_get_enhanced_schedule_data(data, user_session):
             # Get shifts for the date range
             shifts = shifts_controller.get_shifts_by_date_range(start_date, end_date)
             
-            # Convert shifts for client
-            shifts_data = []
-            for shift in shifts:
-                shift_data = shifts_controller.convert_shift_for_client(shift, user_session.is_manager)
-                shifts_data.append(shift_data)
+            # Convert shifts for client (workers of all shifts loaded in one query)
+            shifts_data = convert_shifts_for_client(shifts, session, user_session.can_access_manager_page())
             
             # Calculate analytics
             analytics = {
@@ -667,12 +665,13 @@ def handle_debug_info(data, user_session):
 def handle_system_status(data, user_session):
     """Get system status (Request ID 999)"""
     try:
+        connections = connection_metrics.collect()
         status = {
-            'database': 'connected',
+            'database': 'unavailable' if database_breaker.state == 'open' else 'connected',
             'redis': 'connected',
             'websocket': 'active',
-            'server_uptime': '0:00:00',  # TODO: Calculate actual uptime
-            'active_connections': 1,  # TODO: Get actual connection count
+            'server_uptime': str(timedelta(seconds=int(connection_metrics.uptime_seconds()))),
+            'active_connections': connections['active'],
             'last_updated': datetime.now().isoformat()
         }
 
@@ -1,7 +1,9 @@
 from datetime import datetime
 import json
-from main import get_db_session
-from db.controllers.shifts_controller import ShiftsController
+from main import get_db_session, get_async_db_session
+from db.controllers.shifts_controller import ShiftsController, convert_shift_for_client
+from db.repositories.shifts_repository import ShiftsRepository
+from db.loading import SHIFT_WITH_WORKERS
 from db.controllers.shiftWorkers_controller import ShiftWorkersController
 from db.controllers.employee_certifications_controller import EmployeeCertificationsController
 from db.controllers.users_controller import UsersController
@@ -147,6 +149,26 @@ def handle_get_shifts_by_job(data: dict, user_session: UserSession):
         traceback.print_exc()
         return {"request_id": 221, "success": False, "error": f"Database error: {str(e)}"}
 
+
+async def handle_get_shifts_by_job_async(data: dict, user_session: UserSession):
+    """handle_get_shifts_by_job on the asyncio database path (runs on the event loop)"""
+    if not user_session or not user_session.can_access_manager_page():
+        return {"request_id": 221, "success": False, "error": "Unauthorized access."}
+
+    job_id = data.get("job_id")
+    if job_id is None:
+        return {"request_id": 221, "success": False, "error": "job_id is required."}
+
+    try:
+        async with get_async_db_session() as session:
+            # Workers and their users come with the shifts, nothing is lazy loaded afterwards
+            result = await session.execute(ShiftsRepository.shifts_by_job_statement(int(job_id), SHIFT_WITH_WORKERS))
+            shifts = [convert_shift_for_client(shift, None) for shift in result.scalars().all()]
+        return {"request_id": 221, "success": True, "data": shifts}
+    except Exception as e:
+        print(f"Error in handle_get_shifts_by_job_async: {e}")
+        return {"request_id": 221, "success": False, "error": f"Database error: {str(e)}"}
+
 def _validate_role_assignment(user_id: int, role_assigned: str) -> tuple[bool, str]:
     """
     Validate if a user can be assigned to a specific role based on their certifications.
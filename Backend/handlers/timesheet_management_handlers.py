@@ -1,5 +1,4 @@
 from datetime import datetime
-from main import get_db_session
 from db.controllers.shiftWorkers_controller import ShiftWorkersController
 from db.controllers.shifts_controller import ShiftsController
 from db.controllers.users_controller import UsersController
@@ -27,21 +26,11 @@ def handle_get_shift_timesheet_details(data: dict, user_session: UserSession) ->
         return {"request_id": request_id, "success": False, "error": "shift_id is required."}
     
     try:
-        with get_db_session() as session:
-
-            shifts_controller = ShiftsController(session)
-        with get_db_session() as session:
-
-            shift_workers_controller = ShiftWorkersController(session)
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
-        with get_db_session() as session:
-
-            jobs_controller = JobsController(session)
-        with get_db_session() as session:
-
-            client_companies_controller = ClientCompaniesController(session)
+        shifts_controller = ShiftsController()
+        shift_workers_controller = ShiftWorkersController()
+        users_controller = UsersController()
+        jobs_controller = JobsController()
+        client_companies_controller = ClientCompaniesController()
         
         # Get shift details
         shift = shifts_controller.get_entity(shift_id)
@@ -157,12 +146,8 @@ def handle_update_worker_timesheet(data: dict, user_session: UserSession) -> dic
             return {"request_id": request_id, "success": False, "error": "shift_id, worker_user_id, and role_assigned are required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
-        with get_db_session() as session:
-
-            shift_workers_controller = ShiftWorkersController(session)
+        users_controller = UsersController()
+        shift_workers_controller = ShiftWorkersController()
         
         user = users_controller.get_entity(user_session.get_id)
         is_manager = user.isManager
@@ -238,12 +223,8 @@ def handle_submit_shift_timesheet(data: dict, user_session: UserSession) -> dict
             return {"request_id": request_id, "success": False, "error": "shift_id is required."}
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
-        with get_db_session() as session:
-
-            shift_workers_controller = ShiftWorkersController(session)
+        users_controller = UsersController()
+        shift_workers_controller = ShiftWorkersController()
         
         user = users_controller.get_entity(user_session.get_id)
         is_manager = user.isManager
@@ -305,18 +286,13 @@ def handle_approve_shift_timesheet(data: dict, user_session: UserSession) -> dic
             return {"request_id": request_id, "success": False, "error": "shift_id is required."}
         
         # Verify permissions - only managers can approve
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         if not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Only managers can approve timesheets."}
         
-        with get_db_session() as session:
-
-        
-            shift_workers_controller = ShiftWorkersController(session)
+        shift_workers_controller = ShiftWorkersController()
         shift_workers = shift_workers_controller.get_workers_for_shift(shift_id)
         
         # Approve timesheets for specified workers (or all if none specified)
@@ -365,19 +341,14 @@ def handle_get_employee_timesheet_history(data: dict, user_session: UserSession)
         end_date = data.get('end_date')    # Optional date filter
         
         # Verify permissions
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
         
         # Only managers can view other employees' timesheets
         if employee_id != user_session.get_id and not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Insufficient permissions to view this employee's timesheet history."}
         
-        with get_db_session() as session:
-
-        
-            shift_workers_controller = ShiftWorkersController(session)
+        shift_workers_controller = ShiftWorkersController()
         timesheet_history = shift_workers_controller.get_employee_timesheet_history(
             employee_id, start_date, end_date
         )
@@ -400,27 +371,16 @@ def handle_get_all_submitted_timesheets(user_session: UserSession) -> dict:
 
     try:
         # Verify permissions - only managers can view all submitted timesheets
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
 
         if not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Only managers can view all submitted timesheets."}
 
-        with get_db_session() as session:
-
-
-            shift_workers_controller = ShiftWorkersController(session)
-        with get_db_session() as session:
-
-            shifts_controller = ShiftsController(session)
-        with get_db_session() as session:
-
-            jobs_controller = JobsController(session)
-        with get_db_session() as session:
-
-            client_companies_controller = ClientCompaniesController(session)
+        shift_workers_controller = ShiftWorkersController()
+        shifts_controller = ShiftsController()
+        jobs_controller = JobsController()
+        client_companies_controller = ClientCompaniesController()
 
         # Get all submitted timesheets for the manager's workplace
         submitted_timesheets = shift_workers_controller.get_submitted_timesheets_for_workplace(user.workplaceID)
@@ -490,18 +450,13 @@ def handle_update_timesheet_status(data: dict, user_session: UserSession) -> dic
             return {"request_id": request_id, "success": False, "error": "Action must be 'approve' or 'reject'."}
 
         # Verify permissions - only managers can update timesheet status
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         user = users_controller.get_entity(user_session.get_id)
 
         if not user.isManager:
             return {"request_id": request_id, "success": False, "error": "Only managers can update timesheet status."}
 
-        with get_db_session() as session:
-
-
-            shift_workers_controller = ShiftWorkersController(session)
+        shift_workers_controller = ShiftWorkersController()
 
         if action == 'approve':
             success = shift_workers_controller.approve_timesheet_for_worker(
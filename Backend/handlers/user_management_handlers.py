@@ -3,7 +3,6 @@ User Management Handlers for EasyShifts
 Handles creation and management of managers and admins.
 """
 
-from main import get_db_session
 from db.controllers.users_controller import UsersController
 from db.controllers.employee_certifications_controller import EmployeeCertificationsController
 from user_session import UserSession
@@ -22,9 +21,7 @@ def handle_create_manager(data: dict, user_session: UserSession) -> dict:
     
     try:
         # Verify permissions - only admins can create managers
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         current_user = users_controller.get_entity(user_session.get_id)
         
         if not current_user.isAdmin:
@@ -101,9 +98,7 @@ def handle_create_admin(data: dict, user_session: UserSession) -> dict:
     
     try:
         # Verify permissions - only admins can create admins
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         current_user = users_controller.get_entity(user_session.get_id)
         
         if not current_user.isAdmin:
@@ -180,9 +175,7 @@ def handle_get_all_users(user_session: UserSession) -> dict:
     
     try:
         # Verify permissions - only admins can view all users
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         current_user = users_controller.get_entity(user_session.get_id)
         
         if not current_user.isAdmin:
@@ -258,9 +251,7 @@ def handle_update_user_role(data: dict, user_session: UserSession) -> dict:
     
     try:
         # Verify permissions - only admins can update user roles
-        with get_db_session() as session:
-
-            users_controller = UsersController(session)
+        users_controller = UsersController()
         current_user = users_controller.get_entity(user_session.get_id)
         
         if not current_user.isAdmin:
@@ -1,11 +1,18 @@
 import os
-import time
 import logging
-from contextlib import contextmanager
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError, DisconnectionError
-from db.models import Base # Assuming Base is correctly defined in db.models
+import contextvars
+import importlib.util
+from contextlib import contextmanager, asynccontextmanager
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker, Session
+from db.loading import guard_lazy_loads, lazy_load_guard_enabled
+from db.data_loader import enable_data_loader, data_loader_enabled
+from db.replicas import ReplicaSet, guard_replica_writes
+from db.circuit_breaker import CircuitBreaker, RetryPolicy, watch_engine
+from db.pool_metrics import PoolMetrics
+from db.query_stats import watch_queries
+from cache.response_cache import response_cache, watch_writes
+from migrations.schema_migrations import ensure_schema
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +21,52 @@ logger = logging.getLogger(__name__)
 _engine = None
 _session_factory = None
 _initialization_error = None
+# SystemAdminSettings.max_database_connections when the engine was created
+_max_connections = None
+
+# Read replicas for READ routes, False once the environment configured none (see get_replica_set)
+_replicas = None
+
+# asyncio engine for the read handlers that run on the event loop (see get_async_db_session)
+_async_engine = None
+_async_session_factory = None
+
+# Scope shared by every get_db_session() call made while handling one request
+_request_scope = contextvars.ContextVar('request_scope', default=None)
+
+
+def _probe_database():
+    """Half-open probe of the circuit breaker"""
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+# Opens after repeated connection failures: requests then fail fast with DatabaseUnavailable
+# instead of each waiting for a connect timeout, until a SELECT 1 probe succeeds again
+database_breaker = CircuitBreaker(
+    'database',
+    failure_threshold=int(os.getenv('DB_BREAKER_FAILURE_THRESHOLD', '5')),
+    reset_timeout=float(os.getenv('DB_BREAKER_RESET_SECONDS', '10')),
+    probe=_probe_database,
+)
+
+# Connection errors are retried with jittered exponential backoff (never sleeping on the event loop)
+database_retry = RetryPolicy(
+    attempts=int(os.getenv('DB_RETRY_ATTEMPTS', '3')),
+    base_delay=float(os.getenv('DB_RETRY_BASE_DELAY', '0.2')),
+    max_delay=float(os.getenv('DB_RETRY_MAX_DELAY', '2.0')),
+    breaker=database_breaker,
+)
+
+
+def _current_request_id():
+    scope = _request_scope.get()
+    return scope.request_id if scope is not None else None
+
+
+# Telemetry of the primary engine's pool (see get_pool_report)
+pool_metrics = PoolMetrics(long_held_seconds=float(os.getenv('DB_POOL_LONG_HELD_SECONDS', '10')),
+                           owner=_current_request_id)
 
 def get_database_password():
     """Get database password from environment variable or fallback to config file"""
@@ -32,51 +85,122 @@ def get_database_password():
         logger.error("No database password found in environment variable or config file")
         raise RuntimeError("Database password not configured. Set DB_PASSWORD environment variable or create config/private_password.py")
 
+def _database_settings():
+    return (os.getenv("DB_HOST", "miano.h.filess.io"), os.getenv("DB_PORT", "3305"),
+            os.getenv("DB_USER", "easyshiftsdb_danceshall"), os.getenv("DB_NAME", "easyshiftsdb_danceshall"))
+
+
+def _database_label():
+    host, port, user, name = _database_settings()
+    return f"{user}@{host}:{port}/{name}"
+
+
+def get_database_url(driver='pymysql', host=None, port=None):
+    """
+    MariaDB connection URL for a DBAPI driver ('pymysql' for the sync engine, 'aiomysql' for asyncio).
+    host / port select another server with the same credentials (a read replica).
+    """
+    default_host, default_port, user, name = _database_settings()
+    return f'mariadb+{driver}://{user}:{get_database_password()}@{host or default_host}:{port or default_port}/{name}'
+
+
+def statement_timeout_args():
+    """
+    connect_args capping every statement at DB_STATEMENT_TIMEOUT_SECONDS on the server
+    (MariaDB max_statement_time, 0 = no limit). Defaults to WS_ROUTE_TIMEOUT_SECONDS: a
+    query still running once its request timed out is killed instead of holding its
+    connection and worker thread.
+    """
+    seconds = float(os.getenv('DB_STATEMENT_TIMEOUT_SECONDS', os.getenv('WS_ROUTE_TIMEOUT_SECONDS', '30')))
+    return {'init_command': f"SET SESSION max_statement_time = {seconds:g}"} if seconds > 0 else {}
+
+
+def _engine_options():
+    """Options of the sync engines (primary and replicas built from DB_REPLICA_HOSTS), see pool_limits()"""
+    return dict(
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        connect_args={
+            'connect_timeout': 30,
+            'read_timeout': 30,
+            'write_timeout': 30,
+            'charset': 'utf8mb4',
+            **statement_timeout_args()
+        }
+    )
+
+
+def pool_limits(max_connections=None):
+    """
+    Pool limits of a sync engine: DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT, with
+    pool_size + max_overflow capped at max_connections (SystemAdminSettings.max_database_connections).
+    """
+    pool_size = int(os.getenv('DB_POOL_SIZE', '10'))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    if max_connections:
+        pool_size = min(pool_size, max_connections)
+        max_overflow = max(0, min(max_overflow, max_connections - pool_size))
+    return {'pool_size': pool_size, 'max_overflow': max_overflow,
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30'))}
+
+
+def _admin_connection_limit(engine):
+    """SystemAdminSettings.max_database_connections, None when the settings were never saved"""
+    from db.additional_settings_models import SystemAdminSettings
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(SystemAdminSettings.max_database_connections).limit(1)).scalar()
+    except Exception as e:
+        logger.warning(f"Could not read max_database_connections, using the environment's pool limits: {e}")
+        return None
+
+
+def _create_primary_engine(connection_url, limits):
+    engine = create_engine(connection_url, **_engine_options(), **limits)
+    watch_engine(engine, database_breaker)
+    watch_queries(engine)
+    pool_metrics.watch(engine)
+    # Committed writes invalidate the cached responses built from the written tables
+    watch_writes(engine, response_cache.invalidate_tables)
+    return engine
+
+
 def initialize_database_and_session_factory():
-    global _engine, _session_factory, _initialization_error
+    global _engine, _session_factory, _initialization_error, _max_connections
 
     if _engine and _session_factory:
         print("✅ Database engine and session factory already initialized.")
         return
 
-    DB_HOST = os.getenv("DB_HOST", "miano.h.filess.io")
-    DB_PORT = os.getenv("DB_PORT", "3305")
-    DB_USER = os.getenv("DB_USER", "easyshiftsdb_danceshall")
-    DB_NAME = os.getenv("DB_NAME", "easyshiftsdb_danceshall")
-
     try:
-        DB_PASSWORD = get_database_password()
+        connection_url = get_database_url('pymysql')
     except Exception as e:
         _initialization_error = e
         print(f"❌ Failed to get database password: {e}")
         return
 
-    connection_url = f'mariadb+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
-    print(f"Attempting to initialize database engine: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+    print(f"Attempting to initialize database engine: {_database_label()}")
 
     try:
-        engine = create_engine(
-            connection_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            pool_size=10,
-            max_overflow=20,
-            pool_timeout=30,
-            connect_args={
-                'connect_timeout': 30,
-                'read_timeout': 30,
-                'write_timeout': 30,
-                'charset': 'utf8mb4'
-            }
-        )
+        limits = pool_limits()
+        engine = _create_primary_engine(connection_url, limits)
 
         with engine.connect() as connection:
             connection.execute(text("SELECT 1"))
         print("✅ Database engine connection successful.")
         
-        Base.metadata.create_all(bind=engine, checkfirst=True)
-        print("✅ Database tables created/verified successfully.")
+        # One SELECT of the stored schema fingerprint instead of create_all's per-table reflection
+        schema = ensure_schema(engine, auto_create=os.getenv('DB_SCHEMA_AUTO_CREATE', 'true').lower() == 'true')
+        print(f"✅ Database schema checked: {schema}")
+
+        # The admin's connection limit can only be read once connected
+        _max_connections = _admin_connection_limit(engine)
+        if pool_limits(_max_connections) != limits:
+            limits = pool_limits(_max_connections)
+            engine.dispose()
+            engine = _create_primary_engine(connection_url, limits)
+        logger.info(f"Database pool: pool_size={limits['pool_size']} max_overflow={limits['max_overflow']}")
 
         _engine = engine
         _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
@@ -97,10 +221,94 @@ def get_engine():
         raise RuntimeError("Database engine could not be initialized and no specific error was caught.")
     return _engine
 
-def create_session():
+def prewarm_database(connections=2):
+    """
+    Opens `connections` pooled connections at once and runs a representative query on
+    each (an indexed users lookup), so the first requests find them established and the
+    statement compiled. Returns how many connections were warmed.
+    """
+    from db.models import User
+
+    engine = get_engine()
+    statement = select(User.id).limit(1)
+    opened = []
+    try:
+        for _ in range(min(connections, pool_limits(_max_connections)['pool_size'])):
+            with pool_metrics.timed_checkout():
+                connection = engine.connect()
+            opened.append(connection)
+            connection.execute(statement).all()
+    finally:
+        # Back into the pool, kept open for the first requests
+        for connection in opened:
+            connection.close()
+    logger.info(f"Database pool warmed with {len(opened)} connection(s)")
+    return len(opened)
+
+
+def get_pool_report():
+    """
+    Live state of the primary pool: gauges from the pool itself, the event metrics and a
+    pool size recommendation. None before the engine exists (never initializes it).
+    """
+    if _engine is None:
+        return None
+    pool = _engine.pool
+    limits = pool_limits(_max_connections)
+    return {
+        'pool_size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'max_overflow': limits['max_overflow'],
+        'max_connections': _max_connections,
+        'metrics': pool_metrics.get_stats(),
+        'recommendation': pool_metrics.recommend(limits['pool_size'], limits['max_overflow'], _max_connections),
+    }
+
+
+def _env_list(name):
+    return [item.strip() for item in os.getenv(name, '').split(',') if item.strip()]
+
+
+def get_replica_set():
+    """
+    Returns the read replicas configured by the environment, None when there are none.
+
+    DB_REPLICA_HOSTS lists "host[:port]" servers reached with the primary's credentials,
+    DB_REPLICA_URLS lists full SQLAlchemy URLs (e.g. a second local instance).
+    """
+    global _replicas
+
+    if _replicas is None:
+        engines = {}
+        for entry in _env_list('DB_REPLICA_HOSTS'):
+            host, _, port = entry.partition(':')
+            engines[entry] = create_engine(get_database_url('pymysql', host, port or None),
+                                           **_engine_options(), **pool_limits())
+        for index, url in enumerate(_env_list('DB_REPLICA_URLS')):
+            engines[f'replica-{index + 1}'] = create_engine(url, pool_pre_ping=True)
+        for engine in engines.values():
+            watch_queries(engine)
+
+        if engines:
+            _replicas = ReplicaSet(engines,
+                                   max_lag=float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5')),
+                                   check_interval=float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', '5')),
+                                   sticky_seconds=float(os.environ['DB_REPLICA_STICKY_SECONDS'])
+                                   if os.getenv('DB_REPLICA_STICKY_SECONDS') else None)
+            logger.info(f"Read replicas configured: {', '.join(engines)}")
+        else:
+            _replicas = False
+
+    return _replicas or None
+
+
+def create_session(bind=None):
     """
     Creates and returns a new SQLAlchemy session from the factory.
     Attempts to initialize the factory if it hasn't been already.
+    bind selects another engine than the primary (a read replica).
     """
     global _session_factory, _initialization_error
 
@@ -113,7 +321,10 @@ def create_session():
     if not _session_factory:
         raise RuntimeError("Cannot create session: Session factory could not be initialized.")
 
-    return _session_factory()
+    session = _session_factory(bind=bind) if bind is not None else _session_factory()
+    if lazy_load_guard_enabled():
+        guard_lazy_loads(session)
+    return session
 
 
 def initialize_database_and_session():
@@ -135,11 +346,36 @@ def get_database_session():
     return create_session()
 
 
+def _connect_primary():
+    with pool_metrics.timed_checkout():
+        return get_engine().connect()
+
+
+def _connected_session(bind=None):
+    """
+    New session with its connection already checked out, so that connection errors are
+    retried (database_retry) before the caller starts using it.
+    Raises DatabaseUnavailable while the circuit breaker is open.
+    """
+    def connect():
+        session = create_session(bind)
+        try:
+            with pool_metrics.timed_checkout():
+                session.connection()
+        except Exception:
+            session.close()
+            raise
+        return session
+
+    return database_retry.call(connect)
+
+
 @contextmanager
 def get_db_session():
     """
-    Context manager for database sessions with retry logic.
-    Ensures proper session cleanup and error handling.
+    Context manager for database sessions.
+    Ensures proper session cleanup and error handling; connection errors are retried
+    with backoff, and DatabaseUnavailable is raised while the database is down.
 
     Usage:
         with get_db_session() as session:
@@ -147,45 +383,282 @@ def get_db_session():
             session.query(User).all()
             session.commit()  # if needed
     """
-    max_retries = 3
-    retry_delay = 1
+    # Inside a request scope every caller shares the scope's session; the scope
+    # owns commit, rollback and close
+    scope = _request_scope.get()
+    if scope is not None:
+        yield scope.session
+        return
 
-    for attempt in range(max_retries):
-        session = None
-        try:
-            session = create_session()
-            yield session
-            session.commit()  # Auto-commit if no exception
-            break  # Success, exit retry loop
-
-        except (OperationalError, DisconnectionError) as e:
-            if session:
-                session.rollback()
-                session.close()
-
-            if attempt < max_retries - 1:
-                logger.warning(f"Database connection error (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-                continue
+    session = _connected_session()
+    try:
+        yield session
+        session.commit()  # Auto-commit if no exception
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Database session error: {e}")
+        raise
+    finally:
+        session.close()  # Always close the session
+
+class _RequestScope:
+    """One request's session, opened on first use so requests without queries never check out a connection"""
+
+    def __init__(self, atomic=False, read_only=False, sticky_key=None, request_id=None):
+        self.atomic = atomic
+        self.request_id = request_id
+        self.read_only = read_only
+        self.sticky_key = sticky_key
+        # Clients whose reads stay on the primary once this scope has committed
+        self.writers = set()
+        # Set by fail(): the pending work is rolled back instead of committed
+        self.failed = False
+        self.replica = None
+        self._session = None
+        self._connection = None
+        self._transaction = None
+
+    @property
+    def is_open(self):
+        return self._session is not None
+
+    @property
+    def session(self):
+        if self._session is None:
+            if self.atomic:
+                self._connection = database_retry.call(_connect_primary)
+                self._transaction = self._connection.begin()
+                self._session = Session(bind=self._connection, autoflush=False,
+                                        join_transaction_mode="create_savepoint")
+                if lazy_load_guard_enabled():
+                    guard_lazy_loads(self._session)
             else:
-                logger.error(f"Database connection failed after {max_retries} attempts: {e}")
-                raise
-
-        except Exception as e:
-            if session:
-                session.rollback()
-                session.close()
-            logger.error(f"Database session error: {e}")
-            raise
+                replicas = get_replica_set() if self.read_only else None
+                self.replica = replicas.replica_for_read(self.sticky_key) if replicas else None
+                if self.replica is not None:
+                    self._session = create_session(bind=self.replica.engine)
+                    guard_replica_writes(self._session, self.replica.name)
+                else:
+                    self._session = _connected_session()
+            if data_loader_enabled():
+                # Batches and memoizes the request's get_entity() lookups
+                enable_data_loader(self._session)
+        return self._session
+
+    def commit(self):
+        """Commit the session (only a SAVEPOINT release in an atomic scope)"""
+        self.failed = False
+        if self._session is not None:
+            self._session.commit()
+
+    def rollback(self):
+        """Roll back the session (only to the last SAVEPOINT in an atomic scope)"""
+        self.failed = False
+        if self._session is not None:
+            self._session.rollback()
+
+    def fail(self):
+        """
+        Roll back the pending work when the scope finishes: the request answered with
+        success: False, typically after its handler caught its own error
+        """
+        self.failed = True
+
+    def _can_commit(self) -> bool:
+        """False when a failed flush left the session's transaction needing a rollback"""
+        transaction = self._session.get_transaction()
+        return transaction is None or transaction.is_active
+
+    def record_write(self, sticky_key):
+        """Keep sticky_key's reads on the primary after this scope (a write route ran in it)"""
+        if sticky_key is not None:
+            self.writers.add(sticky_key)
 
+    def finish(self, success):
+        """Commit or roll back the whole scope and return its connection to the pool"""
+        try:
+            if self._session is None:
+                return
+            try:
+                if success and self.failed:
+                    success = False
+                elif success and not self._can_commit():
+                    logger.warning(f"Request {self.request_id} left a failed transaction, rolling it back")
+                    success = False
+                if success:
+                    if self._transaction is not None:
+                        self._session.flush()
+                        self._transaction.commit()
+                    else:
+                        self._session.commit()
+                elif self._transaction is not None:
+                    self._transaction.rollback()
+                else:
+                    self._session.rollback()
+            finally:
+                self._session.close()
+                if self._connection is not None:
+                    self._connection.close()
+                self._session = self._connection = self._transaction = None
         finally:
-            if session:
-                session.close()  # Always close the session
+            # The read-your-writes window starts once the writes are committed
+            replicas = get_replica_set() if self.writers else None
+            if replicas is not None:
+                for sticky_key in self.writers:
+                    replicas.record_write(sticky_key)
+
+
+def get_request_session():
+    """
+    Returns the session of the current request scope (opening it on first use),
+    or None outside of a request scope.
+    """
+    scope = _request_scope.get()
+    return scope.session if scope is not None else None
+
+
+def get_scoped_session(db=None):
+    """
+    Returns db when given, otherwise the current request scope's session.
+    Used by repositories and controllers constructed without an explicit session.
+    """
+    if db is not None:
+        return db
+    session = get_request_session()
+    if session is None:
+        raise RuntimeError("No database session given and no request scope is active. "
+                           "Pass a session or wrap the call in request_session_scope().")
+    return session
+
+
+@contextmanager
+def request_session_scope(atomic=False, read_only=False, sticky_key=None, request_id=None):
+    """
+    Context manager sharing one session (one pooled connection) between every
+    get_db_session() call and every controller created without a session inside it.
+    The router opens one scope per WebSocket message; the session itself is only
+    created when the first caller asks for it.
+
+    With atomic=False the scope commits when it exits and repository commits
+    take effect immediately. Pending work is rolled back instead when the scope
+    exits with an exception, was fail()ed (the router does so for responses with
+    success: False) or a failed flush left its transaction inactive.
+
+    With atomic=True all work runs in one outer transaction: repository
+    commit()/rollback() calls only release or roll back a SAVEPOINT, and the
+    outer transaction commits once when the scope exits without an exception
+    (and was not fail()ed) and rolls back otherwise.
+
+    With read_only=True (READ routes) the session may be bound to a read replica
+    (see get_replica_set); sticky_key identifies the client so that its reads go to
+    the primary for a while after a scope with read_only=False, which is how a
+    client reads its own writes. Atomic scopes always use the primary.
+
+    request_id labels the connections the scope holds in the pool metrics.
 
-if _engine is None and _session_factory is None:
+    Nested scopes reuse the outer scope.
+
+    Usage:
+        with request_session_scope(atomic=True) as scope:
+            handle_assign_worker_to_shift(...)
+            handle_update_shift_requirements(...)
+    """
+    existing = _request_scope.get()
+    if existing is not None:
+        if not read_only:
+            existing.record_write(sticky_key)
+        yield existing
+        return
+
+    scope = _RequestScope(atomic=atomic, read_only=read_only, sticky_key=sticky_key, request_id=request_id)
+    if not read_only:
+        scope.record_write(sticky_key)
+    token = _request_scope.set(scope)
+    success = False
     try:
-        print("Initial attempt to initialize database and session factory from main.py module load...")
-        initialize_database_and_session_factory()
-    except Exception as e:
-        print(f"⚠️ Initial attempt to initialize database failed during module load: {e}. Will retry on first session request.")
+        yield scope
+        success = True
+    finally:
+        _request_scope.reset(token)
+        scope.finish(success)
+
+def async_database_available():
+    """
+    True when the asyncio path can be used: enabled by DB_ASYNC_ENABLED and the async
+    driver (aiomysql) and greenlet are installed. Routes fall back to their sync handlers otherwise.
+    """
+    if os.getenv('DB_ASYNC_ENABLED', 'true').lower() != 'true':
+        return False
+    return all(importlib.util.find_spec(module) is not None for module in ('aiomysql', 'greenlet'))
+
+
+def get_async_engine():
+    """Returns the asyncio engine, creating it on first use"""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        _async_engine = create_async_engine(
+            get_database_url('aiomysql'),
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            pool_size=int(os.getenv('DB_ASYNC_POOL_SIZE', '20')),
+            max_overflow=int(os.getenv('DB_ASYNC_MAX_OVERFLOW', '20')),
+            pool_timeout=30,
+            connect_args={'connect_timeout': 30, 'charset': 'utf8mb4', **statement_timeout_args()}
+        )
+        # Objects stay readable after commit, async sessions cannot lazy load expired attributes
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        watch_engine(_async_engine.sync_engine, database_breaker)
+        watch_queries(_async_engine.sync_engine)
+        logger.info(f"Async database engine created: {_database_label()}")
+    return _async_engine
+
+
+def create_async_session():
+    """Creates a new AsyncSession from the async factory"""
+    get_async_engine()
+    return _async_session_factory()
+
+
+@asynccontextmanager
+async def get_async_db_session():
+    """
+    Async counterpart of get_db_session() for handlers running on the event loop.
+    Queries run on the asyncio engine's own pool, so concurrent reads overlap on one
+    event loop instead of each holding a worker thread.
+
+    Usage:
+        async with get_async_db_session() as session:
+            result = await session.execute(select(User).where(User.isActive == True))
+            users = result.scalars().all()
+    """
+    async def connect():
+        session = create_async_session()
+        try:
+            await session.connection()
+        except Exception:
+            await session.close()
+            raise
+        return session
+
+    session = await database_retry.call_async(connect)
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def dispose_async_engine():
+    """Close the asyncio engine's pooled connections (server shutdown)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
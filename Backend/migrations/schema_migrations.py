@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migrations for EasyShifts
+Applies the numbered migrations in migrations/versions/ in order and records each one
+in the schema_migrations table, so every database knows exactly which DDL it has run.
+
+The schema_state table stores a fingerprint of the models and migrations the database
+was last brought up to date with. Startup (ensure_schema) only compares that one hash
+and skips create_all's table-by-table reflection when it matches; the migrate command
+does the full work and records the new fingerprint.
+
+Usage:
+    python migrations/schema_migrations.py status
+    python migrations/schema_migrations.py migrate                  # create tables, upgrade, fingerprint
+    python migrations/schema_migrations.py upgrade [--to VERSION]
+    python migrations/schema_migrations.py downgrade --to VERSION
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pkgutil
+import sys
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'versions')
+
+schema_migrations_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', schema_migrations_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+schema_state = Table(
+    'schema_state', schema_migrations_metadata,
+    Column('name', String(50), primary_key=True),
+    Column('fingerprint', String(64), nullable=False),
+    Column('updated_at', DateTime, nullable=False),
+)
+
+SCHEMA_STATE_NAME = 'models'
+
+# Every module declaring tables on db.models.Base; the fingerprint must not depend on import order
+MODEL_MODULES = ('db.models', 'db.extended_settings_models', 'db.additional_settings_models')
+
+
+class Migration(NamedTuple):
+    """One module of migrations/versions/ (vNNNN_name.py defining upgrade() and downgrade())"""
+    version: int
+    name: str
+    module: object
+
+
+def load_migrations() -> List[Migration]:
+    """All migrations in version order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules([VERSIONS_DIR]):
+        if not module_info.name.startswith('v'):
+            continue
+        module = importlib.import_module(f'migrations.versions.{module_info.name}')
+        migrations.append(Migration(module.VERSION, module_info.name, module))
+
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {VERSIONS_DIR}: {versions}")
+    return migrations
+
+
+def get_applied_versions(connection: Connection) -> List[int]:
+    """Versions recorded in schema_migrations (creating the table on first use)"""
+    schema_migrations_metadata.create_all(connection, checkfirst=True)
+    return sorted(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine: Engine, target: int = None) -> List[int]:
+    """
+    Applies every pending migration up to target (all by default), each in its own transaction.
+
+    Returns:
+        List[int]: The versions applied.
+    """
+    applied = []
+    with engine.connect() as connection:
+        with connection.begin():
+            done = set(get_applied_versions(connection))
+
+        for migration in load_migrations():
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            logger.info(f"Applying migration {migration.name}")
+            with connection.begin():
+                migration.module.upgrade(connection)
+                connection.execute(schema_migrations.insert().values(
+                    version=migration.version, name=migration.name, applied_at=datetime.now()))
+            applied.append(migration.version)
+    return applied
+
+
+def downgrade(engine: Engine, target: int) -> List[int]:
+    """
+    Reverts applied migrations newer than target, newest first.
+
+    Returns:
+        List[int]: The versions reverted.
+    """
+    reverted = []
+    with engine.connect() as connection:
+        with connection.begin():
+            done = set(get_applied_versions(connection))
+
+        for migration in reversed(load_migrations()):
+            if migration.version not in done or migration.version <= target:
+                continue
+            logger.info(f"Reverting migration {migration.name}")
+            with connection.begin():
+                migration.module.downgrade(connection)
+                connection.execute(schema_migrations.delete().where(
+                    schema_migrations.c.version == migration.version))
+            reverted.append(migration.version)
+    return reverted
+
+
+def stamp(connection: Connection, versions: List[int]):
+    """Records migrations as applied without running them (their DDL is already in the models)"""
+    names = {migration.version: migration.name for migration in load_migrations()}
+    if versions:
+        connection.execute(schema_migrations.insert(), [
+            {'version': version, 'name': names[version], 'applied_at': datetime.now()} for version in versions])
+
+
+def status(engine: Engine) -> List[dict]:
+    """Every known migration and whether it has been applied"""
+    with engine.connect() as connection:
+        with connection.begin():
+            done = set(get_applied_versions(connection))
+    return [{'version': migration.version, 'name': migration.name, 'applied': migration.version in done}
+            for migration in load_migrations()]
+
+
+# ---------------------------------------------------------------------------
+# Schema fingerprint
+# ---------------------------------------------------------------------------
+
+def model_metadata() -> MetaData:
+    """Base.metadata with the tables of every model module registered"""
+    for module_name in MODEL_MODULES:
+        importlib.import_module(module_name)
+    from db.models import Base
+    return Base.metadata
+
+
+def schema_fingerprint(metadata: MetaData = None) -> str:
+    """SHA-256 of the tables, columns, indexes and foreign keys of the models, and the migration versions"""
+    metadata = metadata if metadata is not None else model_metadata()
+    tables = []
+    for table in sorted(metadata.tables.values(), key=lambda table: table.name):
+        tables.append({
+            'name': table.name,
+            'columns': [[column.name, str(column.type), column.nullable, column.primary_key]
+                        for column in table.columns],
+            'indexes': sorted([index.name, [column.name for column in index.columns], index.unique]
+                              for index in table.indexes),
+            'foreign_keys': sorted([key.parent.name, key.target_fullname] for key in table.foreign_keys),
+        })
+    document = {'tables': tables, 'migrations': [migration.version for migration in load_migrations()]}
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+
+def stored_fingerprint(connection: Connection) -> Optional[str]:
+    """The fingerprint recorded by the last migrate, None if there is none (or no schema_state table)"""
+    try:
+        return connection.execute(select(schema_state.c.fingerprint).where(
+            schema_state.c.name == SCHEMA_STATE_NAME)).scalar()
+    except DBAPIError:
+        connection.rollback()
+        return None
+
+
+def record_fingerprint(connection: Connection, fingerprint: str):
+    schema_migrations_metadata.create_all(connection, checkfirst=True)
+    connection.execute(schema_state.delete().where(schema_state.c.name == SCHEMA_STATE_NAME))
+    connection.execute(schema_state.insert().values(
+        name=SCHEMA_STATE_NAME, fingerprint=fingerprint, updated_at=datetime.now()))
+
+
+def ensure_schema(engine: Engine, auto_create: bool = True) -> str:
+    """
+    Startup check: one SELECT of the stored fingerprint when the schema is up to date.
+
+    Otherwise, with auto_create, creates missing tables like create_all did on every boot.
+    A new, empty database is then fully current (its migrations are stamped as applied);
+    an existing one with pending migrations keeps taking this slow path until migrate runs.
+
+    Returns:
+        str: 'current', 'created', 'pending' (migrations to run) or 'stale' (auto_create off).
+    """
+    fingerprint = schema_fingerprint()
+    with engine.connect() as connection:
+        if stored_fingerprint(connection) == fingerprint:
+            return 'current'
+
+    if not auto_create:
+        logger.warning("Database schema differs from the models; run: python migrations/schema_migrations.py migrate")
+        return 'stale'
+
+    metadata = model_metadata()
+    with engine.begin() as connection:
+        fresh = not set(inspect(connection).get_table_names()) & set(metadata.tables)
+        metadata.create_all(connection, checkfirst=True)
+        applied = set(get_applied_versions(connection))
+        pending = [migration.version for migration in load_migrations() if migration.version not in applied]
+
+        if pending and not fresh:
+            logger.warning(f"Schema migrations {pending} are pending; "
+                           f"run: python migrations/schema_migrations.py migrate")
+            return 'pending'
+
+        stamp(connection, pending)
+        record_fingerprint(connection, fingerprint)
+    return 'created'
+
+
+def migrate(engine: Engine) -> List[int]:
+    """
+    The full schema update: create missing tables, apply pending migrations and record
+    the fingerprint, so the next startups take the fast path.
+
+    Returns:
+        List[int]: The versions applied.
+    """
+    metadata = model_metadata()
+    metadata.create_all(engine, checkfirst=True)
+    applied = upgrade(engine)
+    with engine.begin() as connection:
+        record_fingerprint(connection, schema_fingerprint(metadata))
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Helpers for migration modules
+# ---------------------------------------------------------------------------
+
+def create_index(connection: Connection, table: str, name: str, columns: List[str]) -> bool:
+    """
+    Creates an index unless one with the same name, or on exactly the same columns, exists.
+
+    Returns:
+        bool: True if the index was created.
+    """
+    for index in inspect(connection).get_indexes(table):
+        if index['name'] == name or index['column_names'] == columns:
+            logger.info(f"Index {name} on {table} already present as {index['name']}, skipping")
+            return False
+
+    preparer = connection.dialect.identifier_preparer
+    column_list = ', '.join(preparer.quote(column) for column in columns)
+    connection.exec_driver_sql(f"CREATE INDEX {preparer.quote(name)} ON {preparer.quote(table)} ({column_list})")
+    return True
+
+
+def drop_index(connection: Connection, table: str, name: str) -> bool:
+    """
+    Drops an index created by create_index() if it exists.
+
+    Returns:
+        bool: True if the index was dropped.
+    """
+    if name not in {index['name'] for index in inspect(connection).get_indexes(table)}:
+        return False
+
+    preparer = connection.dialect.identifier_preparer
+    if connection.dialect.name in ('mysql', 'mariadb'):
+        connection.exec_driver_sql(f"DROP INDEX {preparer.quote(name)} ON {preparer.quote(table)}")
+    else:
+        connection.exec_driver_sql(f"DROP INDEX {preparer.quote(name)}")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or revert EasyShifts schema migrations")
+    parser.add_argument('command', choices=['status', 'migrate', 'upgrade', 'downgrade'])
+    parser.add_argument('--to', type=int, default=None, help="Target version")
+    args = parser.parse_args(argv)
+
+    if args.command == 'downgrade' and args.to is None:
+        parser.error("downgrade needs --to VERSION")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from main import get_engine
+    engine = get_engine()
+
+    if args.command == 'status':
+        for row in status(engine):
+            print(f"{'✓' if row['applied'] else ' '} {row['version']:04d} {row['name']}")
+        with engine.connect() as connection:
+            current = stored_fingerprint(connection) == schema_fingerprint()
+        print(f"Schema fingerprint: {'current' if current else 'out of date, run migrate'}")
+    elif args.command == 'migrate':
+        applied = migrate(engine)
+        print(f"✓ Applied {len(applied)} migration(s): {applied}, schema fingerprint recorded")
+    elif args.command == 'upgrade':
+        applied = upgrade(engine, args.to)
+        print(f"✓ Applied {len(applied)} migration(s): {applied}")
+    else:
+        reverted = downgrade(engine, args.to)
+        print(f"✓ Reverted {len(reverted)} migration(s): {reverted}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
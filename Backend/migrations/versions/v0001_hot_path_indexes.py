@@ -0,0 +1,37 @@
+"""
+Hot Path Indexes
+Composite indexes for the shift, assignment, timesheet, job and user filters that
+dominate the slow-query log. Mirrors the Index() declarations in db/models.py.
+"""
+
+from migrations.schema_migrations import create_index, drop_index
+
+VERSION = 1
+
+# (table, index name, columns) - access path served
+INDEXES = [
+    # Shift start ranges (shift_start_in_range: get_shifts_by_date_range, the schedule read model)
+    ('shifts', 'ix_shifts_start_datetime', ['shift_start_datetime']),
+    ('shifts', 'ix_shifts_date_part', ['shiftDate', 'shiftPart']),
+    # get_shifts_by_job_id, ordered by start
+    ('shifts', 'ix_shifts_job_start', ['job_id', 'shift_start_datetime']),
+    # Shifts of a worker (the primary key leads with shiftID)
+    ('shiftWorkers', 'ix_shift_workers_user', ['userID', 'shiftID']),
+    # Submitted timesheet listings
+    ('shiftWorkers', 'ix_shift_workers_times_submitted', ['times_submitted_at']),
+    # Jobs of a client company
+    ('jobs', 'ix_jobs_client_company', ['client_company_id', 'is_active']),
+    # Client users of a company and the approved-worker lists
+    ('users', 'ix_users_client_company', ['client_company_id']),
+    ('users', 'ix_users_role_flags', ['isManager', 'isActive', 'isApproval']),
+]
+
+
+def upgrade(connection):
+    for table, name, columns in INDEXES:
+        create_index(connection, table, name, columns)
+
+
+def downgrade(connection):
+    for table, name, _ in reversed(INDEXES):
+        drop_index(connection, table, name)
@@ -0,0 +1,85 @@
+"""
+Canonical Shift Start
+Completes the backfill migrate_shift_datetime.py started: every shift gets a
+shift_start_datetime (from shiftDate / shiftPart where missing), the column becomes
+NOT NULL, and the legacy fields are rewritten from it. Its index, ix_shifts_start_datetime,
+is created by v0001_hot_path_indexes.
+"""
+
+from datetime import datetime, time
+
+from sqlalchemy import text
+
+VERSION = 2
+
+# Start and end hour of each legacy shift part (db.models.SHIFT_PART_HOURS when written)
+SHIFT_PART_HOURS = {
+    'morning': (8, 12),
+    'noon': (12, 17),
+    'evening': (17, 22),
+}
+
+
+def _part_key(shift_part) -> str:
+    # Enum columns store the member name ('Morning'); older raw SQL wrote the value ('morning')
+    return str(shift_part).lower() if shift_part else 'morning'
+
+
+def _part_for(start: datetime) -> str:
+    if start.hour < SHIFT_PART_HOURS['noon'][0]:
+        return 'Morning'
+    if start.hour < SHIFT_PART_HOURS['evening'][0]:
+        return 'Noon'
+    return 'Evening'
+
+
+def _as_date(value):
+    # SQLite hands back dates as strings on raw connections
+    return datetime.fromisoformat(value).date() if isinstance(value, str) else value
+
+
+def _as_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def upgrade(connection):
+    # 1. Start / end datetimes for shifts only known by date and part
+    rows = connection.execute(text(
+        "SELECT id, shiftDate, shiftPart FROM shifts WHERE shift_start_datetime IS NULL AND shiftDate IS NOT NULL"
+    )).all()
+    backfill = []
+    for shift_id, shift_date, shift_part in rows:
+        start_hour, end_hour = SHIFT_PART_HOURS.get(_part_key(shift_part), SHIFT_PART_HOURS['morning'])
+        shift_date = _as_date(shift_date)
+        backfill.append({'id': shift_id,
+                         'start': datetime.combine(shift_date, time(start_hour)),
+                         'end': datetime.combine(shift_date, time(end_hour))})
+    if backfill:
+        connection.execute(text(
+            "UPDATE shifts SET shift_start_datetime = :start, "
+            "shift_end_datetime = COALESCE(shift_end_datetime, :end) WHERE id = :id"
+        ), backfill)
+
+    missing = connection.execute(text("SELECT COUNT(*) FROM shifts WHERE shift_start_datetime IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} shift(s) have neither shift_start_datetime nor shiftDate; "
+                           f"set their start times before running this migration")
+
+    # 2. Legacy fields derived from the start time
+    rows = connection.execute(text("SELECT id, shift_start_datetime FROM shifts")).all()
+    derived = [{'id': shift_id, 'shift_date': _as_datetime(start).date(), 'shift_part': _part_for(_as_datetime(start))}
+               for shift_id, start in rows]
+    if derived:
+        connection.execute(text(
+            "UPDATE shifts SET shiftDate = :shift_date, shiftPart = :shift_part WHERE id = :id"
+        ), derived)
+
+    # 3. NOT NULL (SQLite cannot alter a column; databases created from the models already have it)
+    if connection.dialect.name in ('mysql', 'mariadb'):
+        connection.exec_driver_sql("ALTER TABLE shifts MODIFY shift_start_datetime DATETIME NOT NULL")
+
+
+def downgrade(connection):
+    # The backfilled values are kept, only the constraint is relaxed
+    if connection.dialect.name in ('mysql', 'mariadb'):
+        connection.exec_driver_sql("ALTER TABLE shifts MODIFY shift_start_datetime DATETIME NULL")
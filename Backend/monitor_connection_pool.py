@@ -23,24 +23,33 @@ def load_environment():
                     os.environ[key] = value
 
 def monitor_database_connections():
-    """Monitor database connection pool"""
+    """Monitor database connection pool of the running server (pool telemetry lives in its process)"""
     print("🗄️  Database Connection Pool Status")
     print("-" * 40)
     
     try:
-        from main import get_db_session, engine
+        import requests
         
-        # Get connection pool info
-        pool = engine.pool
+        health_url = os.getenv('MONITOR_HEALTH_URL', f"http://localhost:{os.getenv('PORT', '8080')}/health")
+        pool = requests.get(health_url, timeout=10).json().get('pool')
+        if pool is None:
+            print("   ⚠️  Server has not connected to the database yet")
+            return {'error': 'database not initialized'}
         
-        print(f"   Pool Size: {pool.size()}")
-        print(f"   Checked Out: {pool.checkedout()}")
-        print(f"   Overflow: {pool.overflow()}")
-        print(f"   Checked In: {pool.checkedin()}")
+        metrics = pool['metrics']
+        print(f"   Pool Size: {pool['pool_size']} (+{pool['max_overflow']} overflow)")
+        print(f"   Checked Out: {pool['checked_out']} (peak {metrics['peak_checked_out']})")
+        print(f"   Overflow: {pool['overflow']}")
+        print(f"   Checked In: {pool['checked_in']}")
+        print(f"   Checkout Wait: p50 {metrics['checkout_wait_ms']['p50']} ms, "
+              f"p95 {metrics['checkout_wait_ms']['p95']} ms")
+        print(f"   Timeouts: {metrics['timeouts']}, Overflow Checkouts: {metrics['overflow_checkouts']}")
+        for held in metrics['long_held']:
+            print(f"   ⚠️  Connection held {held['held_seconds']}s by request {held['request_id']}")
         
         # Calculate utilization
-        total_connections = pool.size() + pool.overflow()
-        used_connections = pool.checkedout()
+        total_connections = pool['pool_size'] + pool['max_overflow']
+        used_connections = pool['checked_out']
         utilization = (used_connections / total_connections * 100) if total_connections > 0 else 0
         
         print(f"   Utilization: {utilization:.1f}%")
@@ -53,11 +62,21 @@ def monitor_database_connections():
         else:
             print("   Status: ✅ NORMAL")
         
+        recommendation = pool['recommendation']
+        recommended = recommendation['recommended']
+        print(f"   Recommended: pool_size={recommended['pool_size']} max_overflow={recommended['max_overflow']}")
+        for reason in recommendation['reasons']:
+            print(f"      • {reason}")
+        
         return {
-            'pool_size': pool.size(),
-            'checked_out': pool.checkedout(),
-            'overflow': pool.overflow(),
-            'checked_in': pool.checkedin(),
+            'pool_size': pool['pool_size'],
+            'checked_out': pool['checked_out'],
+            'overflow': pool['overflow'],
+            'checked_in': pool['checked_in'],
+            'checkout_wait_p95_ms': metrics['checkout_wait_ms']['p95'],
+            'timeouts': metrics['timeouts'],
+            'long_held': metrics['long_held'],
+            'recommendation': recommended,
             'utilization': utilization,
             'status': 'high' if utilization > 80 else 'moderate' if utilization > 60 else 'normal'
         }
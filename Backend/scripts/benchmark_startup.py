@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup Import Benchmark for EasyShifts
+Imports Server.py in a fresh interpreter under `python -X importtime`, reports the
+total import time and the slowest modules, and fails when the import exceeds the
+budget or imports a database/Redis driver (importing must do no I/O; connections
+are made by the on_startup hook).
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --module main --budget-ms 400 --top 15
+    python scripts/benchmark_startup.py --runs 5
+
+Import times are measured cold (no warm module cache in the child), so take the
+median of a few runs on CI.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Drivers that are only imported once an engine or Redis client is created
+DRIVER_MODULES = ('pymysql', 'aiomysql', 'redis')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, self µs, cumulative µs, depth) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+def measure(module: str) -> list:
+    """Import module in a fresh interpreter and return its parsed importtime lines"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import time of the backend server")
+    parser.add_argument('--module', default='Server', help="Module to import (default: Server)")
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_IMPORT_BUDGET_MS', '1000')),
+                        help="Fail when the median import takes longer (default: STARTUP_IMPORT_BUDGET_MS or 1000)")
+    parser.add_argument('--runs', type=int, default=3, help="Fresh interpreters to measure")
+    parser.add_argument('--top', type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args(argv)
+
+    totals, modules = [], []
+    for _ in range(args.runs):
+        modules = measure(args.module)
+        totals.append(next(cumulative for name, _, cumulative, depth in modules
+                           if name == args.module and depth == 0) / 1000)
+    total_ms = statistics.median(totals)
+
+    print(f"import {args.module}: {total_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:g} ms)")
+    print(f"{'cumulative':>12} {'self':>9}  module")
+    top_level = [entry for entry in modules if entry[3] <= 1]
+    for name, self_us, cumulative_us, _ in sorted(top_level, key=lambda entry: -entry[2])[:args.top]:
+        print(f"{cumulative_us / 1000:9.1f} ms {self_us / 1000:6.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.1f} ms, over the {args.budget_ms:g} ms budget")
+    drivers = sorted({name for name, *_ in modules if name in DRIVER_MODULES})
+    if drivers:
+        failures.append(f"importing creates a database or Redis client (imported {', '.join(drivers)})")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Fixtures shared by the backend tests"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main
+from db.models import Base
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test sets now"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def memory_engine(savepoints: bool = False):
+    """
+    In-memory SQLite engine shared by every thread, with the tables created. With
+    savepoints the driver's implicit transactions are turned off so nested transactions
+    (SAVEPOINT) work.
+    """
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    if savepoints:
+        @event.listens_for(engine, "connect")
+        def do_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def do_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def count_statements(test, engine) -> list:
+    """List the SQL statements engine executes get appended to, until the test is cleaned up"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    test.addCleanup(event.remove, engine, 'before_cursor_execute', record)
+    return statements
+
+
+def use_engine(test, engine):
+    """Point main's engine and session factory at engine, restoring them when the test is cleaned up"""
+    saved = (main._engine, main._session_factory, main._initialization_error, main._replicas)
+
+    def restore():
+        main._engine, main._session_factory, main._initialization_error, main._replicas = saved
+
+    test.addCleanup(restore)
+    main._engine = engine
+    main._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    main._initialization_error = None
@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from db.models import ClientCompany
+from websocket.batch_requests import handle_batch_request, is_batch_request
+from tests.helpers import memory_engine, use_engine
+
+
+def create_company(data, session=None):
+    """Handler stand-in that writes through get_db_session() like the real handlers."""
+    with main.get_db_session() as db:
+        if data.get('fail'):
+            return {"success": False, "error": "rejected"}
+        db.add(ClientCompany(name=data['name']))
+        db.commit()
+    return {"success": True, "session_id": id(db)}
+
+
+class TestBatchRequests(unittest.TestCase):
+    """Tests for the batch request envelope."""
+
+    def setUp(self):
+        self.engine = memory_engine(savepoints=True)
+        use_engine(self, self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def dispatch(self, request_id, data):
+        return create_company(data)
+
+    def company_names(self):
+        with main.get_db_session() as db:
+            return sorted(company.name for company in db.query(ClientCompany).all())
+
+    def test_is_batch_request(self):
+        self.assertTrue(is_batch_request({"batch": []}))
+        self.assertFalse(is_batch_request({"request_id": 1}))
+
+    def test_atomic_batch_shares_one_session_and_commits_once(self):
+        envelope = {"atomic": True, "batch": [
+            {"request_id": 201, "data": {"name": "Acme"}},
+            {"request_id": 201, "data": {"name": "Globex"}},
+        ]}
+        result = handle_batch_request(envelope, self.dispatch)
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["committed"])
+        self.assertEqual(len({r["session_id"] for r in result["responses"]}), 1)
+        self.assertEqual(self.company_names(), ["Acme", "Globex"])
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        envelope = {"atomic": True, "batch": [
+            {"request_id": 201, "data": {"name": "Acme"}},
+            {"request_id": 201, "data": {"fail": True}},
+            {"request_id": 201, "data": {"name": "Globex"}},
+        ]}
+        result = handle_batch_request(envelope, self.dispatch)
+
+        self.assertFalse(result["success"])
+        self.assertFalse(result["committed"])
+        self.assertEqual(len(result["responses"]), 3)
+        self.assertIn("rolled back", result["responses"][2]["error"])
+        self.assertEqual(self.company_names(), [])
+
+    def test_non_atomic_batch_keeps_successful_entries(self):
+        envelope = {"batch": [
+            {"request_id": 201, "data": {"name": "Acme"}},
+            {"request_id": 201, "data": {"fail": True}},
+            {"data": {"name": "missing id"}},
+            {"request_id": 201, "data": {"name": "Globex"}},
+        ]}
+        result = handle_batch_request(envelope, self.dispatch)
+
+        self.assertFalse(result["success"])
+        self.assertEqual([r["success"] for r in result["responses"]], [True, False, False, True])
+        self.assertEqual(self.company_names(), ["Acme", "Globex"])
+
+    def test_invalid_envelope(self):
+        self.assertFalse(handle_batch_request({"batch": []}, self.dispatch)["success"])
+        self.assertFalse(handle_batch_request({"batch": "nope"}, self.dispatch)["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
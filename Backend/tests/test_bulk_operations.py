@@ -0,0 +1,108 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from db.models import ClientCompany
+from db.controllers.client_companies_controller import ClientCompaniesController
+from db.unit_of_work import unit_of_work
+from tests.helpers import count_statements, memory_engine
+
+
+class TestBulkOperations(unittest.TestCase):
+    """Tests for the bulk repository APIs and the unit of work."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        self.session = sessionmaker(bind=self.engine)()
+        self.controller = ClientCompaniesController(self.session)
+
+        self.statements = count_statements(self, self.engine)
+        self.commits = 0
+        event.listen(self.session, 'after_commit', self._count_commit)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _count_commit(self, session):
+        self.commits += 1
+
+    def statement_kinds(self):
+        return [statement.split()[0].upper() for statement in self.statements]
+
+    def company_names(self):
+        return sorted(name for (name,) in self.session.query(ClientCompany.name).all())
+
+    def test_create_entities_commits_once(self):
+        companies = self.controller.create_entities([{'name': f'Company {i}'} for i in range(20)])
+
+        self.assertEqual([c.name for c in companies], [f'Company {i}' for i in range(20)])
+        self.assertEqual(len({c.id for c in companies}), 20)
+        self.assertEqual(self.commits, 1)
+        # One reload query instead of one refresh per entity
+        self.assertEqual(self.statement_kinds().count('SELECT'), 1)
+
+    def test_create_entities_with_no_data(self):
+        self.assertEqual(self.controller.create_entities([]), [])
+        self.assertEqual(self.statements, [])
+
+    def test_update_entities(self):
+        companies = self.controller.create_entities([{'name': 'Acme'}, {'name': 'Globex'}])
+        self.statements.clear()
+
+        updated = self.controller.update_entities([
+            {'id': companies[0].id, 'name': 'Acme Inc'},
+            {'id': companies[1].id, 'name': 'Globex Corp'},
+        ])
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.statement_kinds().count('UPDATE'), 1)
+        self.assertEqual(self.company_names(), ['Acme Inc', 'Globex Corp'])
+
+    def test_delete_where(self):
+        self.controller.create_entities([{'name': 'Acme'}, {'name': 'Globex'}, {'name': 'Initech'}])
+
+        deleted = self.controller.delete_where(ClientCompany.name.in_(['Acme', 'Initech']))
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(self.company_names(), ['Globex'])
+
+    def test_delete_where_needs_criteria(self):
+        with self.assertRaises(ValueError):
+            self.controller.delete_where()
+
+    def test_unit_of_work_commits_once(self):
+        with unit_of_work(self.session):
+            for name in ['Acme', 'Globex', 'Initech']:
+                self.controller.create_entity({'name': name})
+            self.assertEqual(self.commits, 0)
+
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(self.company_names(), ['Acme', 'Globex', 'Initech'])
+
+    def test_unit_of_work_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with unit_of_work(self.session):
+                self.controller.create_entity({'name': 'Acme'})
+                raise ValueError("boom")
+
+        self.assertEqual(self.commits, 0)
+        self.assertEqual(self.company_names(), [])
+
+    def test_nested_unit_of_work_joins_outer(self):
+        with unit_of_work(self.session):
+            self.controller.create_entity({'name': 'Acme'})
+            with unit_of_work(self.session):
+                self.controller.create_entity({'name': 'Globex'})
+            self.assertEqual(self.commits, 0)
+
+        self.assertEqual(self.commits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache.redis_cache import SmartCache
+from cache.response_cache import ResponseCache
+from websocket.request_router import RequestRouter, RequestContext
+from websocket.metrics import MetricsWriter, _write_cache_compression
+from tests.helpers import FakeClock
+
+
+class DictCacheManager:
+    """RedisCacheManager stand-in with the recomputation locks"""
+
+    def __init__(self):
+        self.values = {}
+        self.locks = {}
+        self.reads = 0
+
+    def get_cache_raw(self, key):
+        self.reads += 1
+        return self.values.get(key)
+
+    def set_cache_raw(self, key, data, ttl):
+        self.values[key] = data
+        return True
+
+    def acquire_lock(self, key, token, ttl_seconds):
+        return self.locks.setdefault(key, token) == token
+
+    def release_lock(self, key, token):
+        return self.locks.get(key) == token and self.locks.pop(key) is not None
+
+
+def make_cache(manager, clock=None):
+    cache = SmartCache()
+    cache.cache_manager = manager
+    cache.local = None
+    cache.tag_generations.get = lambda tags: [1] * len(tags)
+    cache.early_refresh_beta = 0
+    if clock is not None:
+        cache.clock = clock
+    return cache
+
+
+class TestGetOrCompute(unittest.TestCase):
+    """Tests for SmartCache.get_or_compute stampede protection."""
+
+    def setUp(self):
+        self.manager = DictCacheManager()
+        self.clock = FakeClock()
+        self.cache = make_cache(self.manager, self.clock)
+        self.calls = 0
+
+    def loader(self, value='fresh'):
+        def load():
+            self.calls += 1
+            return {'schedule': value}
+        return load
+
+    def failing_loader(self):
+        self.calls += 1
+        raise RuntimeError('database is down')
+
+    def test_concurrent_misses_compute_once(self):
+        cache = make_cache(self.manager)
+        release = threading.Event()
+        results = []
+
+        def slow_loader():
+            self.calls += 1
+            release.wait(2)
+            return {'shifts': [1, 2]}
+
+        threads = [threading.Thread(target=lambda: results.append(
+            cache.get_or_compute('schedule_data', slow_loader, 'week'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'shifts': [1, 2]}] * 8)
+        # Each waiter got its own copy
+        self.assertEqual(len({id(result) for result in results}), 8)
+        counts = {row['outcome']: row['count'] for row in cache.get_compute_counts()}
+        self.assertEqual(counts, {'computed': 1, 'coalesced': 7})
+        self.assertEqual(self.manager.locks, {})
+
+    def test_expired_entry_is_served_while_another_instance_recomputes(self):
+        self.cache.get_or_compute('schedule_data', self.loader('old'), 'week', ttl=300)
+        self.clock.now += 301
+        self.assertIsNone(self.cache.get('schedule_data', 'week'))
+
+        key = next(iter(self.manager.values))
+        self.manager.locks[key] = 'other instance'
+        self.assertEqual(self.cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'old'})
+        self.assertEqual(self.calls, 1)
+
+        del self.manager.locks[key]
+        self.assertEqual(self.cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'fresh'})
+        self.assertEqual(self.cache.get('schedule_data', 'week'), {'schedule': 'fresh'})
+        self.assertEqual(self.calls, 2)
+
+    def test_failed_recompute_serves_previous_value(self):
+        self.cache.get_or_compute('schedule_data', self.loader('old'), 'week', ttl=300)
+        self.clock.now += 301
+        self.assertEqual(self.cache.get_or_compute('schedule_data', self.failing_loader, 'week'),
+                         {'schedule': 'old'})
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_compute('schedule_data', self.failing_loader, 'other week')
+
+    def test_waits_for_the_value_computed_by_another_instance(self):
+        cache = make_cache(self.manager)
+        cache.lock_seconds = 2
+        other = make_cache(self.manager)
+        self.manager.locks[other._versioned_key('schedule_data', ('week',), {}, ())] = 'other instance'
+        threading.Timer(0.2, lambda: other.set(other.key('schedule_data', 'week'), {'schedule': 'theirs'})).start()
+
+        self.assertEqual(cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'theirs'})
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(cache.get_compute_counts()[0]['outcome'], 'lock_waited')
+
+    def test_early_refresh_scales_with_compute_time(self):
+        self.cache.set(self.cache.key('schedule_data', 'week'), {'schedule': 'old'}, ttl=300)
+        key = next(iter(self.manager.values))
+        header, _, body = self.manager.values[key].partition(b'\n')
+        header = {**json.loads(header), 'delta': 30.0}
+        self.manager.values[key] = json.dumps(header).encode() + b'\n' + body
+        self.clock.now += 299
+
+        self.assertEqual(self.cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'old'})
+        self.cache.early_refresh_beta = 1.0
+        with patch('cache.redis_cache.random.random', return_value=0.01):
+            # 30 s * -ln(0.99) = 0.3 s ahead: not due yet with 1 s left
+            self.assertEqual(self.cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'old'})
+        with patch('cache.redis_cache.random.random', return_value=0.5):
+            # 30 s * -ln(0.5) = 20.8 s ahead: due
+            self.assertEqual(self.cache.get_or_compute('schedule_data', self.loader(), 'week'), {'schedule': 'fresh'})
+        self.assertEqual(self.calls, 1)
+
+    def test_uncacheable_values_are_not_stored(self):
+        failure = {'success': False}
+        cacheable = lambda value: value.get('success') is True
+        self.cache.get_or_compute('schedule_data', lambda: failure, 'week', cacheable=cacheable)
+        self.assertEqual(self.manager.values, {})
+
+
+class TestAsyncDispatch(unittest.TestCase):
+    """Tests for stampede protection of routes awaited through dispatch_async."""
+
+    def test_concurrent_async_misses_compute_once(self):
+        router = RequestRouter()
+        router.response_cache = ResponseCache(cache=make_cache(DictCacheManager()), enabled=True)
+        calls = []
+
+        async def schedule(data, session):
+            calls.append(data)
+            await asyncio.sleep(0.1)
+            return {"success": True, "week": data["week"]}
+
+        router.register(2001, lambda data, session: None, cache='schedule_data',
+                        cache_key=lambda ctx: (ctx.data["week"],), async_handler=schedule)
+
+        async def run():
+            return await asyncio.gather(*(router.dispatch_async(RequestContext(2001, {"week": 1}))
+                                          for _ in range(8)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"success": True, "week": 1}] * 8)
+        self.assertEqual(router.get_route(2001).get_stats()["cache_hits"], 7)
+
+
+class TestCompressedValues(unittest.TestCase):
+    """Tests for the stored entry format and compression."""
+
+    def setUp(self):
+        self.manager = DictCacheManager()
+        self.cache = make_cache(self.manager)
+        self.cache.compress_min_bytes = 1024
+
+    def test_large_values_are_compressed(self):
+        schedule = {'shifts': [{'id': i, 'venue': 'Arena', 'role': 'stagehand'} for i in range(200)]}
+        self.cache.set(self.cache.key('schedule_data', 'week'), schedule)
+        self.cache.set(self.cache.key('schedule_data', 'empty week'), {'shifts': []})
+
+        stored = {json.loads(value.partition(b'\n')[0]).get('encoding') for value in self.manager.values.values()}
+        self.assertEqual(stored, {'zlib', None})
+        self.assertEqual(self.cache.get('schedule_data', 'week'), schedule)
+
+        stats = self.cache.get_compression_stats()
+        self.assertEqual((stats['values'], stats['compressed']), (2, 1))
+        self.assertGreater(stats['ratio'], 5)
+        self.assertEqual(stats['bytes_saved'], stats['json_bytes'] - stats['stored_bytes'])
+
+        writer = MetricsWriter()
+        _write_cache_compression(writer, stats)
+        self.assertIn(f"easyshifts_cache_compression_saved_bytes_total {stats['bytes_saved']}", writer.render())
+
+    def test_serialized_hits_return_the_stored_json(self):
+        value = {'success': True, 'data': ['x' * 2000]}
+        self.assertIs(self.cache.get_or_compute('employee_list', lambda: value, serialized=True), value)
+        text = self.cache.get_or_compute('employee_list', lambda: None, serialized=True)
+        self.assertEqual(text, json.dumps(value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from db.circuit_breaker import (
+    CircuitBreaker, RetryPolicy, DatabaseUnavailable, watch_engine, CLOSED, OPEN
+)
+from websocket.request_router import RequestRouter, RequestContext
+from tests.helpers import FakeClock
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for the database retry policy and circuit breaker."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.down = create_engine('sqlite:////nonexistent/easyshifts/down.db')
+        self.up = create_engine('sqlite://')
+        self.engine = self.down
+        self.breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10,
+                                      probe=self.select_one, clock=self.clock)
+        watch_engine(self.down, self.breaker)
+        watch_engine(self.up, self.breaker)
+        self.sleeps = []
+        self.retry = RetryPolicy(attempts=3, base_delay=0.5, max_delay=1.0, breaker=self.breaker,
+                                 jitter=lambda: 1.0)
+
+    def tearDown(self):
+        self.down.dispose()
+        self.up.dispose()
+
+    def select_one(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def test_backoff_is_capped_and_jittered(self):
+        self.assertEqual([self.retry.delay(attempt) for attempt in range(3)], [0.5, 1.0, 1.0])
+        self.assertEqual(RetryPolicy(jitter=lambda: 0.25).delay(1), 0.1)
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        for _ in range(2):
+            with self.assertRaises(OperationalError):
+                self.select_one()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        with self.assertRaises(DatabaseUnavailable) as raised:
+            self.breaker.check()
+        self.assertEqual(raised.exception.retry_after, 10)
+        self.assertEqual(self.breaker.get_stats()['rejected'], 1)
+
+    def test_half_open_probe(self):
+        for _ in range(2):
+            with self.assertRaises(OperationalError):
+                self.select_one()
+
+        # Probe fails: open again for another reset_timeout
+        self.clock.now += 10
+        with self.assertRaises(DatabaseUnavailable):
+            self.breaker.check()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_after(), 10)
+
+        # Probe succeeds: closed
+        self.engine = self.up
+        self.clock.now += 10
+        self.breaker.check()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_retry_stops_once_the_breaker_opens(self):
+        calls = []
+
+        def connect():
+            calls.append(1)
+            self.select_one()
+
+        with patch('db.circuit_breaker.time.sleep', self.sleeps.append):
+            with self.assertRaises(DatabaseUnavailable):
+                self.retry.call(connect)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.sleeps, [0.5])
+
+    def test_no_sleeping_on_the_event_loop(self):
+        async def inline_request():
+            self.retry.call(self.select_one)
+
+        with self.assertRaises(OperationalError):
+            asyncio.run(inline_request())
+        self.assertEqual(self.breaker.failures, 1)
+
+    def test_async_retry(self):
+        attempts = []
+
+        async def connect():
+            attempts.append(1)
+            if len(attempts) < 2:
+                self.select_one()
+            return 'connected'
+
+        self.assertEqual(asyncio.run(RetryPolicy(base_delay=0.001).call_async(connect)), 'connected')
+        self.assertEqual(len(attempts), 2)
+
+    def test_router_returns_structured_error(self):
+        router = RequestRouter()
+
+        @router.route(2001, name="schedule")
+        def schedule(ctx):
+            raise DatabaseUnavailable(4.2)
+
+        response = router.dispatch(RequestContext(2001, {}))
+        self.assertEqual(response['error_code'], 'database_unavailable')
+        self.assertEqual(response['retry_after'], 4.2)
+        self.assertFalse(response['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
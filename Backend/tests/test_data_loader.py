@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import sessionmaker
+
+from db.models import User, ClientCompany, Job, Shift, ShiftWorker, EmployeeType
+from db.data_loader import enable_data_loader
+from db.controllers.users_controller import UsersController
+from db.controllers.client_companies_controller import ClientCompaniesController
+from db.controllers.shiftWorkers_controller import ShiftWorkersController
+from tests.helpers import count_statements, memory_engine
+
+
+class TestDataLoader(unittest.TestCase):
+    """Tests for get_entities_by_ids and the per-request DataLoader."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.session.add_all([User(id=i, username=f'user{i}', name=f'User {i}') for i in range(1, 11)])
+        self.session.add_all([ClientCompany(id=1, name='Acme'), ClientCompany(id=2, name='Globex')])
+        self.session.add_all([
+            Job(id=1, name='Concert', client_company_id=1, venue_name='Arena', venue_address='1 Main St'),
+            Job(id=2, name='Expo', client_company_id=2, venue_name='Hall', venue_address='2 Main St'),
+            Shift(id=1, job_id=1, shift_start_datetime=datetime(2025, 1, 6, 8)),
+        ])
+        self.session.add_all([ShiftWorker(shiftID=1, userID=i, role_assigned=EmployeeType.STAGEHAND)
+                              for i in range(1, 11)])
+        self.session.commit()
+        self.session.expunge_all()
+
+        self.statements = count_statements(self, self.engine)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_get_entities_by_ids_uses_one_query(self):
+        users = UsersController(self.session).get_entities_by_ids([3, 1, 99, 3, None, 2])
+
+        self.assertEqual([user.id for user in users], [3, 1, 2])
+        self.assertEqual(len(self.statements), 1)
+
+    def test_get_entity_loop_is_coalesced(self):
+        enable_data_loader(self.session)
+        workers = ShiftWorkersController(self.session).get_shift_workers_by_shift_id(1)
+        users_controller = UsersController(self.session)
+
+        names = [users_controller.get_entity(str(sw.userID)).name for sw in workers]
+
+        self.assertEqual(len(names), 10)
+        # One query for the shift workers, one batched query for all ten users
+        self.assertEqual(len(self.statements), 2)
+
+    def test_results_are_memoized(self):
+        loader = enable_data_loader(self.session)
+        clients_controller = ClientCompaniesController(self.session)
+
+        first = clients_controller.get_entity(1)
+        self.assertIs(clients_controller.get_entity('1'), first)
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(loader.get_stats()['hits'], 1)
+
+    def test_referenced_ids_are_batched(self):
+        enable_data_loader(self.session)
+        jobs = self.session.query(Job).all()
+        clients_controller = ClientCompaniesController(self.session)
+
+        names = [clients_controller.get_entity(job.client_company_id).name for job in jobs]
+        self.assertEqual(names, ['Acme', 'Globex'])
+        self.assertEqual(len(self.statements), 2)
+
+    def test_missing_and_deleted_entities_raise(self):
+        enable_data_loader(self.session)
+        users_controller = UsersController(self.session)
+
+        with self.assertRaises(NoResultFound):
+            users_controller.get_entity(99)
+
+        user = users_controller.get_entity(5)
+        self.session.delete(user)
+        self.session.flush()
+        with self.assertRaises(NoResultFound):
+            users_controller.get_entity(5)
+
+
+if __name__ == '__main__':
+    unittest.main()
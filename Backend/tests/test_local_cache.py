@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache.local_cache import LocalCache, InvalidationChannel
+from cache.redis_cache import SmartCache
+from cache.tag_generations import TagGenerations
+from websocket.metrics import MetricsWriter, _write_cache_tiers
+from tests.helpers import FakeClock
+
+
+class DictCacheManager:
+    """RedisCacheManager stand-in shared by several SmartCache instances"""
+
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+
+    def get_cache_raw(self, key):
+        self.reads += 1
+        return self.values.get(key)
+
+    def set_cache_raw(self, key, data, ttl):
+        self.values[key] = data
+        return True
+
+    def delete_cache(self, key):
+        return self.values.pop(key, None) is not None
+
+    def clear_cache_pattern(self, pattern):
+        keys = [key for key in self.values if key.startswith(pattern.rstrip('*'))]
+        for key in keys:
+            del self.values[key]
+        return len(keys)
+
+
+class FakeRedis:
+    """Redis stand-in for the tag counters, delivering published messages to each subscribed channel"""
+
+    def __init__(self):
+        self.values = {}
+        self.channels = []
+        self.round_trips = 0
+
+    def publish(self, channel, message):
+        for subscriber in self.channels:
+            subscriber.handle(message)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, nx=False):
+        self.commands.append(lambda: None if nx and key in self.redis.values
+                             else self.redis.values.__setitem__(key, str(value)))
+
+    def mget(self, keys):
+        self.commands.append(lambda: [self.redis.values.get(key) for key in keys])
+
+    def incr(self, key):
+        def incr():
+            self.redis.values[key] = str(int(self.redis.values.get(key, 0)) + 1)
+            return self.redis.values[key]
+        self.commands.append(incr)
+
+    def execute(self):
+        self.redis.round_trips += 1
+        return [command() for command in self.commands]
+
+
+def make_cache(manager, redis):
+    cache = SmartCache()
+    cache.cache_manager = manager
+    cache.local = LocalCache(max_entries=100, max_bytes=10000)
+    cache.invalidation = InvalidationChannel(lambda: redis, cache._apply_invalidation, on_disconnect=cache._clear_local)
+    cache.invalidation.connected = True
+    cache.tag_generations = TagGenerations(lambda: redis, 'tag:', trusted=lambda: cache.invalidation.connected)
+    redis.channels.append(cache.invalidation)
+    return cache
+
+
+class TestLocalCache(unittest.TestCase):
+    """Tests for the in-process LRU."""
+
+    def setUp(self):
+        self.clock = FakeClock(0.0)
+        self.cache = LocalCache(max_entries=3, max_bytes=100, clock=self.clock)
+
+    def test_ttl_and_lru_eviction(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, 'x' * 10, ttl=60)
+        self.cache.get('a')
+        self.cache.set('d', 'x' * 10, ttl=60)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'x' * 10)
+
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get('a'))
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['evictions'], stats['expirations'], stats['entries']), (1, 1, 2))
+
+    def test_byte_bound(self):
+        self.cache.set('a', 'x' * 60, ttl=60)
+        self.cache.set('b', 'x' * 60, ttl=60)
+        self.assertFalse(self.cache.set('c', 'x' * 101, ttl=60))
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get_stats()['bytes'], 60)
+
+    def test_values_read_before_an_invalidation_are_not_stored(self):
+        generation = self.cache.generation
+        self.cache.invalidate_pattern('schedule_data:*')
+        self.assertFalse(self.cache.set('schedule_data:week', '{}', ttl=60, generation=generation))
+        self.assertTrue(self.cache.set('schedule_data:week', '{}', ttl=60, generation=self.cache.generation))
+
+
+class TestTwoTierCache(unittest.TestCase):
+    """Tests for SmartCache with the local tier and pub/sub invalidation."""
+
+    def setUp(self):
+        self.manager = DictCacheManager()
+        self.redis = FakeRedis()
+        self.first = make_cache(self.manager, self.redis)
+        self.second = make_cache(self.manager, self.redis)
+
+    def test_hits_are_served_locally_as_copies(self):
+        self.first.set(self.first.key('employee_list'), {'employees': [1, 2]})
+        response = self.first.get('employee_list')
+        response['employees'].append(3)
+
+        self.assertEqual(self.first.get('employee_list'), {'employees': [1, 2]})
+        self.assertEqual(self.manager.reads, 0)
+        self.assertEqual(self.first.get_tier_stats()['local']['hits'], 2)
+
+    def test_writes_invalidate_other_instances(self):
+        self.first.set(self.first.key('job_listings'), ['old'])
+        self.assertEqual(self.second.get('job_listings'), ['old'])
+        self.assertEqual(self.manager.reads, 1)
+
+        self.first.set(self.first.key('job_listings'), ['new'])
+        self.assertEqual(self.second.get('job_listings'), ['new'])
+
+        self.first.invalidate_type('job_listings')
+        self.assertIsNone(self.second.get('job_listings'))
+        self.assertEqual(self.second.get_tier_stats()['redis'], {'hits': 2, 'misses': 1})
+
+    def test_local_tier_is_skipped_when_unsubscribed_or_not_allowed(self):
+        self.first.set(self.first.key('analytics'), {'a': 1})
+        self.first.get('analytics')
+        self.assertEqual(self.manager.reads, 1)
+
+        self.first.set(self.first.key('employee_list'), [1])
+        self.first.invalidation._set_disconnected()
+        self.assertEqual(self.first.local.get_stats()['entries'], 0)
+        self.assertEqual(self.first.get('employee_list'), [1])
+        self.assertEqual(self.manager.reads, 2)
+
+    def test_tag_invalidation(self):
+        self.first.set(self.first.key('user_profile', 7), {'name': 'A'})
+        self.first.set(self.first.key('user_profile', 8), {'name': 'B'})
+        self.first.set(self.first.key('shift_data', 'job', 3), [1])
+        self.first.set(self.first.key('shift_data', 'job', 4), [2])
+        self.first.set(self.first.key('schedule_data', '2025-01-06'), {'week': 1})
+
+        round_trips = self.redis.round_trips
+        self.second.invalidate_user_cache(7)
+        self.second.invalidate_shift_cache(job_id=3)
+        self.assertEqual(self.redis.round_trips, round_trips + 2)
+
+        self.assertIsNone(self.first.get('user_profile', 7))
+        self.assertEqual(self.first.get('user_profile', 8), {'name': 'B'})
+        self.assertIsNone(self.first.get('shift_data', 'job', 3))
+        self.assertEqual(self.first.get('shift_data', 'job', 4), [2])
+        self.assertIsNone(self.first.get('schedule_data', '2025-01-06'))
+        # Nothing was deleted: the old entries are left to expire
+        self.assertEqual(len(self.manager.values), 5)
+
+    def test_values_read_before_an_invalidation_are_not_served(self):
+        cache_key = self.first.key('shift_data', 'job', 3)
+        self.second.invalidate_shift_cache(job_id=3)
+        self.first.set(cache_key, ['read before the write'])
+        self.assertIsNone(self.first.get('shift_data', 'job', 3))
+
+        value, cache_key = self.first.lookup('shift_data', 'job', 3)
+        self.first.set(cache_key, ['read after the write'])
+        self.assertEqual(self.second.get('shift_data', 'job', 3), ['read after the write'])
+
+    def test_generations_are_read_from_redis_when_unsubscribed(self):
+        self.first.invalidation._set_disconnected()
+        self.second.invalidation._set_disconnected()
+        self.first.set(self.first.key('analytics', 'user', 5), {'a': 1})
+        self.second.invalidate_tags('user:5')
+        self.assertIsNone(self.first.get('analytics', 'user', 5))
+
+        round_trips = self.redis.round_trips
+        self.first.get('analytics', 'user', 6)
+        self.first.get('analytics', 'user', 6)
+        self.assertEqual(self.redis.round_trips, round_trips + 3)
+
+    def test_own_and_malformed_messages_are_ignored(self):
+        channel = self.first.invalidation
+        channel.handle(json.dumps({'origin': channel.origin, 'keys': ['x']}))
+        channel.handle('not json')
+        self.assertEqual(channel.received, 0)
+
+    def test_tier_metrics(self):
+        self.first.set(self.first.key('employee_list'), [1])
+        self.first.get('employee_list')
+        writer = MetricsWriter()
+        _write_cache_tiers(writer, self.first.get_tier_stats())
+        text = writer.render()
+        self.assertIn('easyshifts_cache_tier_hits_total{tier="local"} 1', text)
+        self.assertIn('easyshifts_cache_tier_evictions_total{tier="local",reason="evictions"} 0', text)
+        self.assertIn('easyshifts_cache_invalidation_subscribed 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
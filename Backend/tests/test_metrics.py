@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache.redis_cache import SmartCache
+from config.redis_config import RedisCommandMetrics
+from websocket.metrics import MetricsWriter, ConnectionMetrics, render_metrics, _write_requests, _write_redis
+from websocket.request_router import RequestRouter, RequestContext
+
+
+class DictCacheManager:
+    def __init__(self):
+        self.values = {}
+
+    def get_cache_raw(self, key):
+        return self.values.get(key)
+
+    def set_cache_raw(self, key, data, ttl):
+        self.values[key] = data
+        return True
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for the Prometheus /metrics exposition."""
+
+    def test_request_counters_and_latency_histogram(self):
+        router = RequestRouter()
+
+        @router.route(2001, name="schedule")
+        def schedule(ctx):
+            return {"request_id": 2001, "success": ctx.data.get('ok', True)}
+
+        router.dispatch(RequestContext(2001, {}))
+        router.dispatch(RequestContext(2001, {'ok': False}))
+
+        writer = MetricsWriter()
+        _write_requests(writer, router.collect_metrics())
+        text = writer.render()
+        self.assertIn('easyshifts_requests_total{request_id="2001",handler="schedule"} 2', text)
+        self.assertIn('easyshifts_request_errors_total{request_id="2001",handler="schedule"} 1', text)
+        self.assertIn('easyshifts_request_duration_seconds_bucket{request_id="2001",handler="schedule",le="0.005"} 2',
+                      text)
+        self.assertIn('easyshifts_request_duration_seconds_count{request_id="2001",handler="schedule"} 2', text)
+        self.assertEqual(text.count('# TYPE easyshifts_request_duration_seconds histogram'), 1)
+
+    def test_connections_and_message_sizes(self):
+        connections = ConnectionMetrics()
+        connections.connected()
+        connections.connected()
+        connections.disconnected()
+        connections.received(100)
+        connections.sent(2000)
+
+        stats = connections.collect()
+        self.assertEqual((stats['active'], stats['total']), (1, 2))
+        received, sent = stats['messages']
+        self.assertEqual(received['buckets'][0], (128, 1))
+        self.assertEqual(sent['buckets'][2], (1024, 0))
+        self.assertEqual(sent['buckets'][3], (4096, 1))
+
+    def test_redis_latency_and_cache_hit_ratio(self):
+        commands = RedisCommandMetrics()
+        commands.observe('GET', 0.7, failed=False)
+        commands.observe('GET', 30, failed=True)
+        writer = MetricsWriter()
+        _write_redis(writer, commands.collect())
+        text = writer.render()
+        self.assertIn('easyshifts_redis_command_errors_total{command="GET"} 1', text)
+        self.assertIn('easyshifts_redis_command_duration_seconds_bucket{command="GET",le="0.001"} 1', text)
+
+        cache = SmartCache()
+        cache.cache_manager = DictCacheManager()
+        cache.local = None
+        cache.tag_generations.get = lambda tags: [1] * len(tags)
+        cache.set(cache.key('schedule_data', 'week'), {'shifts': []})
+        cache.get('schedule_data', 'week')
+        cache.get('schedule_data', 'other week')
+        self.assertEqual(cache.get_hit_counts(), {'schedule_data': {'hits': 1, 'misses': 1}})
+
+    def test_render_metrics(self):
+        text = render_metrics()
+        self.assertIn('# TYPE easyshifts_websocket_connections gauge', text)
+        self.assertIn('easyshifts_db_circuit_open 0', text)
+        self.assertTrue(text.endswith('\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
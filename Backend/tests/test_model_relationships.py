@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+
+from db.models import User, ClientCompany, Job, Shift, ShiftWorker, EmployeeType
+from db.loading import (
+    SHIFT_DETAILS, SHIFT_WITH_WORKERS, SHIFT_WORKER_WITH_USER, LazyLoadError, guard_lazy_loads, no_lazy_loads
+)
+from db.controllers.shifts_controller import ShiftsController, convert_shifts_for_client
+from db.controllers.shiftWorkers_controller import ShiftWorkersController
+from tests.helpers import count_statements, memory_engine
+
+
+class TestModelRelationships(unittest.TestCase):
+    """Tests for model relationships, loader options and the lazy load guard."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.session.add_all([
+            User(id=1, username='alice', name='Alice', isApproval=True),
+            User(id=2, username='bob', name='Bob', isApproval=True),
+            ClientCompany(id=1, name='Acme'),
+            Job(id=1, name='Concert', client_company_id=1, venue_name='Arena', venue_address='1 Main St'),
+        ])
+        start = datetime(2026, 1, 5, 8, 0)
+        for shift_id in range(1, 4):
+            self.session.add(Shift(id=shift_id, job_id=1, shift_start_datetime=start + timedelta(days=shift_id)))
+            self.session.add(ShiftWorker(shiftID=shift_id, userID=1, role_assigned=EmployeeType.CREW_CHIEF))
+            self.session.add(ShiftWorker(shiftID=shift_id, userID=2, role_assigned=EmployeeType.STAGEHAND))
+        self.session.commit()
+        self.session.expunge_all()
+        guard_lazy_loads(self.session)
+
+        self.statements = count_statements(self, self.engine)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_relationships_are_bidirectional(self):
+        shift = ShiftsController(self.session).get_entity(1, SHIFT_DETAILS)
+
+        self.assertEqual(shift.job.client_company.name, 'Acme')
+        self.assertEqual(sorted(w.user.name for w in shift.workers), ['Alice', 'Bob'])
+        self.assertIs(shift.workers[0].shift, shift)
+        self.assertEqual(len(self.statements), 2)
+
+    def test_lazy_loads_fail_loudly(self):
+        shift = ShiftsController(self.session).get_entity(1)
+        with self.assertRaises(LazyLoadError):
+            shift.workers
+
+    def test_preset_raises_on_relationships_it_does_not_load(self):
+        workers = ShiftWorkersController(self.session).get_shift_workers_by_shift_id(1, SHIFT_WORKER_WITH_USER)
+        self.assertEqual(sorted(w.user.name for w in workers), ['Alice', 'Bob'])
+        with self.assertRaises(InvalidRequestError):
+            workers[0].user.shift_assignments
+
+    def test_convert_shifts_for_client_loads_workers_once(self):
+        shifts = ShiftsController(self.session).get_all_entities()
+        self.statements.clear()
+
+        converted = convert_shifts_for_client(shifts, self.session)
+        self.assertEqual([len(s['workers']) for s in converted], [2, 2, 2])
+        self.assertEqual(len(self.statements), 2)
+
+    def test_generate_shift_timesheet(self):
+        timesheet = ShiftWorkersController(self.session).generate_shift_timesheet(2)
+        self.assertEqual(sorted(w['user_name'] for w in timesheet['workers']), ['Alice', 'Bob'])
+        self.assertEqual(len(self.statements), 2)
+
+    def test_no_lazy_loads_is_scoped(self):
+        session = sessionmaker(bind=self.engine)()
+        try:
+            shift = session.get(Shift, 1)
+            with no_lazy_loads(session):
+                with self.assertRaises(LazyLoadError):
+                    shift.workers
+            self.assertEqual(len(shift.workers), 2)
+        finally:
+            session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
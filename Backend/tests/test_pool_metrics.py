@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+import main
+from db.pool_metrics import PoolMetrics, Histogram
+from tests.helpers import FakeClock
+
+
+class TestPoolMetrics(unittest.TestCase):
+    """Tests for the connection pool telemetry and pool sizing."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory.name, 'pool.db')}",
+                                    poolclass=QueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+        self.clock = FakeClock()
+        self.owner = None
+        self.metrics = PoolMetrics(long_held_seconds=10, owner=lambda: self.owner, clock=self.clock)
+        self.metrics.watch(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def connect(self):
+        with self.metrics.timed_checkout():
+            return self.engine.connect()
+
+    def test_gauges_overflow_and_timeouts(self):
+        first, second = self.connect(), self.connect()
+        self.assertEqual(self.metrics.checked_out, 2)
+        self.assertEqual(self.metrics.overflow_checkouts, 1)
+
+        with self.assertRaises(PoolTimeoutError):
+            self.connect()
+        self.assertEqual(self.metrics.timeouts, 1)
+        self.assertEqual(self.metrics.wait_ms.count, 3)
+        self.assertGreaterEqual(self.metrics.wait_ms.sum, 0)
+
+        first.close()
+        second.close()
+        stats = self.metrics.get_stats()
+        self.assertEqual((stats['checked_out'], stats['peak_checked_out'], stats['checkouts']), (0, 2, 2))
+
+    def test_long_held_connection_names_its_request(self):
+        self.owner = 2001
+        connection = self.connect()
+        connection.execute(text("SELECT 1"))
+
+        self.clock.now += 12
+        self.assertEqual(self.metrics.long_held(), [{'request_id': 2001, 'held_seconds': 12}])
+
+        with self.assertLogs('db.pool_metrics', level='WARNING') as logs:
+            connection.close()
+        self.assertIn('by request 2001', logs.output[0])
+        self.assertEqual(self.metrics.long_held_count, 1)
+        self.assertEqual(self.metrics.hold_ms.quantile(0.5), 30000)
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.get_stats()['buckets'], {'1': 1, '10': 3, '100': 4, '+Inf': 5})
+        self.assertIsNone(histogram.get_stats()['p99'])
+
+    def test_recommendation_follows_load(self):
+        # Two connections busy half of the time: one on average, two at peak
+        first, second = self.connect(), self.connect()
+        self.clock.now += 50
+        first.close()
+        second.close()
+        self.clock.now += 50
+
+        recommendation = self.metrics.recommend(pool_size=10, max_overflow=20)
+        self.assertEqual(recommendation['average_in_use'], 1.0)
+        self.assertEqual(recommendation['recommended'], {'pool_size': 2, 'max_overflow': 0})
+        self.assertTrue(recommendation['reasons'])
+
+        self.metrics.timeouts = 3
+        self.assertEqual(self.metrics.recommend(2, 0)['recommended'], {'pool_size': 2, 'max_overflow': 1})
+        self.assertEqual(self.metrics.recommend(2, 0, max_connections=2)['recommended'],
+                         {'pool_size': 2, 'max_overflow': 0})
+
+    def test_pool_limits_are_capped_by_admin_setting(self):
+        self.assertEqual(main.pool_limits(100)['pool_size'], int(os.getenv('DB_POOL_SIZE', '10')))
+        limits = main.pool_limits(8)
+        self.assertLessEqual(limits['pool_size'] + limits['max_overflow'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
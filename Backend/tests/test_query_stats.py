@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from db.models import Base, ClientCompany, Job
+from db.query_stats import watch_queries, track_queries, statement_shape, current_query_stats
+from websocket.request_router import RequestRouter, RequestContext
+
+
+class TestQueryStats(unittest.TestCase):
+    """Tests for the per-request query counts and the N+1 report."""
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        watch_queries(self.engine)
+        with Session(self.engine) as session:
+            session.add_all(ClientCompany(name=f'Company {index}') for index in range(5))
+            session.commit()
+
+        self.router = RequestRouter()
+        self.router.query_tracker = track_queries
+
+        @self.router.route(3000, name="client_directory")
+        def client_directory(ctx):
+            # One query per company: the N+1 shape the budget is meant to catch
+            with Session(self.engine) as session:
+                companies = session.scalars(select(ClientCompany)).all()
+                return [session.scalars(select(Job).where(Job.client_company_id == company.id)).all()
+                        for company in companies]
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_queries_are_attributed_to_the_request(self):
+        with track_queries(2001, budget=0) as stats:
+            with Session(self.engine) as session:
+                session.scalars(select(ClientCompany)).all()
+                self.assertIs(current_query_stats(), stats)
+        self.assertEqual(stats.count, 1)
+        self.assertIn('FROM client_companies', stats.slowest_statement)
+        self.assertIsNone(current_query_stats())
+
+        # Queries outside of a tracked request are not counted anywhere
+        with Session(self.engine) as session:
+            session.scalars(select(ClientCompany)).all()
+        self.assertEqual(stats.count, 1)
+
+    def test_failed_statements_do_not_skew_later_timings(self):
+        with track_queries(2001, budget=0) as stats:
+            with self.engine.connect() as connection:
+                with self.assertRaises(OperationalError):
+                    connection.execute(text('SELECT * FROM missing_table'))
+                with patch('db.query_stats.time.perf_counter', side_effect=[100.0, 100.002]):
+                    connection.execute(text('SELECT 1'))
+                # Nothing is left behind on the pooled connection by the failed statement
+                self.assertEqual([key for key in connection.info if 'started' in key], [])
+        self.assertEqual(stats.count, 1)
+        self.assertAlmostEqual(stats.total_ms, 2.0)
+
+    def test_over_budget_request_names_repeated_statements(self):
+        with patch.dict(os.environ, {'DB_QUERY_BUDGET': '3'}), \
+                self.assertLogs('db.query_stats', level='WARNING') as logs:
+            self.router.dispatch(RequestContext(3000, {}))
+
+        self.assertIn('Request 3000 (client_directory) ran 6 queries (budget 3)', logs.output[0])
+        self.assertIn('5x SELECT', logs.output[0])
+        stats = self.router.get_stats()[0]
+        self.assertEqual((stats['avg_queries'], stats['max_queries']), (6, 6))
+
+    def test_statement_shape(self):
+        self.assertEqual(statement_shape("SELECT * FROM shifts\n  WHERE id IN (?, ?, ?) AND job_id = 12"),
+                         "SELECT * FROM shifts WHERE id IN (...) AND job_id = ?")
+        self.assertEqual(statement_shape("SELECT name FROM users_1 WHERE name = 'O''Brien' LIMIT %s"),
+                         "SELECT name FROM users_1 WHERE name = ? LIMIT %s")
+
+
+if __name__ == '__main__':
+    unittest.main()
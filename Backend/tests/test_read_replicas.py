@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+import main
+from db.models import ClientCompany
+from db.replicas import ReplicaSet, ReplicaWriteError
+from db.controllers.client_companies_controller import ClientCompaniesController
+from user_session import UserSession
+from websocket.request_router import RequestRouter, RequestContext, WRITE
+from tests.helpers import FakeClock, memory_engine, use_engine
+
+
+class TestReadReplicas(unittest.TestCase):
+    """Tests for routing READ requests to read replicas."""
+
+    def setUp(self):
+        self.primary = self.create_database('Primary Co')
+        self.replica = self.create_database('Replica Co')
+        use_engine(self, self.primary)
+
+        self.lag = 0.0
+        self.clock = FakeClock()
+        main._replicas = ReplicaSet({'local': self.replica}, max_lag=5, check_interval=5,
+                                    lag_probe=lambda connection: self.lag, clock=self.clock)
+
+        self.router = RequestRouter(session_scope=main.request_session_scope)
+        self.user = UserSession(user_id=7, is_manager=True)
+
+        @self.router.route(212, name="company_names")
+        def company_names(ctx):
+            return sorted(company.name for company in ClientCompaniesController().repository.db.query(ClientCompany))
+
+        @self.router.route(210, name="create_company", access=WRITE)
+        def create_company(ctx):
+            ClientCompaniesController().repository.db.add(ClientCompany(name=ctx.data['name']))
+            return {"request_id": ctx.request_id, "success": True}
+
+        @self.router.route(213, name="write_in_read_route")
+        def write_in_read_route(ctx):
+            db = ClientCompaniesController().repository.db
+            db.add(ClientCompany(name='Oops'))
+            db.flush()
+
+    def tearDown(self):
+        self.primary.dispose()
+        self.replica.dispose()
+
+    @staticmethod
+    def create_database(company_name):
+        engine = memory_engine()
+        with sessionmaker(bind=engine)() as session:
+            session.add(ClientCompany(name=company_name))
+            session.commit()
+        return engine
+
+    def read(self, session=None, client_id='c1'):
+        return self.router.dispatch(RequestContext(212, {}, client_id=client_id, session=session))
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(self.read(), ['Replica Co'])
+
+        self.router.dispatch(RequestContext(210, {'name': 'Acme'}, client_id='c2'))
+        with main.get_db_session() as db:
+            self.assertEqual(sorted(company.name for company in db.query(ClientCompany)), ['Acme', 'Primary Co'])
+
+    def test_client_reads_its_own_writes_from_primary(self):
+        self.router.dispatch(RequestContext(210, {'name': 'Acme'}, client_id='c1', session=self.user))
+
+        # Same user on another connection still sees the write, other clients keep using the replica
+        self.assertEqual(self.read(self.user, client_id='c9'), ['Acme', 'Primary Co'])
+        self.assertEqual(self.read(client_id='c2'), ['Replica Co'])
+
+        self.clock.now += main._replicas.sticky_seconds + 1
+        self.assertEqual(self.read(self.user), ['Replica Co'])
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.lag = 30.0
+        self.assertEqual(self.read(), ['Primary Co'])
+
+        # The lag is measured again only after the check interval
+        self.lag = 0.0
+        self.assertEqual(self.read(), ['Primary Co'])
+        self.clock.now += 5
+        self.assertEqual(self.read(), ['Replica Co'])
+        self.assertEqual(main._replicas.get_stats()['primary_reads'], 2)
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        def unavailable(connection):
+            raise ConnectionError("replica is down")
+        main._replicas.lag_probe = unavailable
+
+        self.assertEqual(self.read(), ['Primary Co'])
+        self.assertEqual(main._replicas.get_stats()['replicas'][0]['error'], "replica is down")
+
+    def test_write_in_read_route_is_refused_on_replica(self):
+        with self.assertRaises(ReplicaWriteError):
+            self.router.dispatch(RequestContext(213, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
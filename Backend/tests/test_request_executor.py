@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket.request_executor import RequestExecutor, parse_request_ids
+
+
+class TestRequestExecutor(unittest.TestCase):
+    """Tests for running WebSocket handlers off the event loop."""
+
+    def setUp(self):
+        self.executor = RequestExecutor(mode='executor', max_workers=4,
+                                        max_inflight_per_connection=2, inline_request_ids={1002})
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def testparse_request_ids(self):
+        self.assertEqual(parse_request_ids("1, 1002,,abc"), {1, 1002})
+        self.assertEqual(parse_request_ids(None), set())
+
+    def test_handlers_run_on_worker_thread(self):
+        async def scenario():
+            loop_thread = threading.get_ident()
+            worker_thread = await self.executor.run("client", 2001, threading.get_ident)
+            inline_thread = await self.executor.run("client", 1002, threading.get_ident)
+            return loop_thread, worker_thread, inline_thread
+
+        loop_thread, worker_thread, inline_thread = asyncio.run(scenario())
+        self.assertNotEqual(loop_thread, worker_thread)
+        self.assertEqual(loop_thread, inline_thread)
+
+        stats = self.executor.get_stats()
+        self.assertEqual(stats['submitted'], 1)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['inline'], 1)
+        self.assertEqual(stats['queued'], 0)
+
+    def test_inline_mode_never_uses_threads(self):
+        executor = RequestExecutor(mode='inline')
+
+        async def scenario():
+            return threading.get_ident(), await executor.run("client", 2001, threading.get_ident)
+
+        loop_thread, handler_thread = asyncio.run(scenario())
+        self.assertEqual(loop_thread, handler_thread)
+
+    def test_per_connection_inflight_limit(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_handler():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        async def scenario():
+            await asyncio.gather(*[self.executor.run("client", 60, slow_handler) for _ in range(6)])
+
+        asyncio.run(scenario())
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(self.executor.get_stats()['completed'], 6)
+
+    def test_errors_are_counted_and_raised(self):
+        def failing_handler():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run("client", 60, failing_handler))
+        self.assertEqual(self.executor.get_stats()['failed'], 1)
+
+    def test_timed_out_handler_keeps_its_slot_until_it_finishes(self):
+        finished = threading.Event()
+        order = []
+
+        def slow_handler():
+            time.sleep(0.3)
+            order.append('slow')
+            finished.set()
+
+        async def scenario():
+            executor = RequestExecutor(mode='executor', max_workers=4, max_inflight_per_connection=1)
+            try:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(executor.run("client", 60, slow_handler), timeout=0.05)
+                await executor.run("client", 60, lambda: order.append('next'))
+                return executor.get_stats()
+            finally:
+                executor.shutdown()
+
+        stats = asyncio.run(scenario())
+        self.assertTrue(finished.is_set())
+        self.assertEqual(order, ['slow', 'next'])
+        self.assertEqual((stats['abandoned'], stats['completed'], stats['queued']), (1, 2, 0))
+
+    def test_queued_handlers_run_by_priority(self):
+        release = threading.Event()
+        order = []
+        priorities = {2001: 1, 2002: 0, 2003: 2}
+
+        async def scenario():
+            executor = RequestExecutor(mode='executor', max_workers=1, max_inflight_per_connection=4)
+            executor.priority_of = priorities.get
+            try:
+                blocker = asyncio.ensure_future(executor.run("a", 2001, release.wait))
+                await asyncio.sleep(0.05)
+                low = asyncio.ensure_future(executor.run("b", 2002, lambda: order.append('low')))
+                await asyncio.sleep(0.01)
+                high = asyncio.ensure_future(executor.run("c", 2003, lambda: order.append('high')))
+                await asyncio.sleep(0.01)
+                release.set()
+                await asyncio.gather(blocker, low, high)
+                return executor.get_stats()
+            finally:
+                executor.shutdown()
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(order, ['high', 'low'])
+        self.assertEqual((stats['completed'], stats['queued']), (3, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
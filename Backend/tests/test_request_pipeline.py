@@ -0,0 +1,73 @@
+import os
+import sys
+import asyncio
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket.request_pipeline import ConnectionPipeline, PipelinePolicy, ORDERING_WRITES, ORDERING_NONE
+
+
+class TestConnectionPipeline(unittest.TestCase):
+    """Tests for pipelined processing of one connection's requests."""
+
+    def run_pipeline(self, requests, delays, policy):
+        events = []
+        sent = []
+
+        async def process(request_data):
+            events.append(('start', request_data['request_id']))
+            await asyncio.sleep(delays.get(request_data['request_id'], 0))
+            events.append(('end', request_data['request_id']))
+            return {"request_id": request_data['request_id'], "success": True}
+
+        async def send(response):
+            sent.append(response)
+
+        async def scenario():
+            pipeline = ConnectionPipeline(process, send, policy)
+            for request_data in requests:
+                await pipeline.submit(request_data)
+            await pipeline.drain()
+
+        asyncio.run(scenario())
+        return events, sent
+
+    def test_correlated_reads_run_concurrently(self):
+        policy = PipelinePolicy(enabled=True, max_pending=8, ordering=ORDERING_WRITES, ordered_request_ids=set())
+        requests = [
+            {"request_id": 2001, "correlation_id": "a"},
+            {"request_id": 60, "correlation_id": "b"},
+            {"request_id": 211, "correlation_id": "c"},
+        ]
+        events, sent = self.run_pipeline(requests, {2001: 0.05, 60: 0.01, 211: 0.02}, policy)
+
+        # All three start before the slow schedule request finishes
+        self.assertEqual([event for event in events[:3]], [('start', 2001), ('start', 60), ('start', 211)])
+        # Responses come back out of order, matched by correlation id
+        self.assertEqual([response["correlation_id"] for response in sent], ["b", "c", "a"])
+
+    def test_ordered_requests_keep_arrival_order(self):
+        policy = PipelinePolicy(enabled=True, max_pending=8, ordering=ORDERING_NONE, ordered_request_ids={230, 231})
+        requests = [
+            {"request_id": 230, "correlation_id": 1},
+            {"request_id": 231, "correlation_id": 2},
+            {"request_id": 60, "correlation_id": 3},
+        ]
+        events, sent = self.run_pipeline(requests, {230: 0.05, 231: 0.0, 60: 0.0}, policy)
+
+        self.assertLess(events.index(('end', 230)), events.index(('start', 231)))
+        # The unordered read did not wait for the writes
+        self.assertLess(events.index(('end', 60)), events.index(('end', 230)))
+
+    def test_requests_without_correlation_id_are_serial(self):
+        policy = PipelinePolicy(enabled=True, max_pending=8, ordering=ORDERING_NONE, ordered_request_ids=set())
+        requests = [{"request_id": 2001}, {"request_id": 60}]
+        events, sent = self.run_pipeline(requests, {2001: 0.02}, policy)
+
+        self.assertEqual(events, [('start', 2001), ('end', 2001), ('start', 60), ('end', 60)])
+        self.assertNotIn("correlation_id", sent[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
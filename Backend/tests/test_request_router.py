@@ -0,0 +1,160 @@
+import os
+import ast
+import sys
+import asyncio
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_session import UserSession
+from websocket.request_router import RequestRouter, RequestContext, DuplicateRouteError, WRITE
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def echo_handler(data, session):
+    return {"success": True, "data": data, "user": session.get_id if session else None}
+
+
+async def echo_handler_async(data, session):
+    return {"success": True, "data": data, "user": session.get_id if session else None, "async": True}
+
+
+class TestRequestRouter(unittest.TestCase):
+    """Tests for the table-driven WebSocket request router."""
+
+    def setUp(self):
+        self.router = RequestRouter(default_timeout=5)
+        self.manager = UserSession(user_id=1, is_manager=True)
+        self.worker = UserSession(user_id=2, is_manager=False)
+
+    def test_duplicate_request_id_is_rejected(self):
+        self.router.register(10, echo_handler)
+        with self.assertRaises(DuplicateRouteError):
+            self.router.register(10, echo_handler, name="logout")
+
+    def test_unknown_request_id(self):
+        response = self.router.dispatch(RequestContext(12345, {}))
+        self.assertFalse(response["success"])
+        self.assertIn("Unknown request ID", response["error"])
+
+    def test_auth_and_manager_checks(self):
+        self.router.register(60, echo_handler, manager_only=True)
+
+        response = self.router.dispatch(RequestContext(60, {}, session=None))
+        self.assertEqual(response["error"], "User session not found.")
+
+        response = self.router.dispatch(RequestContext(60, {}, session=self.worker))
+        self.assertEqual(response["error"], "Manager access required.")
+
+        response = self.router.dispatch(RequestContext(60, {"a": 1}, session=self.manager))
+        self.assertEqual(response, {"success": True, "data": {"a": 1}, "user": 1})
+        self.assertEqual(self.router.get_route(60).rejected, 2)
+
+    def test_lazy_target_and_wrapped_response(self):
+        self.router.register(70, 'user_session:UserSession', args=('data', 'session'), wrap_data=True)
+        response = self.router.dispatch(RequestContext(70, 5, session=True))
+        self.assertTrue(response["success"])
+        self.assertIsInstance(response["data"], UserSession)
+
+    def test_decorated_route_can_change_session(self):
+        stored = {}
+
+        @self.router.route(10, name="login", access=WRITE)
+        def login(ctx):
+            ctx.set_session(self.manager)
+            return {"request_id": ctx.request_id, "success": True}
+
+        ctx = RequestContext(10, {}, client_id="c1",
+                             on_session_change=lambda client_id, session: stored.update({client_id: session}))
+        self.router.dispatch(ctx)
+        self.assertIs(stored["c1"], self.manager)
+        self.assertTrue(self.router.get_route(10).is_write)
+
+    def test_metrics_and_timeouts(self):
+        self.router.register(2001, echo_handler, requires_auth=True, timeout=60)
+        self.router.dispatch(RequestContext(2001, {}, session=self.manager))
+        stats = self.router.get_stats()
+        self.assertEqual(stats[0]["calls"], 1)
+        self.assertEqual(self.router.get_timeout(2001), 60)
+        self.assertEqual(self.router.get_timeout(999999), 5)
+
+    def test_async_handler_only_runs_when_available(self):
+        self.router.register(211, echo_handler, async_handler=echo_handler_async)
+        self.router.register(212, echo_handler)
+        self.assertFalse(self.router.runs_async(211))
+
+        self.router.async_available = lambda: False
+        self.assertFalse(self.router.runs_async(211))
+
+        self.router.async_available = lambda: True
+        self.assertTrue(self.router.runs_async(211))
+        self.assertFalse(self.router.runs_async(212))
+        self.assertFalse(self.router.runs_async(999999))
+
+    def test_reads_skip_the_async_path_when_replicas_are_configured(self):
+        self.router.register(211, echo_handler, async_handler=echo_handler_async)
+        self.router.register(210, echo_handler, access=WRITE, async_handler=echo_handler_async)
+        self.router.async_available = lambda: True
+        self.router.replicas_configured = lambda: True
+        self.assertFalse(self.router.runs_async(211))
+        self.assertTrue(self.router.runs_async(210))
+
+        self.router.replicas_configured = lambda: False
+        self.assertTrue(self.router.runs_async(211))
+
+    def test_dispatch_async_checks_access_and_records_metrics(self):
+        self.router.register(60, 'user_session:UserSession', manager_only=True,
+                             async_handler='tests.test_request_router:echo_handler_async')
+
+        response = asyncio.run(self.router.dispatch_async(RequestContext(60, {}, session=self.worker)))
+        self.assertEqual(response["error"], "Manager access required.")
+
+        response = asyncio.run(self.router.dispatch_async(RequestContext(60, {"a": 1}, session=self.manager)))
+        self.assertEqual(response, {"success": True, "data": {"a": 1}, "user": 1, "async": True})
+        self.assertEqual(self.router.get_route(60).calls, 1)
+        self.assertEqual(self.router.get_route(60).rejected, 1)
+
+
+class TestRequestRoutes(unittest.TestCase):
+    """Checks that every registered route points at an existing handler."""
+
+    def test_all_string_targets_exist(self):
+        from websocket.request_router import router
+        import websocket.request_routes  # noqa: F401
+
+        defined = {}
+        targets = [(route.request_id, target) for route in router.routes.values()
+                   for target in (route._target, route._async_target) if isinstance(target, str)]
+        for request_id, target in targets:
+            module_name, _, attr = target.partition(':')
+            if module_name not in defined:
+                path = os.path.join(BACKEND_DIR, *module_name.split('.')) + '.py'
+                with open(path) as source:
+                    try:
+                        tree = ast.parse(source.read())
+                    except SyntaxError:
+                        defined[module_name] = None
+                        continue
+                defined[module_name] = {node.name for node in tree.body
+                                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+            if defined[module_name] is not None:
+                self.assertIn(attr, defined[module_name], f"{request_id} -> {target}")
+
+        self.assertIn(2001, router.routes)
+        self.assertIn(1002, router.routes)
+        self.assertTrue(router.get_route(2001).has_async_handler)
+
+    def test_routes_seeding_default_settings_are_writes(self):
+        from websocket.request_router import router
+        import websocket.request_routes  # noqa: F401
+
+        # get_all_extended_settings() commits default rows, which a replica session rejects
+        for request_id in (1111, 1117, 1119, 1123):
+            self.assertTrue(router.get_route(request_id).is_write, request_id)
+        self.assertFalse(router.get_route(1121).is_write)
+
+
+if __name__ == '__main__':
+    unittest.main()
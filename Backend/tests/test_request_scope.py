@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from db.models import ClientCompany
+from db.controllers.users_controller import UsersController
+from db.controllers.shifts_controller import ShiftsController
+from db.controllers.client_companies_controller import ClientCompaniesController
+from websocket.request_router import RequestRouter, RequestContext
+from tests.helpers import memory_engine, use_engine
+
+
+class TestRequestScope(unittest.TestCase):
+    """Tests for the request-scoped database session."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        use_engine(self, self.engine)
+
+        self.router = RequestRouter(session_scope=main.request_session_scope)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def company_names(self):
+        with main.get_db_session() as db:
+            return sorted(company.name for company in db.query(ClientCompany).all())
+
+    def test_controllers_share_the_scope_session(self):
+        with main.request_session_scope():
+            users_controller = UsersController()
+            shifts_controller = ShiftsController()
+            with main.get_db_session() as session:
+                pass
+
+            self.assertIs(users_controller.repository.db, shifts_controller.repository.db)
+            self.assertIs(users_controller.repository.db, session)
+
+    def test_explicit_session_wins(self):
+        explicit = main.create_session()
+        try:
+            with main.request_session_scope():
+                self.assertIs(UsersController(explicit).repository.db, explicit)
+        finally:
+            explicit.close()
+
+    def test_controller_outside_scope_needs_a_session(self):
+        with self.assertRaises(RuntimeError):
+            UsersController()
+
+    def test_session_is_opened_lazily(self):
+        main._initialization_error = RuntimeError("database is down")
+
+        @self.router.route(1, name="ping")
+        def ping(ctx):
+            return {"request_id": ctx.request_id, "success": True}
+
+        self.assertTrue(self.router.dispatch(RequestContext(1, {}))["success"])
+
+    def test_dispatch_commits_once_per_message(self):
+        @self.router.route(201, name="create_companies")
+        def create_companies(ctx):
+            controller = ClientCompaniesController()
+            for name in ctx.data['names']:
+                controller.repository.db.add(ClientCompany(name=name))
+            return {"request_id": ctx.request_id, "success": True}
+
+        self.router.dispatch(RequestContext(201, {"names": ["Acme", "Globex"]}))
+        self.assertEqual(self.company_names(), ["Acme", "Globex"])
+
+    def test_dispatch_rolls_back_on_error(self):
+        @self.router.route(201, name="create_and_fail")
+        def create_and_fail(ctx):
+            ClientCompaniesController().repository.db.add(ClientCompany(name="Acme"))
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.router.dispatch(RequestContext(201, {}))
+        self.assertEqual(self.company_names(), [])
+
+    def test_handler_catching_its_own_error_is_rolled_back(self):
+        @self.router.route(201, name="create_and_catch")
+        def create_and_catch(ctx):
+            controller = ClientCompaniesController()
+            try:
+                controller.repository.db.add(ClientCompany(name="Acme"))
+                controller.repository.db.flush()
+                if ctx.data.get('duplicate'):
+                    controller.repository.db.add(ClientCompany(id=1, name="Globex"))
+                    controller.repository.db.flush()
+                raise ValueError("boom")
+            except Exception as e:
+                return {"request_id": ctx.request_id, "success": False, "error": str(e)}
+
+        self.assertEqual(self.router.dispatch(RequestContext(201, {}))["error"], "boom")
+        # A failed flush leaves the transaction inactive: the error response is still returned
+        response = self.router.dispatch(RequestContext(201, {"duplicate": True}))
+        self.assertIn("UNIQUE", response["error"])
+        self.assertEqual(self.company_names(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Base, ClientCompany, EmployeeType, Job, Shift, ShiftWorker, User
+from db.controllers.shifts_controller import ShiftsController
+from db.circuit_breaker import CircuitBreaker
+from cache.response_cache import (
+    ResponseCache, SerializedResponse, cache_types_for, watch_writes, schedule_week_tags, LONG_RANGE_TAG
+)
+from user_session import UserSession
+from websocket.request_router import RequestRouter, RequestContext, WRITE
+
+
+class DictCache:
+    """SmartCache stand-in keeping entries in a dict"""
+
+    def __init__(self):
+        self.entries = {}
+        self.entry_tags = {}
+
+    def lookup(self, cache_type, *args, serialized=False):
+        key = (cache_type,) + args
+        value = self.entries.get(key)
+        return (json.dumps(value) if serialized and value is not None else value), key
+
+    def set(self, key, data, tags=()):
+        self.entries[key] = data
+        self.entry_tags[key] = {f"type:{key[0]}", *tags}
+        return True
+
+    def get_or_compute(self, cache_type, loader, *args, tags=(), cacheable, serialized=False):
+        value, key = self.lookup(cache_type, *args, serialized=serialized)
+        if value is not None:
+            return value
+        value = loader()
+        if cacheable(value):
+            self.set(key, value, tags)
+        return value
+
+    def invalidate_tags(self, *tags):
+        keys = [key for key in self.entries if self.entry_tags[key] & set(tags)]
+        for key in keys:
+            del self.entries[key]
+        return dict.fromkeys(tags, 2)
+
+
+class TestCachedRoutes(unittest.TestCase):
+    """Tests for routes registered with cache=..."""
+
+    def setUp(self):
+        self.calls = []
+        self.cache = DictCache()
+        self.router = RequestRouter(default_timeout=5)
+        self.router.response_cache = ResponseCache(cache=self.cache, enabled=True)
+        self.manager = UserSession(user_id=1, is_manager=True)
+
+    def handler(self, data, session):
+        self.calls.append(data)
+        return {"success": data.get("ok", True), "data": data}
+
+    async def handler_async(self, data, session):
+        return self.handler(data, session)
+
+    def test_second_call_is_served_from_cache(self):
+        self.router.register(60, self.handler, cache='employee_list')
+        first = self.router.dispatch(RequestContext(60, {"a": 1}, session=self.manager))
+        second = self.router.dispatch(RequestContext(60, {"a": 1}, session=self.manager))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+        stats = self.router.get_route(60).get_stats()
+        self.assertEqual((stats["calls"], stats["cache_hits"]), (2, 1))
+
+    def test_serialized_hits_are_sent_as_cached(self):
+        self.router.register(60, self.handler, cache='employee_list')
+        first = self.router.dispatch(RequestContext(60, {"a": 1}, session=self.manager, accepts_serialized=True))
+        second = self.router.dispatch(RequestContext(60, {"a": 1}, session=self.manager, accepts_serialized=True))
+
+        self.assertIsInstance(first, dict)
+        self.assertIsInstance(second, SerializedResponse)
+        self.assertTrue('request_id' in second and second.get('success'))
+        self.assertIsNone(second._data)
+        second['correlation_id'] = 'c-1'
+        self.assertEqual(json.loads(second.payload()), {**first, "request_id": 60, "correlation_id": "c-1"})
+        self.assertEqual(second["data"], {"a": 1})
+        self.assertEqual(SerializedResponse('{}', request_id=1).payload(), '{"request_id": 1}')
+
+    def test_cache_key_and_failures(self):
+        self.router.register(2001, self.handler, cache='schedule_data',
+                             cache_key=lambda ctx: (ctx.data["week"],))
+        for data in ({"week": 1}, {"week": 2}, {"week": 1}, {"week": 3, "ok": False}, {"week": 3, "ok": False}):
+            self.router.dispatch(RequestContext(2001, data, session=self.manager))
+        # Malformed requests skip the cache
+        self.router.dispatch(RequestContext(2001, {}, session=self.manager))
+        self.router.dispatch(RequestContext(2001, {}, session=self.manager))
+
+        self.assertEqual(len(self.calls), 6)
+        self.assertEqual(set(self.cache.entries), {("schedule_data", 1), ("schedule_data", 2)})
+
+    def test_entries_carry_the_route_tags(self):
+        self.router.register(2001, self.handler, cache='schedule_data', cache_key=lambda ctx: (ctx.data["week"],),
+                             cache_tags=lambda ctx: [f"schedule_week:{ctx.data['week']}"])
+        self.router.dispatch(RequestContext(2001, {"week": 1}, session=self.manager))
+        self.assertEqual(self.cache.entry_tags[("schedule_data", 1)], {"type:schedule_data", "schedule_week:1"})
+
+    def test_async_dispatch_uses_cache(self):
+        self.router.register(211, self.handler, cache='job_listings', async_handler=self.handler_async)
+
+        async def run():
+            first = await self.router.dispatch_async(RequestContext(211, {"a": 1}))
+            # Stored before the response is returned
+            second = await self.router.dispatch_async(RequestContext(211, {"a": 1}))
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_async_serialized_hits_are_sent_as_cached(self):
+        self.router.register(211, self.handler, cache='job_listings', async_handler=self.handler_async)
+
+        async def run():
+            return [await self.router.dispatch_async(RequestContext(211, {"a": 1}, accepts_serialized=True))
+                    for _ in range(2)]
+
+        first, second = asyncio.run(run())
+        self.assertIsInstance(second, SerializedResponse)
+        self.assertIsNone(second._data)
+        self.assertEqual(json.loads(second.payload()), {**first, "request_id": 211})
+
+    def test_open_breaker_and_write_routes(self):
+        breaker = CircuitBreaker('redis', failure_threshold=1)
+        breaker.record_failure(ConnectionError())
+        self.router.response_cache = ResponseCache(cache=self.cache, enabled=True, breaker=breaker)
+        self.router.register(60, self.handler, cache='employee_list')
+        self.router.dispatch(RequestContext(60, {}, session=self.manager))
+        self.router.dispatch(RequestContext(60, {}, session=self.manager))
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.entries, {})
+        with self.assertRaises(ValueError):
+            self.router.register(61, self.handler, access=WRITE, cache='employee_list')
+
+
+class TestWriteInvalidation(unittest.TestCase):
+    """Tests for watch_writes and ResponseCache.invalidate_tables"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.engine = create_engine(f'sqlite:///{self.path}')
+        Base.metadata.create_all(self.engine)
+        self.committed = []
+        self.weeks = []
+        watch_writes(self.engine, self.on_commit)
+        self.Session = sessionmaker(bind=self.engine)
+
+    def on_commit(self, tables, weeks):
+        self.committed.append(tables)
+        self.weeks.append(weeks)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_committed_writes_are_reported_after_checkin(self):
+        with self.Session() as session:
+            session.add(ClientCompany(id=1, name='Acme'))
+            session.commit()
+            session.get(ClientCompany, 1)
+        self.assertEqual(self.committed, [{'client_companies': None}])
+
+    def test_reads_and_rollbacks_are_not_reported(self):
+        with self.Session() as session:
+            session.query(ClientCompany).all()
+            session.add(ClientCompany(id=2, name='Globex'))
+            session.flush()
+            session.rollback()
+        self.assertEqual(self.committed, [])
+
+    def test_invalidate_tables(self):
+        cache = DictCache()
+        cache.set(('employee_list',), [1])
+        cache.set(('schedule_data', 1), [2])
+        cache.set(('job_listings',), [3])
+
+        invalidated = ResponseCache(cache=cache, enabled=True).invalidate_tables({'users'})
+        self.assertEqual(invalidated, {'employee_list', 'client_companies', 'schedule_data'})
+        self.assertEqual(list(cache.entries), [('job_listings',)])
+        self.assertEqual(cache_types_for({'shiftWorkers'}), {'schedule_data'})
+        self.assertEqual(cache_types_for({'sessions'}), set())
+
+    def test_sign_in_updates_only_invalidate_payloads_reading_them(self):
+        with self.Session() as session:
+            session.add(User(id=1, username='alice', name='Alice'))
+            session.commit()
+            session.get(User, 1).last_login = datetime(2026, 1, 5, 8, 0)
+            session.commit()
+            session.get(User, 1).name = 'Alice B'
+            session.commit()
+
+        inserted, signed_in, renamed = self.committed
+        self.assertEqual(signed_in, {'users': frozenset({'last_login'})})
+        self.assertEqual(cache_types_for(inserted), {'employee_list', 'client_companies', 'schedule_data'})
+        self.assertEqual(cache_types_for(signed_in), {'client_companies'})
+        self.assertEqual(cache_types_for(renamed), {'employee_list', 'client_companies', 'schedule_data'})
+
+    def test_shift_writes_report_their_weeks(self):
+        with self.Session() as session:
+            session.add_all([ClientCompany(id=1, name='Acme'), User(id=1, username='alice', name='Alice'),
+                             Job(id=1, name='Concert', client_company_id=1, venue_name='Arena',
+                                 venue_address='1 Main St'),
+                             Shift(id=1, job_id=1, shift_start_datetime=datetime(2025, 1, 8, 8))])
+            session.commit()
+            session.get(Shift, 1).shift_start_datetime = datetime(2025, 1, 15, 8)
+            session.commit()
+        with self.Session() as session:
+            # The shift is not loaded: its week is read from the database
+            session.add(ShiftWorker(shiftID=1, userID=1, role_assigned=EmployeeType.STAGEHAND))
+            session.commit()
+        with self.Session() as session:
+            ShiftsController(session).update_entities([{'id': 1, 'shift_start_datetime': datetime(2025, 2, 3, 8)}])
+
+        self.assertEqual(self.weeks, [{date(2025, 1, 6)}, {date(2025, 1, 6), date(2025, 1, 13)},
+                                      {date(2025, 1, 13)}, None])
+
+    def test_shift_writes_invalidate_the_schedules_of_their_weeks(self):
+        cache = DictCache()
+        cache.set(('schedule_data', 'first week'), [1], schedule_week_tags(date(2025, 1, 6), date(2025, 1, 12)))
+        cache.set(('schedule_data', 'second week'), [2], schedule_week_tags(date(2025, 1, 13), date(2025, 1, 19)))
+        cache.set(('schedule_data', 'year'), [3], schedule_week_tags(date(2025, 1, 1), date(2025, 12, 31)))
+        cache.set(('employee_list',), [4])
+        response_cache = ResponseCache(cache=cache, enabled=True)
+
+        self.assertEqual(response_cache.invalidate_tables({'shifts': None}, {date(2025, 1, 13)}), set())
+        self.assertEqual(set(cache.entries), {('schedule_data', 'first week'), ('employee_list',)})
+
+        # Bulk writes (unknown weeks) and writes to other tables still drop every schedule
+        self.assertEqual(response_cache.invalidate_tables({'shiftWorkers': None}, None), {'schedule_data'})
+        self.assertEqual(set(cache.entries), {('employee_list',)})
+        self.assertEqual(schedule_week_tags(date(2025, 1, 8), date(2025, 1, 14)),
+                         ['schedule_week:2025-01-06', 'schedule_week:2025-01-13'])
+        self.assertEqual(schedule_week_tags(date(2025, 1, 14), date(2025, 1, 8)), [LONG_RANGE_TAG])
+
+
+if __name__ == '__main__':
+    unittest.main()
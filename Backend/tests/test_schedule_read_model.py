@@ -0,0 +1,124 @@
+import os
+import sys
+import asyncio
+import unittest
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from db.models import (
+    User, ClientCompany, Job, Shift, ShiftWorker, EmployeeCertification, EmployeeType,
+    WorkplaceSettings
+)
+from db.read_models.schedule_read_model import ScheduleReadModel
+from tests.helpers import count_statements, memory_engine
+
+
+class AwaitedSession:
+    """Session whose execute() is awaited, like an AsyncSession (no aiomysql / greenlet needed)"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+class TestScheduleReadModel(unittest.TestCase):
+    """Tests for the request 2001 schedule read model."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        self.session = sessionmaker(bind=self.engine)()
+
+        self.session.add_all([
+            User(id=1, username='manager', name='Manager', isManager=True, isApproval=True),
+            User(id=2, username='alice', name='Alice', isApproval=True, employee_type=EmployeeType.CREW_CHIEF),
+            User(id=3, username='bob', name='Bob', isApproval=True),
+            ClientCompany(id=1, name='Acme'),
+            Job(id=1, name='Concert', client_company_id=1, venue_name='Arena', venue_address='1 Main St'),
+            Job(id=2, name='Expo', client_company_id=1, venue_name='Hall', venue_address='2 Main St'),
+            EmployeeCertification(user_id=2, can_crew_chief=True),
+            WorkplaceSettings(),
+        ])
+        self.session.commit()
+
+        self.statements = count_statements(self, self.engine)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def add_shifts(self, count):
+        start = datetime(2026, 1, 5, 8, 0)
+        for i in range(count):
+            shift_start = start + timedelta(hours=i % 48)
+            shift = Shift(job_id=1 + i % 2, shift_start_datetime=shift_start,
+                          shift_end_datetime=shift_start + timedelta(hours=4))
+            self.session.add(shift)
+            self.session.flush()
+            self.session.add(ShiftWorker(shiftID=shift.id, userID=2, role_assigned=EmployeeType.CREW_CHIEF))
+            self.session.add(ShiftWorker(shiftID=shift.id, userID=3, role_assigned=EmployeeType.STAGEHAND))
+        self.session.commit()
+        self.session.expire_all()
+        self.statements.clear()
+
+    def build(self):
+        return ScheduleReadModel(self.session).build(date(2026, 1, 4), date(2026, 1, 10))
+
+    def test_payload(self):
+        self.add_shifts(2)
+        data = self.build()
+
+        self.assertEqual(len(data['shifts']), 2)
+        shift = data['shifts'][0]
+        self.assertEqual(shift['job_name'], 'Concert')
+        self.assertEqual(shift['client_company_name'], 'Acme')
+        self.assertEqual([w['name'] for w in shift['assigned_workers']], ['Alice', 'Bob'])
+
+        workers = {w['id']: w for w in data['workers']}
+        self.assertEqual(sorted(workers), [2, 3])
+        self.assertTrue(workers[2]['certifications']['can_crew_chief'])
+        self.assertIsNone(workers[3]['certifications'])
+        self.assertEqual(workers[3]['current_shifts_count'], 2)
+        self.assertEqual([j['client_company_name'] for j in data['jobs']], ['Acme', 'Acme'])
+        self.assertEqual(data['clients'][0]['name'], 'Acme')
+
+    def test_query_count_does_not_grow_with_shifts(self):
+        self.add_shifts(3)
+        self.build()
+        few = len(self.statements)
+
+        self.add_shifts(60)
+        data = self.build()
+        self.assertEqual(len(data['shifts']), 63)
+        self.assertEqual(len(self.statements), few)
+        self.assertLessEqual(few, 6)
+
+    def test_async_build_matches_sync_build(self):
+        self.add_shifts(3)
+        expected = self.build()
+        self.statements.clear()
+
+        data = asyncio.run(ScheduleReadModel(AwaitedSession(self.session)).build_async(
+            date(2026, 1, 4), date(2026, 1, 10)))
+
+        self.assertEqual(data, expected)
+        self.assertLessEqual(len(self.statements), 6)
+
+    def test_failing_settings_query_does_not_fail_the_schedule(self):
+        self.add_shifts(2)
+        WorkplaceSettings.__table__.drop(self.engine)
+
+        data = self.build()
+        self.assertEqual(len(data['shifts']), 2)
+        self.assertIsNone(data['workplace_settings'])
+        data = asyncio.run(ScheduleReadModel(AwaitedSession(self.session)).build_async(
+            date(2026, 1, 4), date(2026, 1, 10)))
+        self.assertIsNone(data['workplace_settings'])
+
+
+if __name__ == '__main__':
+    unittest.main()
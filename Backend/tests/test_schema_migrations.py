@@ -0,0 +1,115 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from db.models import Base
+from migrations import schema_migrations
+from migrations.versions.v0001_hot_path_indexes import INDEXES
+from scripts.index_advisor import advise, seed
+from tests.helpers import count_statements, memory_engine
+
+
+class TestSchemaMigrations(unittest.TestCase):
+    """Tests for the versioned migrations and the hot path indexes."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        # Start from a database created before the indexes were declared
+        with self.engine.begin() as connection:
+            for table, name, _ in INDEXES:
+                schema_migrations.drop_index(connection, table, name)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def index_names(self):
+        inspector = inspect(self.engine)
+        return {index['name'] for table in {table for table, _, _ in INDEXES}
+                for index in inspector.get_indexes(table)}
+
+    def test_upgrade_creates_indexes_and_records_version(self):
+        self.assertEqual(schema_migrations.upgrade(self.engine, 1), [1])
+
+        self.assertTrue({name for _, name, _ in INDEXES} <= self.index_names())
+        self.assertEqual([row['applied'] for row in schema_migrations.status(self.engine)][:2], [True, False])
+
+    def test_upgrade_is_idempotent(self):
+        schema_migrations.upgrade(self.engine)
+        self.assertEqual(schema_migrations.upgrade(self.engine), [])
+
+    def test_downgrade_drops_indexes(self):
+        schema_migrations.upgrade(self.engine)
+
+        self.assertEqual(schema_migrations.downgrade(self.engine, 0)[-1], 1)
+        self.assertFalse({name for _, name, _ in INDEXES} & self.index_names())
+        self.assertFalse(any(row['applied'] for row in schema_migrations.status(self.engine)))
+
+    def test_existing_index_on_same_columns_is_kept(self):
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("CREATE INDEX idx_shifts_start_datetime ON shifts (shift_start_datetime)")
+
+        schema_migrations.upgrade(self.engine, 1)
+
+        names = self.index_names()
+        self.assertIn('idx_shifts_start_datetime', names)
+        self.assertNotIn('ix_shifts_start_datetime', names)
+
+    def test_hot_queries_use_indexes_after_upgrade(self):
+        with Session(self.engine) as db:
+            seed(db, shifts=200, workers=50, jobs=10)
+
+        self.assertTrue(advise(self.engine))
+        schema_migrations.upgrade(self.engine)
+        self.assertEqual(advise(self.engine), [])
+
+
+
+class TestSchemaFingerprint(unittest.TestCase):
+    """Tests for the startup schema fingerprint check."""
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+        self.statements = count_statements(self, self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_fingerprint_tracks_the_models(self):
+        fingerprint = schema_migrations.schema_fingerprint()
+        self.assertEqual(schema_migrations.schema_fingerprint(), fingerprint)
+
+        metadata = MetaData()
+        Table('widgets', metadata, Column('id', Integer, primary_key=True))
+        before = schema_migrations.schema_fingerprint(metadata)
+        Table('gadgets', metadata, Column('id', Integer, primary_key=True))
+        self.assertNotEqual(schema_migrations.schema_fingerprint(metadata), before)
+
+    def test_new_database_is_created_once_then_checked_with_one_query(self):
+        self.assertEqual(schema_migrations.ensure_schema(self.engine), 'created')
+        self.assertTrue(all(row['applied'] for row in schema_migrations.status(self.engine)))
+        self.assertIn('system_admin_settings', inspect(self.engine).get_table_names())
+
+        self.statements.clear()
+        self.assertEqual(schema_migrations.ensure_schema(self.engine), 'current')
+        self.assertEqual(len(self.statements), 1)
+
+    def test_existing_database_waits_for_migrate(self):
+        Base.metadata.create_all(self.engine)
+
+        self.assertEqual(schema_migrations.ensure_schema(self.engine, auto_create=False), 'stale')
+        self.assertEqual(schema_migrations.ensure_schema(self.engine), 'pending')
+        self.assertEqual(schema_migrations.ensure_schema(self.engine), 'pending')
+
+        self.assertEqual(schema_migrations.migrate(self.engine),
+                         [migration.version for migration in schema_migrations.load_migrations()])
+        self.assertEqual(schema_migrations.ensure_schema(self.engine), 'current')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import sys
+import unittest
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.models import ClientCompany, Job, Shift, ShiftPart
+from db.controllers.shifts_controller import ShiftsController
+from migrations.versions import v0002_canonical_shift_start
+from tests.helpers import count_statements, memory_engine
+
+
+class TestShiftStartRange(unittest.TestCase):
+    """Tests for the canonical shift start column and its range queries."""
+
+    def setUp(self):
+        self.engine = memory_engine()
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add(ClientCompany(id=1, name='Acme'))
+        self.session.add(Job(id=1, name='Concert', client_company_id=1, venue_name='Arena', venue_address='1 Main St'))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def add_shift(self, start):
+        shift = Shift(job_id=1, shift_start_datetime=start)
+        self.session.add(shift)
+        self.session.commit()
+        return shift
+
+    def test_legacy_fields_are_derived_from_start(self):
+        shift = self.add_shift(datetime(2025, 1, 6, 18, 30))
+
+        self.assertEqual(shift.shiftDate, date(2025, 1, 6))
+        self.assertEqual(shift.shiftPart, ShiftPart.Evening)
+
+    def test_legacy_shift_gets_a_start(self):
+        shift = Shift(job_id=1, shiftDate=date(2025, 1, 6), shiftPart=ShiftPart.Noon)
+        self.session.add(shift)
+        self.session.commit()
+
+        self.assertEqual(shift.shift_start_datetime, datetime(2025, 1, 6, 12))
+        self.assertEqual(shift.shift_end_datetime, datetime(2025, 1, 6, 17))
+
+    def test_legacy_field_updates_move_the_start(self):
+        shift = self.add_shift(datetime(2025, 1, 6, 18, 30))
+        shift.shift_end_datetime = datetime(2025, 1, 6, 22, 30)
+        self.session.commit()
+
+        shift.shiftDate = date(2025, 1, 8)
+        self.session.commit()
+        self.assertEqual((shift.shift_start_datetime, shift.shift_end_datetime),
+                         (datetime(2025, 1, 8, 18, 30), datetime(2025, 1, 8, 22, 30)))
+
+        shift.shiftPart = ShiftPart.Morning
+        self.session.commit()
+        self.assertEqual(shift.shift_start_datetime, datetime(2025, 1, 8, 8))
+        self.assertEqual(shift.shiftPart, ShiftPart.Morning)
+
+        # The start wins when both are changed
+        shift.shift_start_datetime = datetime(2025, 1, 9, 13)
+        shift.shiftDate = date(2025, 1, 1)
+        self.session.commit()
+        self.assertEqual((shift.shiftDate, shift.shiftPart), (date(2025, 1, 9), ShiftPart.Noon))
+
+    def test_bulk_updates_derive_the_legacy_fields(self):
+        shift = self.add_shift(datetime(2025, 1, 6, 8))
+        controller = ShiftsController(self.session)
+        controller.update_entities([{'id': shift.id, 'shift_start_datetime': datetime(2025, 1, 7, 19)}])
+        self.session.refresh(shift)
+        self.assertEqual((shift.shiftDate, shift.shiftPart), (date(2025, 1, 7), ShiftPart.Evening))
+
+        with self.assertRaises(ValueError):
+            controller.update_entities([{'id': shift.id, 'shiftDate': date(2025, 1, 9)}])
+
+    def test_date_range_is_half_open_on_whole_days(self):
+        self.add_shift(datetime(2025, 1, 5, 23, 59))
+        inside = [self.add_shift(datetime(2025, 1, 6, 0, 0)).id, self.add_shift(datetime(2025, 1, 12, 23, 30)).id]
+        self.add_shift(datetime(2025, 1, 13, 0, 0))
+
+        shifts = ShiftsController(self.session).get_shifts_by_date_range(date(2025, 1, 6), date(2025, 1, 12))
+
+        self.assertEqual([shift.id for shift in shifts], inside)
+
+    def test_date_range_accepts_iso_strings(self):
+        first, last, after = (self.add_shift(start).id for start in (
+            datetime(2025, 1, 6, 8), datetime(2025, 1, 12, 23, 30), datetime(2025, 1, 13, 8)))
+        controller = ShiftsController(self.session)
+
+        shifts = controller.get_shifts_by_date_range('2025-01-06', '2025-01-12')
+        self.assertEqual([shift.id for shift in shifts], [first, last])
+        shifts = controller.get_shifts_by_date_range('2025-01-06T09:00:00', '2025-01-13T09:00:00')
+        self.assertEqual([shift.id for shift in shifts], [last, after])
+
+    def test_date_range_uses_one_indexed_predicate(self):
+        statements = count_statements(self, self.engine)
+
+        ShiftsController(self.session).get_shifts_by_date_range(date(2025, 1, 6), date(2025, 1, 12))
+
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn(' OR ', statements[0])
+        with self.engine.connect() as connection:
+            plan = ' '.join(row[-1] for row in connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statements[0], ('2025-01-06 00:00:00.000000', '2025-01-13 00:00:00.000000')))
+        self.assertIn('ix_shifts_start_datetime', plan)
+
+    def test_backfill_migration(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+        with engine.begin() as connection:
+            # A shifts table from before the start column was required
+            connection.exec_driver_sql(
+                "CREATE TABLE shifts (id INTEGER PRIMARY KEY, job_id INTEGER, shift_start_datetime DATETIME, "
+                "shift_end_datetime DATETIME, shiftDate DATE, shiftPart VARCHAR(7))")
+            connection.exec_driver_sql(
+                "INSERT INTO shifts VALUES (1, 1, NULL, NULL, '2025-01-06', 'Evening'), "
+                "(2, 1, '2025-01-07 09:00:00', '2025-01-07 15:00:00', NULL, NULL)")
+
+            v0002_canonical_shift_start.upgrade(connection)
+
+            rows = connection.execute(text(
+                "SELECT id, shift_start_datetime, shift_end_datetime, shiftDate, shiftPart FROM shifts ORDER BY id"
+            )).all()
+        engine.dispose()
+
+        self.assertEqual([tuple(row) for row in rows], [
+            (1, '2025-01-06 17:00:00', '2025-01-06 22:00:00', '2025-01-06', 'Evening'),
+            (2, '2025-01-07 09:00:00', '2025-01-07 15:00:00', '2025-01-07', 'Morning'),
+        ])
+
+    def test_backfill_migration_refuses_shifts_without_any_date(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+        with self.assertRaises(RuntimeError):
+            with engine.begin() as connection:
+                connection.exec_driver_sql(
+                    "CREATE TABLE shifts (id INTEGER PRIMARY KEY, job_id INTEGER, shift_start_datetime DATETIME, "
+                    "shift_end_datetime DATETIME, shiftDate DATE, shiftPart VARCHAR(7))")
+                connection.exec_driver_sql("INSERT INTO shifts (id, job_id) VALUES (1, 1)")
+                v0002_canonical_shift_start.upgrade(connection)
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+import main
+from db.models import Base
+from scripts.benchmark_startup import measure, DRIVER_MODULES
+from tests.helpers import use_engine
+
+
+class TestStartupImports(unittest.TestCase):
+    """Tests that importing the server does no I/O and connects on startup instead."""
+
+    def test_importing_server_creates_no_clients(self):
+        modules = {name for name, *_ in measure('Server')}
+        self.assertIn('websocket.request_routes', modules)
+        self.assertFalse(modules & set(DRIVER_MODULES))
+        # Handler modules are imported by the router on first use
+        self.assertNotIn('handlers.login', modules)
+        self.assertNotIn('handlers.google_auth', modules)
+
+
+class TestReadiness(unittest.TestCase):
+    """Tests for connection pre-warming and the /ready report."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory.name, 'ready.db')}",
+                                    poolclass=QueuePool, pool_size=5, max_overflow=0)
+        Base.metadata.create_all(self.engine)
+        use_engine(self, self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def test_prewarm_leaves_connections_in_the_pool(self):
+        self.assertEqual(main.prewarm_database(3), 3)
+        self.assertEqual((self.engine.pool.checkedin(), self.engine.pool.checkedout()), (3, 0))
+
+    def test_not_ready_until_warmed_and_failed_steps_are_retried(self):
+        import Server
+
+        database_done = threading.Event()
+        redis_attempts = []
+
+        def database():
+            database_done.wait(5)
+            return {'ready': True, 'warm_connections': main.prewarm_database(2), 'target': 2}
+
+        def redis():
+            redis_attempts.append(1)
+            return {'ready': len(redis_attempts) > 1, 'warm_connections': 2, 'target': 2}
+
+        async def probe():
+            app = {}
+            with patch.dict(Server.STARTUP_STEPS, database=database, redis=redis), \
+                    patch('Server.STARTUP_RETRY_SECONDS', 0):
+                await Server.start_background_initialization(app)
+                starting = Server.readiness_report(app)
+                database_done.set()
+                await asyncio.gather(*app['startup_tasks'].values())
+                retrying = Server.readiness_report(app)
+                await asyncio.gather(*app['startup_tasks'].values())
+                return starting, retrying, Server.readiness_report(app)
+
+        starting, retrying, ready = asyncio.run(probe())
+        self.assertFalse(starting['ready'])
+        self.assertEqual(starting['checks']['database']['status'], 'starting')
+        self.assertEqual(retrying['checks']['redis']['status'], 'retrying')
+        self.assertFalse(retrying['ready'])
+        self.assertTrue(ready['ready'])
+        self.assertEqual(ready['checks']['pool']['checked_in'], 2)
+        self.assertEqual(len(redis_attempts), 2)
+
+    def test_health_reports_misconfigured_replicas_as_degraded(self):
+        import Server
+
+        class Request:
+            path = '/health'
+
+        with patch('main.get_replica_set', side_effect=KeyError('DB_PASSWORD')):
+            response = asyncio.run(Server.handle_http_request(Request()))
+        health = json.loads(response.text)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(health['status'], 'degraded')
+        self.assertIn('DB_PASSWORD', health['replicas']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
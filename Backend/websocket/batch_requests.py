@@ -0,0 +1,106 @@
+"""
+Batch requests for EasyShifts WebSocket server
+Runs many operations sent in one frame against one request-scoped database session
+
+Envelope:
+    {"batch": [{"request_id": 230, "data": {...}}, ...], "atomic": true}
+
+Response:
+    {"request_id": "batch", "batch": true, "atomic": true, "success": true,
+     "committed": true, "responses": [{...}, {...}]}
+"""
+
+import os
+import logging
+from typing import Any, Callable, List
+
+from main import request_session_scope
+
+logger = logging.getLogger(__name__)
+
+BATCH_REQUEST_ID = 'batch'
+MAX_BATCH_SIZE = int(os.getenv('WS_MAX_BATCH_SIZE', '100'))
+
+
+class BatchAborted(Exception):
+    """Raised inside an atomic batch to roll back its transaction"""
+
+
+def is_batch_request(request_data: Any) -> bool:
+    """Check whether a decoded message is a batch envelope"""
+    return isinstance(request_data, dict) and 'batch' in request_data
+
+
+def _is_failure(response: Any) -> bool:
+    return not isinstance(response, dict) or response.get('success') is False
+
+
+def _error(request_id: Any, message: str) -> dict:
+    return {"request_id": request_id, "success": False, "error": message}
+
+
+def handle_batch_request(request_data: dict, dispatch: Callable[[Any, dict], dict]) -> dict:
+    """
+    Run every sub-request of a batch envelope in order.
+
+    With atomic=True the sub-requests share one transaction which is committed
+    once at the end; the first failing sub-request rolls everything back and
+    the remaining sub-requests are not run. Otherwise each sub-request is
+    committed (or rolled back) on its own, but all of them still share one
+    session and one pooled connection.
+
+    Parameters:
+        request_data (dict): The decoded batch envelope.
+        dispatch (callable): Runs one sub-request, dispatch(request_id, data) -> response dict.
+    """
+    items = request_data.get('batch')
+    atomic = bool(request_data.get('atomic', False))
+    result = {"request_id": BATCH_REQUEST_ID, "batch": True, "atomic": atomic}
+
+    if not isinstance(items, list) or not items:
+        return {**result, "success": False, "error": "batch must be a non-empty list of requests."}
+    if len(items) > MAX_BATCH_SIZE:
+        return {**result, "success": False, "error": f"batch is limited to {MAX_BATCH_SIZE} requests."}
+
+    responses: List[dict] = []
+    try:
+        with request_session_scope(atomic=atomic) as scope:
+            for index, item in enumerate(items):
+                request_id = item.get('request_id') if isinstance(item, dict) else None
+
+                if request_id is None:
+                    response = _error(None, "Each batch entry needs a request_id.")
+                elif is_batch_request(item):
+                    response = _error(request_id, "Nested batches are not supported.")
+                else:
+                    try:
+                        response = dispatch(request_id, item.get('data', {}))
+                    except Exception as e:
+                        logger.exception(f"Batch entry {index} (request {request_id}) failed: {e}")
+                        response = _error(request_id, f"Server error: {str(e)}")
+
+                if isinstance(response, dict) and 'request_id' not in response:
+                    response['request_id'] = request_id
+                responses.append(response)
+
+                failed = _is_failure(response)
+                if atomic:
+                    if failed:
+                        raise BatchAborted()
+                elif failed:
+                    scope.rollback()
+                else:
+                    scope.commit()
+    except BatchAborted:
+        skipped = [_error(item.get('request_id') if isinstance(item, dict) else None,
+                          "Not executed: batch was rolled back.")
+                   for item in items[len(responses):]]
+        logger.info(f"Atomic batch rolled back after {len(responses)} of {len(items)} requests")
+        return {**result, "success": False, "committed": False, "responses": responses + skipped}
+    except Exception as e:
+        logger.exception(f"Batch request failed: {e}")
+        return {**result, "success": False, "committed": False, "error": f"Server error: {str(e)}",
+                "responses": responses}
+
+    return {**result, "success": not any(_is_failure(r) for r in responses), "committed": True,
+            "responses": responses}
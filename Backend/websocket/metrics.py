@@ -0,0 +1,269 @@
+"""
+Prometheus Metrics for EasyShifts WebSocket server
+Renders the in-process counters and histograms (routes, WebSocket connections, database
+pool, Redis commands, cache hits) in the Prometheus text exposition format for /metrics.
+Nothing is computed on the request path beyond a counter or bucket increment; the
+values are only collected when /metrics is scraped.
+"""
+
+import sys
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db.pool_metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'easyshifts'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+# WebSocket message size histogram bucket upper bounds in bytes
+MESSAGE_BUCKETS_BYTES = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class ConnectionMetrics:
+    """Active WebSocket connections and message sizes"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.active = 0
+        self.total = 0
+        self.received_bytes = Histogram(MESSAGE_BUCKETS_BYTES)
+        self.sent_bytes = Histogram(MESSAGE_BUCKETS_BYTES)
+        # Responses sent from their cached JSON text, without encoding them
+        self.sent_serialized = 0
+        self._lock = threading.Lock()
+
+    def connected(self):
+        with self._lock:
+            self.active += 1
+            self.total += 1
+
+    def disconnected(self):
+        with self._lock:
+            self.active -= 1
+
+    def received(self, size: int):
+        with self._lock:
+            self.received_bytes.observe(size)
+
+    def sent(self, size: int, serialized: bool = False):
+        with self._lock:
+            self.sent_bytes.observe(size)
+            self.sent_serialized += serialized
+
+    def uptime_seconds(self) -> float:
+        return time.time() - self.started_at
+
+    def collect(self) -> dict:
+        with self._lock:
+            return {
+                'active': self.active,
+                'total': self.total,
+                'sent_serialized': self.sent_serialized,
+                'messages': [{'direction': direction, 'count': histogram.count, 'sum': histogram.sum,
+                              'buckets': list(zip(histogram.buckets, histogram.cumulative_counts()))}
+                             for direction, histogram in (('received', self.received_bytes),
+                                                          ('sent', self.sent_bytes))],
+            }
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    """Builds a Prometheus text exposition, one HELP/TYPE header per metric family"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._declared = set()
+
+    def _declare(self, name: str, kind: str, help_text: str):
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f'# HELP {name} {help_text}')
+            self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name: str, kind: str, help_text: str, value: float, **labels):
+        self._declare(name, kind, help_text)
+        self.lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[Tuple[float, int]], count: int,
+                  total: float, scale: float = 1.0, **labels):
+        """
+        One histogram series. buckets are (upper bound, cumulative count) pairs without +Inf;
+        bounds and sum are multiplied by scale (0.001 for milliseconds -> seconds).
+        """
+        self._declare(name, 'histogram', help_text)
+        for bound, cumulative in buckets:
+            self.lines.append(f'{name}_bucket{_labels({**labels, "le": _number(bound * scale)})} {cumulative}')
+        self.lines.append(f'{name}_bucket{_labels({**labels, "le": "+Inf"})} {count}')
+        self.lines.append(f'{name}_sum{_labels(labels)} {_number(total * scale)}')
+        self.lines.append(f'{name}_count{_labels(labels)} {count}')
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+def _write_requests(writer: MetricsWriter, routes: Sequence[dict]):
+    for route in routes:
+        labels = {'request_id': route['request_id'], 'handler': route['name']}
+        writer.sample(f'{PREFIX}_requests_total', 'counter', 'Requests handled, by request_id',
+                      route['calls'], **labels)
+        writer.sample(f'{PREFIX}_request_errors_total', 'counter',
+                      'Requests that raised or answered success=false', route['errors'], **labels)
+        writer.sample(f'{PREFIX}_requests_rejected_total', 'counter',
+                      'Requests refused by the route auth checks', route['rejected'], **labels)
+        writer.sample(f'{PREFIX}_requests_cached_total', 'counter', 'Requests answered from the response cache',
+                      route['cache_hits'], **labels)
+        writer.sample(f'{PREFIX}_request_queries_total', 'counter', 'SQL statements run by the handler',
+                      route['queries'], **labels)
+        writer.sample(f'{PREFIX}_request_db_seconds_total', 'counter', 'Time spent in SQL statements',
+                      round(route['db_ms'] / 1000, 6), **labels)
+    for route in routes:
+        writer.histogram(f'{PREFIX}_request_duration_seconds', 'Handler latency, by request_id',
+                         route['buckets'], route['count'], route['sum'], scale=0.001,
+                         request_id=route['request_id'], handler=route['name'])
+
+
+def _write_connections(writer: MetricsWriter, connections: ConnectionMetrics):
+    stats = connections.collect()
+    writer.sample(f'{PREFIX}_websocket_connections', 'gauge', 'Open WebSocket connections', stats['active'])
+    writer.sample(f'{PREFIX}_websocket_connections_total', 'counter', 'WebSocket connections accepted',
+                  stats['total'])
+    writer.sample(f'{PREFIX}_websocket_messages_sent_serialized_total', 'counter',
+                  'Responses sent from their cached JSON without encoding them', stats['sent_serialized'])
+    for messages in stats['messages']:
+        writer.histogram(f'{PREFIX}_websocket_message_bytes', 'WebSocket message sizes', messages['buckets'],
+                         messages['count'], messages['sum'], direction=messages['direction'])
+    writer.sample(f'{PREFIX}_uptime_seconds', 'gauge', 'Seconds since the server process started',
+                  round(connections.uptime_seconds(), 1))
+
+
+def _write_database(writer: MetricsWriter, pool: Optional[dict], breaker: dict):
+    writer.sample(f'{PREFIX}_db_circuit_open', 'gauge', '1 while the database circuit breaker is open',
+                  int(breaker['state'] == 'open'))
+    writer.sample(f'{PREFIX}_db_circuit_rejected_total', 'counter',
+                  'Requests failed fast by the open circuit breaker', breaker['rejected'])
+    if pool is None:
+        return
+    metrics = pool['metrics']
+    for name, help_text, value in (
+            ('db_pool_size', 'Configured pool size', pool['pool_size']),
+            ('db_pool_checked_out', 'Connections checked out', pool['checked_out']),
+            ('db_pool_checked_in', 'Idle pooled connections', pool['checked_in']),
+            ('db_pool_overflow', 'Overflow connections open', pool['overflow'])):
+        writer.sample(f'{PREFIX}_{name}', 'gauge', help_text, value)
+    for name, help_text, value in (
+            ('db_pool_checkouts_total', 'Connection checkouts', metrics['checkouts']),
+            ('db_pool_timeouts_total', 'Checkouts that timed out waiting for a connection', metrics['timeouts']),
+            ('db_pool_invalidations_total', 'Connections invalidated', metrics['invalidations'])):
+        writer.sample(f'{PREFIX}_{name}', 'counter', help_text, value)
+    for name, help_text, key in (
+            ('db_pool_checkout_wait_seconds', 'Time waited for a pooled connection', 'checkout_wait_ms'),
+            ('db_pool_hold_seconds', 'Time a connection stayed checked out', 'hold_ms')):
+        stats = metrics[key]
+        buckets = [(float(bound), count) for bound, count in stats['buckets'].items() if bound != '+Inf']
+        writer.histogram(f'{PREFIX}_{name}', help_text, buckets, stats['count'], stats['sum'], scale=0.001)
+
+
+def _write_redis(writer: MetricsWriter, commands: Sequence[dict]):
+    for command in commands:
+        writer.sample(f'{PREFIX}_redis_command_errors_total', 'counter', 'Redis commands that raised',
+                      command['errors'], command=command['command'])
+    for command in commands:
+        writer.histogram(f'{PREFIX}_redis_command_duration_seconds', 'Redis command latency',
+                         command['buckets'], command['count'], command['sum'], scale=0.001,
+                         command=command['command'])
+
+
+def _write_cache(writer: MetricsWriter, counts: Dict[str, Dict[str, int]]):
+    for cache_type, count in counts.items():
+        writer.sample(f'{PREFIX}_cache_hits_total', 'counter', 'Cache lookups answered from the cache',
+                      count['hits'], cache_type=cache_type)
+        writer.sample(f'{PREFIX}_cache_misses_total', 'counter', 'Cache lookups that missed',
+                      count['misses'], cache_type=cache_type)
+    for cache_type, count in counts.items():
+        lookups = count['hits'] + count['misses']
+        writer.sample(f'{PREFIX}_cache_hit_ratio', 'gauge', 'Cache hits / lookups since the process started',
+                      round(count['hits'] / lookups, 4) if lookups else 0.0, cache_type=cache_type)
+
+
+def _write_cache_tiers(writer: MetricsWriter, tiers: Dict[str, Dict[str, Any]]):
+    for tier, stats in tiers.items():
+        writer.sample(f'{PREFIX}_cache_tier_hits_total', 'counter', 'Cache lookups answered by a tier',
+                      stats['hits'], tier=tier)
+        writer.sample(f'{PREFIX}_cache_tier_misses_total', 'counter', 'Cache lookups a tier could not answer',
+                      stats['misses'], tier=tier)
+    local = tiers.get('local')
+    if local is None:
+        return
+    for reason in ('evictions', 'expirations', 'invalidations'):
+        writer.sample(f'{PREFIX}_cache_tier_evictions_total', 'counter', 'Entries dropped from a tier',
+                      local[reason], tier='local', reason=reason)
+    writer.sample(f'{PREFIX}_cache_tier_entries', 'gauge', 'Entries held by a tier', local['entries'], tier='local')
+    writer.sample(f'{PREFIX}_cache_tier_bytes', 'gauge', 'Bytes held by a tier', local['bytes'], tier='local')
+    writer.sample(f'{PREFIX}_cache_invalidation_subscribed', 'gauge',
+                  '1 while subscribed to the cache invalidation channel (the local tier is only read then)',
+                  int(local['subscribed']))
+
+
+def _write_cache_compression(writer: MetricsWriter, stats: Dict[str, Any]):
+    writer.sample(f'{PREFIX}_cache_values_written_total', 'counter', 'Values written to the cache',
+                  stats['values'])
+    writer.sample(f'{PREFIX}_cache_values_compressed_total', 'counter', 'Values written zlib-compressed',
+                  stats['compressed'])
+    writer.sample(f'{PREFIX}_cache_value_bytes_total', 'counter', 'JSON bytes of the values written',
+                  stats['json_bytes'])
+    writer.sample(f'{PREFIX}_cache_stored_bytes_total', 'counter', 'Bytes stored for the values written',
+                  stats['stored_bytes'])
+    writer.sample(f'{PREFIX}_cache_compression_saved_bytes_total', 'counter', 'Bytes saved by compression',
+                  stats['bytes_saved'])
+    writer.sample(f'{PREFIX}_cache_compression_ratio', 'gauge', 'JSON bytes / stored bytes of the values written',
+                  stats['ratio'])
+
+
+def _write_cache_computes(writer: MetricsWriter, computes: Sequence[dict]):
+    for compute in computes:
+        writer.sample(f'{PREFIX}_cache_computes_total', 'counter',
+                      'get_or_compute calls by outcome (computed, coalesced, lock_waited, stale_served)',
+                      compute['count'], cache_type=compute['cache_type'], outcome=compute['outcome'])
+
+
+def render_metrics() -> str:
+    """The whole /metrics page; Redis and the cache are only reported once they were used"""
+    from websocket.request_router import router
+    from main import database_breaker, get_pool_report
+
+    writer = MetricsWriter()
+    _write_requests(writer, router.collect_metrics())
+    _write_connections(writer, connection_metrics)
+    _write_database(writer, get_pool_report(), database_breaker.get_stats())
+    # Never import the Redis modules just to report them (importing stays side-effect free)
+    if 'config.redis_config' in sys.modules:
+        _write_redis(writer, sys.modules['config.redis_config'].redis_command_metrics.collect())
+    if 'cache.redis_cache' in sys.modules:
+        smart_cache = sys.modules['cache.redis_cache'].smart_cache
+        _write_cache(writer, smart_cache.get_hit_counts())
+        _write_cache_tiers(writer, smart_cache.get_tier_stats())
+        _write_cache_computes(writer, smart_cache.get_compute_counts())
+        _write_cache_compression(writer, smart_cache.get_compression_stats())
+    return writer.render()
+
+
+# Global WebSocket connection metrics
+connection_metrics = ConnectionMetrics()
@@ -0,0 +1,272 @@
+"""
+Request Executor for EasyShifts WebSocket server
+Runs the synchronous request handlers on a bounded thread pool so database queries,
+bcrypt checks and Google token verification do not block the aiohttp event loop;
+when every worker thread is busy, higher priority routes get the next free one
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+import threading
+import itertools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_MODE_EXECUTOR = 'executor'
+DISPATCH_MODE_INLINE = 'inline'
+
+
+def parse_request_ids(raw: Optional[str]) -> Set[int]:
+    """Parse a comma separated list of request ids (e.g. "1,1002")"""
+    request_ids = set()
+    for part in (raw or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            request_ids.add(int(part))
+        except ValueError:
+            logger.warning(f"Ignoring invalid request id in request id list: {part}")
+    return request_ids
+
+
+class RequestExecutor:
+    """Dispatches request handlers inline or on a bounded thread pool"""
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_inflight_per_connection: Optional[int] = None,
+                 inline_request_ids: Optional[Iterable[int]] = None):
+        # Dispatch configuration (environment driven, overridable for tests)
+        self.mode = (mode or os.getenv('WS_DISPATCH_MODE', DISPATCH_MODE_EXECUTOR)).lower()
+        self.max_workers = max_workers or int(os.getenv('WS_EXECUTOR_WORKERS', '16'))
+        self.max_inflight_per_connection = max_inflight_per_connection or int(
+            os.getenv('WS_MAX_INFLIGHT_PER_CONNECTION', '4'))
+
+        # Cheap requests (ping, test connection) are not worth a thread hop
+        if inline_request_ids is None:
+            inline_request_ids = parse_request_ids(os.getenv('WS_INLINE_REQUEST_IDS', '1,1002'))
+        self.inline_request_ids = set(inline_request_ids)
+
+        # Route priority of a request id (RequestRouter.get_priority), higher runs first
+        self.priority_of: Optional[Callable[[Any], int]] = None
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connection_slots: Dict[Any, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+        # At most max_workers handlers are handed to the pool at once (its own queue stays
+        # empty); the others wait here ordered by priority, then arrival (event loop only)
+        self._pool_busy = 0
+        self._pool_waiters: list = []
+        self._pool_order = itertools.count()
+
+        # Metrics
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'inline': 0,
+            'queued': 0,           # waiting for a free worker thread
+            'running': 0,          # currently executing on a worker thread
+            'max_queue_depth': 0,
+            'waiting_for_slot': 0,  # blocked on the per-connection in-flight limit
+            'abandoned': 0,        # callers that stopped waiting (timeout) while the handler ran on
+            'total_queue_wait_ms': 0.0,
+            'total_run_ms': 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """True when handlers are dispatched to the thread pool"""
+        return self.mode == DISPATCH_MODE_EXECUTOR
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='ws-handler'
+                    )
+                    logger.info(f"Request executor started with {self.max_workers} worker threads")
+        return self._executor
+
+    def should_run_inline(self, request_id: Any) -> bool:
+        """Check whether a request should bypass the thread pool"""
+        return not self.enabled or request_id in self.inline_request_ids
+
+    def _get_connection_slot(self, client_id: Any) -> asyncio.Semaphore:
+        """Get (or create) the in-flight limiter for a connection"""
+        slot = self._connection_slots.get(client_id)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_inflight_per_connection)
+            self._connection_slots[client_id] = slot
+        return slot
+
+    def release_connection(self, client_id: Any):
+        """Forget the in-flight limiter of a closed connection"""
+        self._connection_slots.pop(client_id, None)
+
+    async def _acquire_worker(self, priority: int):
+        """Wait for a free worker thread, waiters with a higher priority are let in first"""
+        if self._pool_busy < self.max_workers and not self._pool_waiters:
+            self._pool_busy += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._pool_waiters, (-priority, next(self._pool_order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Let in just as the caller gave up: hand the worker on
+                self._release_worker()
+            raise
+
+    def _release_worker(self):
+        """A handler left the pool: its worker goes to the first waiter still waiting"""
+        while self._pool_waiters:
+            _, _, waiter = heapq.heappop(self._pool_waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._pool_busy -= 1
+
+    def _run_tracked(self, enqueued_at: float, func: Callable, args: tuple, kwargs: dict):
+        """Run a handler on a worker thread while keeping queue/run metrics"""
+        started_at = time.perf_counter()
+        with self._lock:
+            self._stats['queued'] -= 1
+            self._stats['running'] += 1
+            self._stats['total_queue_wait_ms'] += (started_at - enqueued_at) * 1000
+
+        try:
+            result = func(*args, **kwargs)
+            with self._lock:
+                self._stats['completed'] += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats['running'] -= 1
+                self._stats['total_run_ms'] += (time.perf_counter() - started_at) * 1000
+
+    async def run(self, client_id: Any, request_id: Any, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a synchronous request handler for a connection.
+
+        Requests listed in inline_request_ids (or every request when the mode is
+        'inline') run directly on the event loop. Everything else waits for one of
+        the connection's in-flight slots and then runs on the thread pool, queued
+        by route priority while every worker thread is busy.
+        """
+        if self.should_run_inline(request_id):
+            with self._lock:
+                self._stats['inline'] += 1
+            return func(*args, **kwargs)
+
+        slot = self._get_connection_slot(client_id)
+        if slot.locked():
+            with self._lock:
+                self._stats['waiting_for_slot'] += 1
+            try:
+                await slot.acquire()
+            finally:
+                with self._lock:
+                    self._stats['waiting_for_slot'] -= 1
+        else:
+            await slot.acquire()
+
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['queued'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._stats['queued'])
+
+        try:
+            await self._acquire_worker(self.priority_of(request_id) if self.priority_of else 0)
+        except BaseException:
+            with self._lock:
+                self._stats['queued'] -= 1
+            slot.release()
+            raise
+
+        try:
+            # Carry context variables (request scope, metrics labels) into the worker thread
+            context = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            future = self._get_executor().submit(
+                context.run, self._run_tracked, enqueued_at, func, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._stats['queued'] -= 1
+            self._release_worker()
+            slot.release()
+            raise
+
+        # The slot and worker are freed once the handler has finished, not when the caller stops
+        # waiting for it (request timeout): a connection never has more handlers running than its slots
+        future.add_done_callback(lambda done: self._finished(loop, slot, done))
+        try:
+            return await asyncio.wrap_future(future, loop=loop)
+        except asyncio.CancelledError:
+            # cancel() only succeeds while the handler is still queued
+            if not future.cancel() and not future.done():
+                with self._lock:
+                    self._stats['abandoned'] += 1
+            raise
+
+    def _finished(self, loop: asyncio.AbstractEventLoop, slot: asyncio.Semaphore, future):
+        """Done callback of a submitted handler (called on the worker thread, or on cancellation)"""
+        if future.cancelled():
+            # Cancelled before a worker thread picked it up
+            with self._lock:
+                self._stats['queued'] -= 1
+        try:
+            loop.call_soon_threadsafe(self._handler_done, slot)
+        except RuntimeError:
+            # The event loop is closed (shutdown)
+            pass
+
+    def _handler_done(self, slot: asyncio.Semaphore):
+        self._release_worker()
+        slot.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get a snapshot of dispatch metrics"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        finished = stats['completed'] + stats['failed']
+        stats['avg_queue_wait_ms'] = round(stats['total_queue_wait_ms'] / finished, 2) if finished else 0.0
+        stats['avg_run_ms'] = round(stats['total_run_ms'] / finished, 2) if finished else 0.0
+        stats['total_queue_wait_ms'] = round(stats['total_queue_wait_ms'], 2)
+        stats['total_run_ms'] = round(stats['total_run_ms'], 2)
+        stats.update({
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'max_inflight_per_connection': self.max_inflight_per_connection,
+            'inline_request_ids': sorted(self.inline_request_ids),
+            'active_connections': len(self._connection_slots),
+        })
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            logger.info("Request executor stopped")
+
+
+# Global request executor instance
+request_executor = RequestExecutor()
@@ -0,0 +1,121 @@
+"""
+Request Pipeline for EasyShifts WebSocket server
+Processes several in-flight requests of one connection concurrently while keeping
+mutating requests (assign/unassign, clock in/out, ...) in arrival order
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional, Set
+
+from websocket.request_router import router
+from websocket.request_executor import parse_request_ids
+
+logger = logging.getLogger(__name__)
+
+# Ordering policies
+ORDERING_NONE = 'none'        # every request may overtake every other request
+ORDERING_WRITES = 'writes'    # mutating requests run one after another, reads run freely
+ORDERING_STRICT = 'strict'    # like 'writes', and reads also wait for earlier writes
+
+
+class PipelinePolicy:
+    """Pipelining configuration shared by all connections"""
+
+    def __init__(self, enabled: Optional[bool] = None, max_pending: Optional[int] = None,
+                 ordering: Optional[str] = None, ordered_request_ids: Optional[Iterable[int]] = None):
+        if enabled is None:
+            enabled = os.getenv('WS_PIPELINE_ENABLED', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.max_pending = max_pending or int(os.getenv('WS_PIPELINE_MAX_PENDING', '32'))
+        self.ordering = (ordering or os.getenv('WS_PIPELINE_ORDERING', ORDERING_WRITES)).lower()
+        if self.ordering not in (ORDERING_NONE, ORDERING_WRITES, ORDERING_STRICT):
+            logger.warning(f"Unknown WS_PIPELINE_ORDERING '{self.ordering}', using '{ORDERING_WRITES}'")
+            self.ordering = ORDERING_WRITES
+
+        # Always ordered, even if the route is registered as a read
+        if ordered_request_ids is None:
+            ordered_request_ids = parse_request_ids(os.getenv('WS_ORDERED_REQUEST_IDS', '230,231,241,242,244'))
+        self.ordered_request_ids = set(ordered_request_ids)
+
+    def is_ordered(self, request_id: Any, is_batch: bool = False) -> bool:
+        """Check whether a request must run after the connection's earlier ordered requests"""
+        if request_id in self.ordered_request_ids:
+            return True
+        if self.ordering == ORDERING_NONE:
+            return False
+        if is_batch:
+            # Batch envelopes usually carry bulk edits
+            return True
+        route = router.get_route(request_id)
+        return route is not None and route.is_write
+
+
+class ConnectionPipeline:
+    """
+    Schedules the requests of one WebSocket connection.
+
+    Requests that carry a client supplied correlation_id are scheduled concurrently and
+    answered with the same correlation_id, so the client can match responses that
+    arrive out of order. Requests without one keep the old one-at-a-time behaviour.
+    Concurrency of the handlers themselves is bounded by the request executor's
+    per-connection in-flight limit.
+    """
+
+    def __init__(self, process: Callable[[dict], Awaitable[dict]], send: Callable[[dict], Awaitable[None]],
+                 policy: Optional[PipelinePolicy] = None):
+        self.policy = policy or pipeline_policy
+        self._process = process
+        self._send = send
+        self._backlog = asyncio.Semaphore(self.policy.max_pending)
+        self._pending: Set[asyncio.Task] = set()
+        self._last_ordered: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, request_data: dict):
+        """
+        Schedule a request. Returns once the request is queued, or once it has been
+        answered when the request has no correlation_id.
+        """
+        await self._backlog.acquire()
+
+        request_id = request_data.get('request_id')
+        ordered = self.policy.is_ordered(request_id, is_batch='batch' in request_data)
+        wait_for = self._last_ordered if ordered or self.policy.ordering == ORDERING_STRICT else None
+
+        task = asyncio.create_task(self._run(request_data, wait_for))
+        if ordered:
+            self._last_ordered = task
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        if request_data.get('correlation_id') is None:
+            await asyncio.wait([task])
+
+    async def _run(self, request_data: dict, wait_for: Optional[asyncio.Task]):
+        try:
+            if wait_for is not None and not wait_for.done():
+                # Only the completion matters, failures were already answered
+                await asyncio.wait([wait_for])
+
+            response = await self._process(request_data)
+            if request_data.get('correlation_id') is not None:
+                response['correlation_id'] = request_data['correlation_id']
+            await self._send(response)
+        except Exception as e:
+            logger.exception(f"Pipelined request {request_data.get('request_id')} failed: {e}")
+        finally:
+            self._backlog.release()
+
+    async def drain(self):
+        """Wait for every scheduled request to finish (used when the connection closes)"""
+        if self._pending:
+            await asyncio.wait(list(self._pending))
+
+
+# Global pipelining policy
+pipeline_policy = PipelinePolicy()
@@ -0,0 +1,422 @@
+"""
+Request Router for EasyShifts WebSocket server
+Table-driven dispatch of request_id -> handler with per-route metadata and metrics
+"""
+
+import os
+import time
+import logging
+import importlib
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Union
+
+from db.circuit_breaker import DatabaseUnavailable
+from db.pool_metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Route access types (used for read/write routing decisions)
+READ = 'read'
+WRITE = 'write'
+
+# Route priorities (scheduling hint, higher runs first)
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+SESSION_NOT_FOUND_ERROR = "User session not found."
+MANAGER_REQUIRED_ERROR = "Manager access required."
+
+# Handler latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class DuplicateRouteError(ValueError):
+    """Raised when two handlers are registered for the same request_id"""
+
+
+class RequestContext:
+    """Per-message state handed to route handlers"""
+
+    def __init__(self, request_id: Any, data: Optional[dict], client_id: Any = None,
+                 session: Any = None, on_session_change: Optional[Callable[[Any, Any], None]] = None,
+                 accepts_serialized: bool = False):
+        self.request_id = request_id
+        self.data = data if data is not None else {}
+        self.client_id = client_id
+        self.session = session
+        self.route: Optional['RouteInfo'] = None
+        self._on_session_change = on_session_change
+        # The caller sends the response as is: cached responses may come back as their
+        # JSON text (cache.response_cache.SerializedResponse) instead of a dict
+        self.accepts_serialized = accepts_serialized
+
+    def set_session(self, session):
+        """Replace the session of the calling client (login / Google sign-in flows)"""
+        self.session = session
+        if self._on_session_change:
+            self._on_session_change(self.client_id, session)
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return getattr(self._module, attr)
+
+
+class RouteInfo:
+    """A registered route and its metadata"""
+
+    def __init__(self, request_id: int, handler: Union[Callable, str], name: Optional[str] = None,
+                 requires_auth: bool = False, manager_only: bool = False, access: str = READ,
+                 priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None,
+                 args: tuple = ('data', 'session'), wrap_data: bool = False,
+                 async_handler: Union[Callable, str, None] = None, cache: Optional[str] = None,
+                 cache_key: Optional[Callable[['RequestContext'], Optional[tuple]]] = None,
+                 cache_tags: Optional[Callable[['RequestContext'], Iterable[str]]] = None):
+        if access not in (READ, WRITE):
+            raise ValueError(f"Invalid access type for request {request_id}: {access}")
+
+        self.request_id = request_id
+        self.name = name or (handler.rsplit(':', 1)[-1] if isinstance(handler, str) else handler.__name__)
+        self.requires_auth = requires_auth or manager_only
+        self.manager_only = manager_only
+        self.access = access
+        self.priority = priority
+        self.timeout = timeout
+        self.args = args
+        self.wrap_data = wrap_data
+
+        # Handlers given as "module:function" are imported on first use
+        self._target = handler
+        self._handler = handler if callable(handler) else None
+        self._resolve_lock = threading.Lock()
+
+        # Optional coroutine version of the handler (same arguments) using the asyncio database path
+        self._async_target = async_handler
+        self._async_handler = async_handler if callable(async_handler) else None
+
+        # Successful responses are cached under this SmartCache type (see cache/response_cache.py),
+        # keyed by cache_key(ctx) (None = not cacheable, default: one entry per route) and
+        # carrying the invalidation tags cache_tags(ctx) returns
+        if cache is not None and access == WRITE:
+            raise ValueError(f"Write request {request_id} cannot be cached")
+        self.cache = cache
+        self.cache_key = cache_key
+        self.cache_tags = cache_tags
+
+        # Per-route metrics
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.slow_calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = 0
+        self.db_ms = 0.0
+        self.max_queries = 0
+        self.cache_hits = 0
+
+    @property
+    def is_write(self) -> bool:
+        return self.access == WRITE
+
+    @property
+    def handler(self) -> Callable:
+        """Resolve (and cache) the handler function"""
+        if self._handler is None:
+            with self._resolve_lock:
+                if self._handler is None:
+                    module_name, _, attr = self._target.partition(':')
+                    self._handler = getattr(importlib.import_module(module_name), attr)
+        return self._handler
+
+    @property
+    def has_async_handler(self) -> bool:
+        return self._async_target is not None
+
+    @property
+    def async_handler(self) -> Optional[Callable]:
+        """Resolve (and cache) the coroutine handler, None if the route has none"""
+        if self._async_handler is None and self._async_target is not None:
+            with self._resolve_lock:
+                if self._async_handler is None:
+                    module_name, _, attr = self._async_target.partition(':')
+                    self._async_handler = getattr(importlib.import_module(module_name), attr)
+        return self._async_handler
+
+    def _arguments(self, ctx: RequestContext) -> list:
+        if self.args is None:
+            return [ctx]
+        arg_values = {'data': ctx.data, 'session': ctx.session}
+        return [arg_values[arg] for arg in self.args]
+
+    def _wrap(self, ctx: RequestContext, result: Any) -> Any:
+        if self.wrap_data and self.args is not None:
+            return {"request_id": ctx.request_id, "success": True, "data": result}
+        return result
+
+    def call(self, ctx: RequestContext) -> Any:
+        """Call the handler with the arguments it declared"""
+        return self._wrap(ctx, self.handler(*self._arguments(ctx)))
+
+    async def call_async(self, ctx: RequestContext) -> Any:
+        """Await the coroutine handler with the arguments it declared"""
+        return self._wrap(ctx, await self.async_handler(*self._arguments(ctx)))
+
+    def record(self, elapsed_ms: float, failed: bool, timeout: Optional[float], query_stats: Any = None,
+               cache_hit: bool = False):
+        """Record one call in the route metrics"""
+        self.calls += 1
+        if cache_hit:
+            self.cache_hits += 1
+        if query_stats is not None:
+            self.queries += query_stats.count
+            self.db_ms += query_stats.total_ms
+            self.max_queries = max(self.max_queries, query_stats.count)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.latency_ms.observe(elapsed_ms)
+        if failed:
+            self.errors += 1
+        if timeout and elapsed_ms > timeout * 1000:
+            self.slow_calls += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'request_id': self.request_id,
+            'name': self.name,
+            'access': self.access,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'slow_calls': self.slow_calls,
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'p95_ms': self.latency_ms.get_stats()['p95'],
+            'avg_queries': round(self.queries / self.calls, 1) if self.calls else 0.0,
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.db_ms / self.calls, 2) if self.calls else 0.0,
+            'cache_hits': self.cache_hits,
+        }
+
+
+class RequestRouter:
+    """O(1) request_id dispatch with startup-time duplicate detection"""
+
+    def __init__(self, default_timeout: Optional[float] = None,
+                 session_scope: Optional[Callable[..., ContextManager]] = None):
+        self.routes: Dict[int, RouteInfo] = {}
+        self.default_timeout = default_timeout if default_timeout is not None else float(
+            os.getenv('WS_ROUTE_TIMEOUT_SECONDS', '30'))
+        # Wraps every handler call (one request-scoped database session per message),
+        # called with read_only (READ route), sticky_key (read-your-writes client key) and request_id
+        self.session_scope = session_scope
+        # Tells whether routes with an async_handler may run it (asyncio database path usable)
+        self.async_available: Optional[Callable[[], bool]] = None
+        # Tells whether read replicas are configured: READ routes then keep the sync,
+        # replica-aware session scope (the asyncio path only reaches the primary)
+        self.replicas_configured: Optional[Callable[[], bool]] = None
+        # Wraps every handler call to count its SQL queries, called with (request_id, route name);
+        # the context manager yields the QueryStats recorded in the route metrics
+        self.query_tracker: Optional[Callable[..., ContextManager]] = None
+        # Read-through cache of the routes registered with cache=... (key / get_or_compute / get_or_compute_async)
+        self.response_cache: Any = None
+        self._metrics_lock = threading.Lock()
+
+    def register(self, request_id: int, handler: Union[Callable, str], **metadata) -> RouteInfo:
+        """Register a handler (callable or "module:function") for a request_id"""
+        if request_id in self.routes:
+            existing = self.routes[request_id]
+            raise DuplicateRouteError(
+                f"Request id {request_id} is already routed to '{existing.name}', "
+                f"cannot register '{metadata.get('name') or handler}'")
+
+        route = RouteInfo(request_id, handler, **metadata)
+        self.routes[request_id] = route
+        return route
+
+    def route(self, request_id: int, **metadata) -> Callable:
+        """
+        Decorator registering a function that receives the RequestContext.
+
+        Usage:
+            @router.route(10, name="login", access=WRITE)
+            def login(ctx):
+                ...
+        """
+        def decorator(func: Callable) -> Callable:
+            self.register(request_id, func, args=None, **metadata)
+            return func
+        return decorator
+
+    def get_route(self, request_id: Any) -> Optional[RouteInfo]:
+        return self.routes.get(request_id)
+
+    def get_timeout(self, request_id: Any) -> Optional[float]:
+        """Timeout in seconds for a request (None = no limit)"""
+        route = self.routes.get(request_id)
+        timeout = route.timeout if route and route.timeout is not None else self.default_timeout
+        return timeout or None
+
+    def get_priority(self, request_id: Any) -> int:
+        """Scheduling priority of a request (PRIORITY_NORMAL for unknown ids)"""
+        route = self.routes.get(request_id)
+        return route.priority if route else PRIORITY_NORMAL
+
+    def _check_access(self, ctx: RequestContext) -> Optional[dict]:
+        """Resolve the route of a request and check its auth requirements, returns an error response on failure"""
+        route = self.routes.get(ctx.request_id)
+        if route is None:
+            logger.warning(f"Unknown request ID: {ctx.request_id}")
+            return {"request_id": ctx.request_id, "success": False, "error": f"Unknown request ID: {ctx.request_id}"}
+
+        ctx.route = route
+        if route.requires_auth and not ctx.session:
+            error = SESSION_NOT_FOUND_ERROR
+        elif route.manager_only and not ctx.session.can_access_manager_page():
+            error = MANAGER_REQUIRED_ERROR
+        else:
+            return None
+        with self._metrics_lock:
+            route.rejected += 1
+        return {"request_id": ctx.request_id, "success": False, "error": error}
+
+    def _record(self, ctx: RequestContext, started_at: float, failed: bool, query_stats: Any = None,
+                cache_hit: bool = False):
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._metrics_lock:
+            ctx.route.record(elapsed_ms, failed, self.get_timeout(ctx.request_id), query_stats, cache_hit)
+
+    def _cache_key(self, ctx: RequestContext) -> Optional[tuple]:
+        """Cache key of a request, None when it is not cached"""
+        if self.response_cache is None or ctx.route.cache is None:
+            return None
+        return self.response_cache.key(ctx.route, ctx)
+
+    def _track_queries(self, ctx: RequestContext) -> ContextManager:
+        if self.query_tracker is None:
+            return nullcontext()
+        return self.query_tracker(ctx.request_id, ctx.route.name)
+
+    def _session_scope(self, ctx: RequestContext) -> ContextManager:
+        if self.session_scope is None:
+            return nullcontext()
+        # Reads of a user follow their writes, whichever connection they come from
+        user_id = getattr(ctx.session, 'get_id', None)
+        sticky_key = ('user', user_id) if user_id is not None else ('client', ctx.client_id)
+        return self.session_scope(read_only=not ctx.route.is_write, sticky_key=sticky_key, request_id=ctx.request_id)
+
+    def dispatch(self, ctx: RequestContext) -> dict:
+        """Check the route's auth requirements and run its handler"""
+        error = self._check_access(ctx)
+        if error is not None:
+            return error
+
+        logger.info(f"Dispatching request {ctx.request_id} ({ctx.route.name}) for client {ctx.client_id}")
+        started_at = time.perf_counter()
+        failed = True
+        cache_hit = False
+        query_stats = []
+
+        def compute():
+            with self._track_queries(ctx) as stats, self._session_scope(ctx) as scope:
+                query_stats.append(stats)
+                result = ctx.route.call(ctx)
+                if scope is not None and isinstance(result, dict) and result.get('success') is False:
+                    # Undo what the handler wrote before it caught its own error
+                    scope.fail()
+                return result
+
+        try:
+            cache_key = self._cache_key(ctx)
+            if cache_key is None:
+                result = compute()
+            else:
+                # Concurrent identical requests share one computation (see SmartCache.get_or_compute)
+                result, computed = self.response_cache.get_or_compute(
+                    ctx.route.cache, cache_key, compute, request_id=ctx.request_id,
+                    serialized=ctx.accepts_serialized, tags=self.response_cache.tags(ctx.route, ctx))
+                cache_hit = not computed
+            failed = isinstance(result, dict) and result.get('success') is False
+            return result
+        except DatabaseUnavailable as e:
+            logger.warning(f"Request {ctx.request_id} rejected: {e}")
+            return e.to_response(ctx.request_id)
+        finally:
+            self._record(ctx, started_at, failed, query_stats[0] if query_stats else None, cache_hit)
+
+    def runs_async(self, request_id: Any) -> bool:
+        """True when a request should be awaited on the event loop through dispatch_async()"""
+        route = self.routes.get(request_id)
+        if not (route and route.has_async_handler and self.async_available and self.async_available()):
+            return False
+        return route.is_write or not (self.replicas_configured and self.replicas_configured())
+
+    async def dispatch_async(self, ctx: RequestContext) -> dict:
+        """
+        Check the route's auth requirements and await its coroutine handler on the event loop.
+        The handler opens its own AsyncSession; no request-scoped sync session is created.
+        """
+        error = self._check_access(ctx)
+        if error is not None:
+            return error
+
+        logger.info(f"Dispatching request {ctx.request_id} ({ctx.route.name}, async) for client {ctx.client_id}")
+        started_at = time.perf_counter()
+        failed = True
+        cache_hit = False
+        query_stats = []
+
+        async def compute():
+            with self._track_queries(ctx) as stats:
+                query_stats.append(stats)
+                return await ctx.route.call_async(ctx)
+
+        try:
+            cache_key = self._cache_key(ctx)
+            if cache_key is None:
+                result = await compute()
+            else:
+                # Same stampede protection as dispatch(), the blocking cache calls run off the event loop
+                result, computed = await self.response_cache.get_or_compute_async(
+                    ctx.route.cache, cache_key, compute, request_id=ctx.request_id,
+                    serialized=ctx.accepts_serialized, tags=self.response_cache.tags(ctx.route, ctx))
+                cache_hit = not computed
+            failed = isinstance(result, dict) and result.get('success') is False
+            return result
+        except DatabaseUnavailable as e:
+            logger.warning(f"Request {ctx.request_id} rejected: {e}")
+            return e.to_response(ctx.request_id)
+        finally:
+            self._record(ctx, started_at, failed, query_stats[0] if query_stats else None, cache_hit)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-route metrics for routes that have been called"""
+        with self._metrics_lock:
+            return [route.get_stats() for route in sorted(self.routes.values(), key=lambda r: r.request_id)
+                    if route.calls or route.rejected]
+
+    def collect_metrics(self) -> List[Dict[str, Any]]:
+        """Counters and latency buckets of the routes that have been called (for /metrics)"""
+        with self._metrics_lock:
+            return [{'request_id': route.request_id, 'name': route.name, 'calls': route.calls,
+                     'errors': route.errors, 'rejected': route.rejected,
+                     'queries': route.queries, 'db_ms': route.db_ms, 'cache_hits': route.cache_hits,
+                     'buckets': list(zip(route.latency_ms.buckets, route.latency_ms.cumulative_counts())),
+                     'count': route.latency_ms.count, 'sum': route.latency_ms.sum}
+                    for route in sorted(self.routes.values(), key=lambda r: r.request_id)
+                    if route.calls or route.rejected]
+
+
+# Global request router instance
+router = RequestRouter()
@@ -0,0 +1,405 @@
+"""
+Request routes for EasyShifts WebSocket server
+Registers every request_id with its handler and metadata on the global router.
+Handler modules are imported on first use.
+
+Routes that only forward (data, session) to a handler are registered in the
+tables at the bottom of this file; routes that shape their response or change
+the client's session are registered with the @router.route decorator.
+"""
+
+from main import request_session_scope, async_database_available, get_replica_set
+from db.query_stats import track_queries
+from cache.response_cache import response_cache, schedule_week_tags
+from websocket.request_router import (
+    router, LazyModule, READ, WRITE, PRIORITY_HIGH, PRIORITY_LOW
+)
+
+# Every message runs in one request scope: all controllers and get_db_session()
+# calls made by its handler share one session, committed or rolled back once
+router.session_scope = request_session_scope
+# Routes with an async_handler run it on the event loop when aiomysql is installed
+router.async_available = async_database_available
+# ...except READ routes while read replicas are configured, they go through the replica-aware scope
+router.replicas_configured = lambda: get_replica_set() is not None
+# Queries of every message are counted; past DB_QUERY_BUDGET the repeated statements are logged
+router.query_tracker = track_queries
+# Routes registered with cache=... answer from SmartCache until a committed write invalidates them
+router.response_cache = response_cache
+
+login = LazyModule('handlers.login')
+employee_signin = LazyModule('handlers.employee_signin')
+manager_signin = LazyModule('handlers.manager_signin')
+employee_shifts_request = LazyModule('handlers.employee_shifts_request')
+manager_insert_shifts = LazyModule('handlers.manager_insert_shifts')
+employee_list = LazyModule('handlers.employee_list')
+manager_schedule = LazyModule('handlers.manager_schedule')
+make_shifts = LazyModule('handlers.make_shifts')
+google_auth = LazyModule('handlers.google_auth')
+google_session_create = LazyModule('handlers.google_session_create')
+shift_board_controller = LazyModule('db.controllers.shiftBoard_controller')
+enhanced_schedule_handlers = LazyModule('handlers.enhanced_schedule_handlers')
+
+
+def _client_ip(ctx) -> str:
+    return getattr(ctx.session, 'client_ip', 'unknown')
+
+
+# === AUTHENTICATION ===
+
+@router.route(10, name="login", access=WRITE, priority=PRIORITY_HIGH)
+def _login(ctx):
+    response, session = login.handle_login(ctx.data, _client_ip(ctx))
+    ctx.set_session(session)
+    return {"request_id": ctx.request_id, "data": response}
+
+
+@router.route(20, name="employee_signin", access=WRITE)
+def _employee_signin(ctx):
+    session = employee_signin.handle_employee_signin(ctx.data)
+    ctx.set_session(session)
+    if session:
+        return {"request_id": ctx.request_id, "success": True, "message": "Employee sign-in successful."}
+    return {"request_id": ctx.request_id, "success": False, "message": "Employee sign-in failed."}
+
+
+@router.route(30, name="manager_signin", access=WRITE)
+def _manager_signin(ctx):
+    # handle_manager_signin returns a dict {'success': True/False, 'message': ...}, the
+    # session itself is established by a subsequent login request
+    return {"request_id": ctx.request_id, "data": manager_signin.handle_manager_signin(ctx.data)}
+
+
+def _google_auth_response(ctx, response):
+    """Move the user_session out of a Google auth response and into the client's session"""
+    if response.get('success'):
+        ctx.set_session(response['data'].get('user_session'))
+        # user_session is not JSON serializable
+        response['data'].pop('user_session', None)
+    return {"request_id": ctx.request_id, **response}
+
+
+@router.route(66, name="google_auth_login", access=WRITE, priority=PRIORITY_HIGH)
+def _google_auth_login(ctx):
+    response = google_auth.google_auth_handler.handle_google_auth_login(ctx.data)
+    if not response.get('data', {}).get('user_exists'):
+        return {"request_id": ctx.request_id, **response}
+    return _google_auth_response(ctx, response)
+
+
+@router.route(67, name="link_google_account", access=WRITE)
+def _link_google_account(ctx):
+    return _google_auth_response(ctx, google_auth.google_auth_handler.handle_link_google_account(ctx.data))
+
+
+@router.route(68, name="create_account_with_google", access=WRITE)
+def _create_account_with_google(ctx):
+    return _google_auth_response(ctx, google_auth.google_auth_handler.handle_create_account_with_google(ctx.data))
+
+
+@router.route(69, name="google_session_create", access=WRITE, priority=PRIORITY_HIGH)
+def _google_session_create(ctx):
+    response, session = google_session_create.handle_google_session_create(ctx.data, _client_ip(ctx))
+    ctx.set_session(session)
+    return {"request_id": ctx.request_id, "data": response}
+
+
+@router.route(71, name="google_signup_client", access=WRITE)
+def _google_signup_client(ctx):
+    return _google_auth_response(ctx, google_auth.google_auth_handler.handle_google_signup_client(ctx.data))
+
+
+# NOTE: the old if/elif chain also matched 10 (logout), 69 (Google signup employee) and
+# 70 (Google signup manager) in later branches that could never be reached. They are
+# not registered here; the router refuses duplicate ids.
+
+
+# === EMPLOYEE REQUESTS ===
+
+@router.route(40, name="employee_shifts_request", access=WRITE)
+def _employee_shifts_request(ctx):
+    employee_shifts_request.handle_employee_shifts_request(ctx.data, ctx.session)
+    return {"request_id": ctx.request_id, "success": True, "message": "Shift request submitted."}
+
+
+@router.route(41, name="is_in_request_window", requires_auth=True)
+def _is_in_request_window(ctx):
+    is_in_window = employee_shifts_request.handle_is_in_request_window(ctx.session)
+    return {"request_id": ctx.request_id, "success": True, "data": {"is_in_window": is_in_window}}
+
+
+@router.route(55, name="manager_insert_shifts", access=WRITE)
+def _manager_insert_shifts(ctx):
+    manager_insert_shifts.handle_manager_insert_shifts(ctx.data, ctx.session)
+    return {"request_id": ctx.request_id, "success": True, "message": "Shifts inserted."}
+
+
+@router.route(62, name="employee_approval", manager_only=True, access=WRITE)
+def _employee_approval(ctx):
+    return {"request_id": ctx.request_id, "success": employee_list.handle_employee_approval(ctx.data, ctx.session)}
+
+
+@router.route(64, name="employee_rejection", manager_only=True, access=WRITE)
+def _employee_rejection(ctx):
+    return {"request_id": ctx.request_id, "success": employee_list.handle_employee_rejection(ctx.data, ctx.session)}
+
+
+# === SHIFT BOARD ===
+
+@router.route(80, name="make_shifts", requires_auth=True, access=WRITE)
+def _make_shifts(ctx):
+    make_shifts.make_shifts(ctx.session)  # This function doesn't return a client response
+    return {"request_id": ctx.request_id, "success": True, "message": "Attempted to make new week shifts."}
+
+
+def _board_response(ctx, board):
+    converted_board = shift_board_controller.convert_shiftBoard_to_client(board)
+    return {"request_id": ctx.request_id, "success": True, "data": converted_board}
+
+
+@router.route(81, name="create_new_board", requires_auth=True, access=WRITE)
+def _create_new_board(ctx):
+    return _board_response(ctx, manager_schedule.handle_create_new_board(ctx.session))
+
+
+@router.route(82, name="save_board", requires_auth=True, access=WRITE)
+def _save_board(ctx):
+    return _board_response(ctx, manager_schedule.handle_save_board(ctx.data, ctx.session))
+
+
+@router.route(83, name="reset_board", requires_auth=True, access=WRITE)
+def _reset_board(ctx):
+    return _board_response(ctx, manager_schedule.handle_reset_board(ctx.session))
+
+
+@router.route(84, name="publish_board", requires_auth=True, access=WRITE)
+def _publish_board(ctx):
+    is_published = manager_schedule.handle_publish_board(ctx.session)
+    return {"request_id": ctx.request_id, "success": True, "data": {"is_published": is_published}}
+
+
+@router.route(85, name="unpublish_board", requires_auth=True, access=WRITE)
+def _unpublish_board(ctx):
+    # handle_unpublish_board returns True if the board was unpublished
+    unpublished = manager_schedule.handle_unpublish_board(ctx.session)
+    return {"request_id": ctx.request_id, "success": unpublished, "data": {"is_published": not unpublished}}
+
+
+@router.route(97, name="get_start_date", requires_auth=True)
+def _get_start_date(ctx):
+    start_date = manager_schedule.handle_get_start_date(ctx.session).isoformat()
+    return {"request_id": ctx.request_id, "success": True, "data": start_date}
+
+
+@router.route(99, name="change_schedule", requires_auth=True, access=WRITE)
+def _change_schedule(ctx):
+    manager_schedule.handle_schedules(ctx.session, ctx.data)
+    return {"request_id": ctx.request_id, "success": True, "message": "Schedule change processed."}
+
+
+@router.route(991, name="save_preferences", requires_auth=True, access=WRITE)
+def _save_preferences(ctx):
+    manager_schedule.handle_save_preferences(ctx.session.get_id, ctx.data)
+    return {"request_id": ctx.request_id, "success": True, "message": "Preferences saved."}
+
+
+@router.route(992, name="open_requests_windows", requires_auth=True, access=WRITE)
+def _open_requests_windows(ctx):
+    manager_schedule.open_requests_windows(ctx.session.get_id, ctx.data)
+    return {"request_id": ctx.request_id, "success": True, "message": "Schedule window time set."}
+
+
+def _schedule_cache_key(ctx):
+    """The schedule payload (2001) only depends on the parsed request, not on the user"""
+    request = enhanced_schedule_handlers._parse_schedule_request(ctx.data or {})
+    return tuple(str(value) for value in request.values()) if request else None
+
+
+def _schedule_cache_tags(ctx):
+    """A 2001 entry is invalidated by committed writes to shifts of the weeks it covers"""
+    request = enhanced_schedule_handlers._parse_schedule_request(ctx.data)
+    return schedule_week_tags(request['start_date'], request['end_date'])
+
+
+# === FORWARDING ROUTES ===
+# request_id: (handler, metadata)
+
+_SESSION = ('session',)
+
+FORWARDING_ROUTES = {
+    # Employee requests and employee list
+    42: ('handlers.employee_shifts_request:handle_get_request_window_times',
+         dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    50: ('handlers.get_employee_requests:handle_get_employee_requests', dict()),
+    60: ('handlers.employee_list:handle_employee_list', dict(
+        manager_only=True, args=_SESSION, async_handler='handlers.employee_list:handle_employee_list_async',
+        cache='employee_list')),
+    65: ('handlers.employee_list:handle_create_employee_by_manager', dict(manager_only=True, access=WRITE)),
+    70: ('handlers.send_profile:handle_send_profile', dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    94: ('handlers.employee_list:handle_get_all_approved_worker_details', dict(manager_only=True, args=_SESSION)),
+    410: ('handlers.employee_list:handle_manager_update_employee_certifications',
+          dict(manager_only=True, access=WRITE)),
+
+    # Manager schedule
+    90: ('handlers.send_shifts_to_employee:handle_send_shifts', dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    91: ('handlers.manager_schedule:watch_workers_requests', dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    93: ('handlers.manager_schedule:get_all_workers_names_by_workplace_id',
+         dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    95: ('handlers.manager_schedule:handle_get_preferences', dict(requires_auth=True, args=_SESSION, wrap_data=True)),
+    98: ('handlers.manager_schedule:handle_get_assigned_shifts',
+         dict(requires_auth=True, args=('session', 'data'), wrap_data=True)),
+
+    # Crew chief and timesheets
+    100: ('handlers.crew_chief_handlers:handle_get_crew_chief_shifts', dict(
+        requires_auth=True, args=_SESSION,
+        async_handler='handlers.crew_chief_handlers:handle_get_crew_chief_shifts_async')),
+    101: ('handlers.crew_chief_handlers:handle_get_crew_members_for_shift', dict(requires_auth=True)),
+    102: ('handlers.crew_chief_handlers:handle_submit_shift_times', dict(requires_auth=True, access=WRITE)),
+    103: ('handlers.timesheet_management_handlers:handle_get_all_submitted_timesheets',
+          dict(requires_auth=True, args=_SESSION)),
+    104: ('handlers.timesheet_management_handlers:handle_update_timesheet_status',
+          dict(requires_auth=True, access=WRITE)),
+
+    # Client companies
+    200: ('handlers.client_company_handlers:handle_get_all_client_companies', dict(args=_SESSION)),
+    201: ('handlers.client_company_handlers:handle_create_client_company', dict(manager_only=True, access=WRITE)),
+    202: ('handlers.client_company_handlers:handle_update_client_company', dict(manager_only=True, access=WRITE)),
+    203: ('handlers.client_company_handlers:handle_delete_client_company', dict(manager_only=True, access=WRITE)),
+
+    # Jobs
+    210: ('handlers.job_handlers:handle_create_job', dict(manager_only=True, access=WRITE)),
+    211: ('handlers.job_handlers:handle_get_jobs_by_manager', dict(
+        manager_only=True, args=_SESSION, async_handler='handlers.job_handlers:handle_get_jobs_by_manager_async',
+        cache='job_listings')),
+
+    # Client directory
+    212: ('handlers.client_directory_handlers:handle_get_client_directory',
+          dict(manager_only=True, args=_SESSION, priority=PRIORITY_LOW, cache='client_companies')),
+    213: ('handlers.client_directory_handlers:handle_get_client_company_details', dict(manager_only=True)),
+    214: ('handlers.client_directory_handlers:handle_update_client_user_status', dict(manager_only=True, access=WRITE)),
+    215: ('handlers.client_directory_handlers:handle_get_client_analytics',
+          dict(manager_only=True, args=_SESSION, priority=PRIORITY_LOW)),
+
+    # Shift management
+    220: ('handlers.shift_management_handlers:handle_create_shift', dict(manager_only=True, access=WRITE)),
+    221: ('handlers.shift_management_handlers:handle_get_shifts_by_job', dict(
+        async_handler='handlers.shift_management_handlers:handle_get_shifts_by_job_async')),
+    230: ('handlers.shift_management_handlers:handle_assign_worker_to_shift', dict(manager_only=True, access=WRITE)),
+    231: ('handlers.shift_management_handlers:handle_unassign_worker_from_shift',
+          dict(manager_only=True, access=WRITE)),
+    232: ('handlers.shift_management_handlers:handle_update_shift_requirements', dict(manager_only=True, access=WRITE)),
+
+    # Timecards
+    240: ('handlers.timecard_handlers:handle_get_shift_timecard', dict(manager_only=True)),
+    241: ('handlers.timecard_handlers:handle_clock_in_out_worker',
+          dict(manager_only=True, access=WRITE, priority=PRIORITY_HIGH)),
+    242: ('handlers.timecard_handlers:handle_mark_worker_absent',
+          dict(manager_only=True, access=WRITE, priority=PRIORITY_HIGH)),
+    243: ('handlers.timecard_handlers:handle_update_worker_notes', dict(manager_only=True, access=WRITE)),
+    244: ('handlers.timecard_handlers:handle_end_shift_clock_out_all',
+          dict(manager_only=True, access=WRITE, priority=PRIORITY_HIGH)),
+
+    # User management (handlers additionally require isAdmin)
+    300: ('handlers.user_management_handlers:handle_create_manager', dict(manager_only=True, access=WRITE)),
+    301: ('handlers.user_management_handlers:handle_create_admin', dict(manager_only=True, access=WRITE)),
+    302: ('handlers.user_management_handlers:handle_get_all_users', dict(manager_only=True, args=_SESSION)),
+    303: ('handlers.user_management_handlers:handle_update_user_role', dict(manager_only=True, access=WRITE)),
+
+    # Timesheet management
+    1010: ('handlers.timesheet_management_handlers:handle_get_shift_timesheet_details', dict(requires_auth=True)),
+    1011: ('handlers.timesheet_management_handlers:handle_update_worker_timesheet',
+           dict(requires_auth=True, access=WRITE)),
+    1012: ('handlers.timesheet_management_handlers:handle_submit_shift_timesheet',
+           dict(requires_auth=True, access=WRITE)),
+    1013: ('handlers.timesheet_management_handlers:handle_approve_shift_timesheet',
+           dict(requires_auth=True, access=WRITE)),
+    1014: ('handlers.timesheet_management_handlers:handle_get_employee_timesheet_history',
+           dict(requires_auth=True, priority=PRIORITY_LOW)),
+
+    # Enhanced schedule
+    2001: ('handlers.enhanced_schedule_handlers:handle_get_schedule_data', dict(
+        requires_auth=True, async_handler='handlers.enhanced_schedule_handlers:handle_get_schedule_data_async',
+        cache='schedule_data', cache_key=_schedule_cache_key, cache_tags=_schedule_cache_tags)),
+    2002: ('handlers.enhanced_schedule_handlers:handle_assign_worker_to_shift_enhanced',
+           dict(requires_auth=True, access=WRITE)),
+    2003: ('handlers.enhanced_schedule_handlers:handle_unassign_worker_from_shift_enhanced',
+           dict(requires_auth=True, access=WRITE)),
+    2004: ('handlers.enhanced_schedule_handlers:handle_create_shift_enhanced', dict(requires_auth=True, access=WRITE)),
+    2005: ('handlers.enhanced_schedule_handlers:handle_update_shift_enhanced', dict(requires_auth=True, access=WRITE)),
+    2006: ('handlers.enhanced_schedule_handlers:handle_delete_shift_enhanced', dict(requires_auth=True, access=WRITE)),
+}
+
+# Extended settings: request_id -> (handler name, access, takes data). Reads going through
+# ExtendedSettingsController.get_all_extended_settings() insert the missing default rows: WRITE
+_EXTENDED_SETTINGS_ROUTES = {
+    1100: ('handle_update_company_profile_settings', WRITE, True),
+    1101: ('handle_update_user_management_settings', WRITE, True),
+    1102: ('handle_update_certifications_settings', WRITE, True),
+    1103: ('handle_update_client_management_settings', WRITE, True),
+    1104: ('handle_update_job_configuration_settings', WRITE, True),
+    1105: ('handle_update_timesheet_advanced_settings', WRITE, True),
+    1106: ('handle_update_google_integration_settings', WRITE, True),
+    1107: ('handle_update_reporting_settings', WRITE, True),
+    1108: ('handle_update_security_settings', WRITE, True),
+    1109: ('handle_update_mobile_accessibility_settings', WRITE, True),
+    1110: ('handle_update_system_admin_settings', WRITE, True),
+    1111: ('handle_get_extended_settings', WRITE, False),
+    1112: ('handle_reset_extended_settings_to_defaults', WRITE, False),
+    1113: ('handle_test_google_connection', READ, True),
+    1114: ('handle_manual_google_sync', WRITE, False),
+    1115: ('handle_system_health_check', READ, False),
+    1116: ('handle_manual_backup', WRITE, False),
+    1117: ('handle_get_settings_summary', WRITE, False),
+    1118: ('handle_bulk_update_settings', WRITE, True),
+    1119: ('handle_export_settings_backup', WRITE, False),
+    1120: ('handle_import_settings_backup', WRITE, True),
+    1121: ('handle_get_settings_templates', READ, False),
+    1122: ('handle_apply_settings_template', WRITE, True),
+    1123: ('handle_compare_settings', WRITE, True),
+    1124: ('handle_validate_settings_bulk', READ, True),
+}
+
+# handlers.missing_handlers: request_id -> (handler name, access)
+_MISSING_HANDLER_ROUTES = {
+    1: ('handle_test_connection', READ),
+    72: ('handle_get_enhanced_schedule_data', READ),
+    73: ('handle_bulk_shift_operation', WRITE),
+    86: ('handle_schedule_analytics', READ),
+    400: ('handle_generate_report', READ),
+    500: ('handle_get_user_settings', READ),
+    501: ('handle_update_user_settings', WRITE),
+    502: ('handle_reset_user_settings', WRITE),
+    600: ('handle_get_client_companies', READ),
+    601: ('handle_create_client_company', WRITE),
+    602: ('handle_update_client_company', WRITE),
+    603: ('handle_delete_client_company', WRITE),
+    700: ('handle_get_employee_list', READ),
+    701: ('handle_create_employee_account', WRITE),
+    702: ('handle_update_employee_certifications', WRITE),
+    800: ('handle_get_timesheet_summary', READ),
+    900: ('handle_get_notifications', READ),
+    901: ('handle_mark_notification_read', WRITE),
+    902: ('handle_send_notification', WRITE),
+    903: ('handle_get_notification_settings', READ),
+    904: ('handle_update_notification_settings', WRITE),
+    998: ('handle_debug_info', READ),
+    999: ('handle_system_status', READ),
+    1000: ('handle_health_check', READ),
+    1002: ('handle_ping', READ),
+}
+
+
+def register_forwarding_routes():
+    """Register the table-driven routes on the global router"""
+    for request_id, (target, metadata) in FORWARDING_ROUTES.items():
+        router.register(request_id, target, **metadata)
+
+    for request_id, (handler_name, access, takes_data) in _EXTENDED_SETTINGS_ROUTES.items():
+        router.register(request_id, f'handlers.enhanced_settings_handlers:{handler_name}',
+                        manager_only=True, access=access, args=('data', 'session') if takes_data else _SESSION)
+
+    for request_id, (handler_name, access) in _MISSING_HANDLER_ROUTES.items():
+        router.register(request_id, f'handlers.missing_handlers:{handler_name}', access=access)
+
+
+register_forwarding_routes()